@@ -0,0 +1,9 @@
+# 앱 공용 상수 (추천/사용자 선호 양쪽에서 사용)
+
+# 월 → 계절 이름 매핑 (영문)
+SEASON_MAP = {
+    12: 'winter', 1: 'winter', 2: 'winter',
+    3: 'spring', 4: 'spring', 5: 'spring',
+    6: 'summer', 7: 'summer', 8: 'summer',
+    9: 'autumn', 10: 'autumn', 11: 'autumn'
+}
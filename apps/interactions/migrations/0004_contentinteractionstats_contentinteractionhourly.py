@@ -0,0 +1,61 @@
+# Generated by Django 5.2 on 2025-06-22 09:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0003_alter_contentinteraction_content'),
+        ('items', '0004_alter_contentdetailcommon_summarize'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentInteractionStats',
+            fields=[
+                ('content', models.OneToOneField(db_column='content_id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='interaction_stats', serialize=False, to='items.contentdetailcommon', to_field='contentid')),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('recent_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'content_interaction_stats',
+                'indexes': [models.Index(fields=['total_count'], name='content_int_total_c_a0fd26_idx'), models.Index(fields=['recent_count'], name='content_int_recent__f0fd5d_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContentInteractionHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('content', models.ForeignKey(db_column='content_id', on_delete=django.db.models.deletion.CASCADE, related_name='interaction_hourly', to='items.contentdetailcommon', to_field='contentid')),
+            ],
+            options={
+                'db_table': 'content_interaction_hourly',
+                'indexes': [models.Index(fields=['hour'], name='content_int_hour_ccea89_idx')],
+                'unique_together': {('content', 'hour')},
+            },
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO content_interaction_hourly (content_id, hour, count)
+                SELECT content_id, date_trunc('hour', timestamp), COUNT(*)
+                FROM content_interaction
+                WHERE user_id IS NOT NULL AND timestamp >= now() - interval '8 days'
+                GROUP BY content_id, date_trunc('hour', timestamp);
+
+                INSERT INTO content_interaction_stats (content_id, total_count, recent_count, updated_at)
+                SELECT content_id,
+                       COUNT(*),
+                       COUNT(*) FILTER (WHERE timestamp >= now() - interval '7 days'),
+                       now()
+                FROM content_interaction
+                WHERE user_id IS NOT NULL
+                GROUP BY content_id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -72,3 +72,48 @@ class ContentInteraction(models.Model):
 
     def __str__(self):
         return f"{self.user} - {self.content_id} ({self.action_type})"
+
+
+class ContentInteractionStats(models.Model):
+    """콘텐츠별 상호작용 카운터 (숨은 명소/핫플 섹션용 비정규화 집계)"""
+    content = models.OneToOneField(
+        'items.ContentDetailCommon',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column='content_id',
+        to_field='contentid',
+        related_name='interaction_stats'
+    )
+    total_count = models.PositiveIntegerField(default=0)   # 전체 상호작용 수
+    recent_count = models.PositiveIntegerField(default=0)  # 최근 7일 상호작용 수 (시간 버킷 롤업)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'content_interaction_stats'
+        indexes = [
+            models.Index(fields=['total_count']),
+            models.Index(fields=['recent_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_id} (total={self.total_count}, recent={self.recent_count})"
+
+
+class ContentInteractionHourly(models.Model):
+    """콘텐츠별 시간 단위 상호작용 버킷 (최근 7일 카운트 롤업 원천)"""
+    content = models.ForeignKey(
+        'items.ContentDetailCommon',
+        on_delete=models.CASCADE,
+        db_column='content_id',
+        to_field='contentid',
+        related_name='interaction_hourly'
+    )
+    hour = models.DateTimeField()  # 정시 단위로 절삭된 시각
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'content_interaction_hourly'
+        unique_together = ('content', 'hour')
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from django.db import connection, transaction, DatabaseError
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionStatsService:
+    """
+    콘텐츠별 상호작용 카운터 관리
+    - 기록: 상호작용 생성 시 전체/최근 카운트와 시간 버킷을 UPSERT 로 1씩 증가
+    - 롤업: 시간 버킷 합계로 최근 7일 카운트 재계산, 오래된 버킷 정리
+    - 정합성 복구: ContentInteraction 기준 전체 카운트 재집계 (삭제분 반영)
+    """
+    RECENT_WINDOW = timedelta(days=7)
+    BUCKET_RETENTION = timedelta(days=8)
+
+    @staticmethod
+    def _truncate_hour(ts):
+        return ts.replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def record_interaction(cls, content_id: int, timestamp=None):
+        """상호작용 1건 반영 (행 잠금 없이 원자적 증가)"""
+        hour = cls._truncate_hour(timestamp or timezone.now())
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO content_interaction_hourly (content_id, hour, count)
+                VALUES (%s, %s, 1)
+                ON CONFLICT (content_id, hour)
+                DO UPDATE SET count = content_interaction_hourly.count + 1
+                """,
+                [content_id, hour]
+            )
+            cursor.execute(
+                """
+                INSERT INTO content_interaction_stats (content_id, total_count, recent_count, updated_at)
+                VALUES (%s, 1, 1, %s)
+                ON CONFLICT (content_id)
+                DO UPDATE SET total_count = content_interaction_stats.total_count + 1,
+                              recent_count = content_interaction_stats.recent_count + 1,
+                              updated_at = EXCLUDED.updated_at
+                """,
+                [content_id, now]
+            )
+
+    @classmethod
+    @transaction.atomic
+    def rollup_recent_counts(cls):
+        """시간 버킷으로 최근 7일 카운트 재계산 후 보존 기간 지난 버킷 삭제"""
+        now = timezone.now()
+        window_start = cls._truncate_hour(now - cls.RECENT_WINDOW)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE content_interaction_stats AS s
+                SET recent_count = COALESCE((
+                        SELECT SUM(h.count) FROM content_interaction_hourly AS h
+                        WHERE h.content_id = s.content_id AND h.hour >= %s
+                    ), 0),
+                    updated_at = %s
+                WHERE s.recent_count > 0
+                   OR EXISTS (
+                        SELECT 1 FROM content_interaction_hourly AS h
+                        WHERE h.content_id = s.content_id AND h.hour >= %s
+                   )
+                """,
+                [window_start, now, window_start]
+            )
+            updated = cursor.rowcount
+            cursor.execute(
+                "DELETE FROM content_interaction_hourly WHERE hour < %s",
+                [cls._truncate_hour(now - cls.BUCKET_RETENTION)]
+            )
+            pruned = cursor.rowcount
+        logger.info(f"상호작용 카운터 롤업: {updated}개 갱신, 버킷 {pruned}개 정리")
+        return updated
+
+    @classmethod
+    @transaction.atomic
+    def rebuild_all(cls):
+        """ContentInteraction 원본으로 카운터/버킷 전체 재구성 (야간 정합성 복구)"""
+        now = timezone.now()
+        window_start = cls._truncate_hour(now - cls.RECENT_WINDOW)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM content_interaction_hourly")
+                cursor.execute(
+                    """
+                    INSERT INTO content_interaction_hourly (content_id, hour, count)
+                    SELECT content_id, date_trunc('hour', timestamp), COUNT(*)
+                    FROM content_interaction
+                    WHERE user_id IS NOT NULL AND timestamp >= %s
+                    GROUP BY content_id, date_trunc('hour', timestamp)
+                    """,
+                    [cls._truncate_hour(now - cls.BUCKET_RETENTION)]
+                )
+                cursor.execute("DELETE FROM content_interaction_stats")
+                cursor.execute(
+                    """
+                    INSERT INTO content_interaction_stats (content_id, total_count, recent_count, updated_at)
+                    SELECT content_id,
+                           COUNT(*),
+                           COUNT(*) FILTER (WHERE timestamp >= %s),
+                           %s
+                    FROM content_interaction
+                    WHERE user_id IS NOT NULL
+                    GROUP BY content_id
+                    """,
+                    [window_start, now]
+                )
+                rebuilt = cursor.rowcount
+        except DatabaseError as e:
+            logger.error(f"상호작용 카운터 재구성 실패: {str(e)}", exc_info=True)
+            raise
+        logger.info(f"상호작용 카운터 재구성: {rebuilt}개 콘텐츠")
+        return rebuilt
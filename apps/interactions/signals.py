@@ -1,12 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.db import transaction
 from .models import ContentInteraction
 from .tasks import cleanup_old_interactions
+from .services.interaction_stats import InteractionStatsService
 from apps.users.services.preference_service import PreferenceService
+from apps.recommender.services.recommendation_cache import RecommendationCacheGeneration
 from celery import shared_task
 import logging
-from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,28 +17,47 @@ def handle_interaction_update(sender, instance, **kwargs):
         cleanup_old_interactions.delay(instance.user_id)
 
     # 1. 조건 검증
-    if instance.action_type not in PreferenceService.ACTION_WEIGHTS:
+    if instance.action_type not in PreferenceService.ACTION_WEIGHTS or instance.user_id is None:
         return
-    
-    # 2. 트랜잭션 완료 보장
+
+    # 2. 트랜잭션 완료 후 디바운스 예약 (연속 상호작용은 사용자당 1회 갱신으로 병합)
+    #    신규 상호작용은 증분 갱신, 기존 상호작용 수정은 전체 재계산
+    user_id = instance.user_id
+    full = not kwargs.get('created', False)
+    transaction.on_commit(
+        lambda: PreferenceService.schedule_realtime_update(user_id, full=full)
+    )
+
+@receiver(post_delete, sender=ContentInteraction)
+def handle_interaction_delete(sender, instance, **kwargs):
+    """삭제된 상호작용은 누적 벡터에서 뺄 수 없으므로 전체 재계산 예약 (cleanup_old_interactions 정리 포함)"""
+    if instance.action_type not in PreferenceService.ACTION_WEIGHTS or instance.user_id is None:
+        return
+
+    user_id = instance.user_id
     transaction.on_commit(
-        lambda: PreferenceService.delay_realtime_update(instance.user_id)
+        lambda: PreferenceService.schedule_realtime_update(user_id, full=True)
     )
 
+@receiver(post_save, sender=ContentInteraction)
+def update_interaction_stats(sender, instance, created, **kwargs):
+    """콘텐츠별 상호작용 카운터 증가 (숨은 명소/핫플 섹션용)"""
+    if not created or instance.user_id is None:
+        return
+
+    def record():
+        try:
+            InteractionStatsService.record_interaction(instance.content_id, instance.timestamp)
+        except Exception as e:
+            logger.error(f"상호작용 카운터 갱신 실패: {str(e)}", exc_info=True)
+
+    # 상호작용 저장 트랜잭션과 분리 (카운터 실패가 저장을 롤백하지 않도록)
+    transaction.on_commit(record)
+
 @receiver(post_save, sender=ContentInteraction)
 def clear_user_recommendation_cache(sender, instance, **kwargs):
-    """사용자 상호작용 발생 시 추천 캐시 무효화"""
-    try:
-        user = instance.user
-        if user.is_authenticated:
-            # 캐시 키 패턴 생성 (예: "rec:42:m*")
-            cache_pattern = f"rec:{user.id}:m*"
-            
-            # Redis 패턴 삭제
-            deleted_count = cache.delete_pattern(cache_pattern)
-            
-            logger.info(
-                f"사용자 {user.id} 캐시 무효화: {cache_pattern}, 삭제된 키 수: {deleted_count}"
-            )
-    except Exception as e:
-        logger.error(f"캐시 삭제 실패: {str(e)}", exc_info=True)
\ No newline at end of file
+    """사용자 상호작용 발생 시 추천 캐시 무효화 (세대 번호 증가)"""
+    if instance.user_id is None:
+        return
+    RecommendationCacheGeneration.bump(instance.user_id)
+    logger.info(f"사용자 {instance.user_id} 추천 캐시 세대 증가")
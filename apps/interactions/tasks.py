@@ -1,6 +1,7 @@
 from celery import shared_task
 from django.conf import settings
 from .models import ContentInteraction
+from .services.interaction_stats import InteractionStatsService
 
 @shared_task(queue='maintenance')
 def cleanup_old_interactions(user_id):
@@ -12,4 +13,13 @@ def cleanup_old_interactions(user_id):
             .order_by('timestamp') \
             .values_list('id', flat=True)[:excess]
             
+        # 삭제 행마다 post_delete 수신기가 해당 사용자 프로필 전체 재계산 예약
         ContentInteraction.objects.filter(id__in=list(oldest_ids)).delete()
+
+
+@shared_task(queue='maintenance')
+def rollup_interaction_stats(full=False):
+    """콘텐츠별 최근 7일 카운터 롤업 (full=True 면 원본 기준 전체 재구성)"""
+    if full:
+        return InteractionStatsService.rebuild_all()
+    return InteractionStatsService.rollup_recent_counts()
@@ -1,3 +1,83 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from apps.interactions import signals
+from apps.interactions.services import interaction_stats
+from apps.interactions.services.interaction_stats import InteractionStatsService
+
+NOW = datetime(2026, 10, 17, 12, 34, 56, tzinfo=dt_timezone.utc)
+
+
+class InteractionStatsServiceTests(SimpleTestCase):
+    """카운터 UPSERT/롤업이 시간 버킷 경계와 보존 기간을 올바르게 넘기는지 확인 (DB 대신 커서 대역)"""
+
+    def setUp(self):
+        self.connection = mock.MagicMock()
+        self.cursor = self.connection.cursor.return_value.__enter__.return_value
+        self.cursor.rowcount = 3
+        for target in [
+            mock.patch.object(interaction_stats, 'connection', self.connection),
+            mock.patch.object(interaction_stats.timezone, 'now', return_value=NOW),
+            mock.patch('django.db.transaction.Atomic.__enter__', return_value=None),
+            mock.patch('django.db.transaction.Atomic.__exit__', return_value=False),
+        ]:
+            target.start()
+            self.addCleanup(target.stop)
+
+    def executed(self):
+        return [(call.args[0], call.args[1] if len(call.args) > 1 else None)
+                for call in self.cursor.execute.call_args_list]
+
+    def test_record_interaction_upserts_hour_bucket_and_counters(self):
+        timestamp = NOW - timedelta(hours=2)
+        InteractionStatsService.record_interaction(42, timestamp)
+
+        (bucket_sql, bucket_params), (stats_sql, stats_params) = self.executed()
+        self.assertIn('content_interaction_hourly', bucket_sql)
+        self.assertIn('ON CONFLICT (content_id, hour)', bucket_sql)
+        self.assertEqual(bucket_params, [42, datetime(2026, 10, 17, 10, tzinfo=dt_timezone.utc)])
+        self.assertIn('content_interaction_stats', stats_sql)
+        self.assertIn('recent_count = content_interaction_stats.recent_count + 1', stats_sql)
+        self.assertEqual(stats_params, [42, NOW])
+
+    def test_rollup_uses_recent_window_and_prunes_expired_buckets(self):
+        self.assertEqual(InteractionStatsService.rollup_recent_counts(), 3)
+
+        (update_sql, update_params), (delete_sql, delete_params) = self.executed()
+        window_start = datetime(2026, 10, 10, 12, tzinfo=dt_timezone.utc)
+        self.assertTrue(update_sql.strip().startswith('UPDATE content_interaction_stats'))
+        self.assertEqual(update_params, [window_start, NOW, window_start])
+        self.assertIn('DELETE FROM content_interaction_hourly', delete_sql)
+        self.assertEqual(delete_params, [datetime(2026, 10, 9, 12, tzinfo=dt_timezone.utc)])
+
+
+class InteractionStatsSignalTests(SimpleTestCase):
+    """신규 상호작용만 커밋 후 카운터에 반영"""
+
+    def interaction(self, user_id=1):
+        return SimpleNamespace(user_id=user_id, content_id=42, timestamp=NOW)
+
+    def test_created_interaction_is_recorded_after_commit(self):
+        instance = self.interaction()
+        with mock.patch.object(signals.transaction, 'on_commit') as on_commit, \
+                mock.patch.object(InteractionStatsService, 'record_interaction') as record:
+            signals.update_interaction_stats(sender=None, instance=instance, created=True)
+            record.assert_not_called()
+            on_commit.call_args.args[0]()
+        record.assert_called_once_with(42, NOW)
+
+    def test_updates_and_anonymous_interactions_are_ignored(self):
+        with mock.patch.object(signals.transaction, 'on_commit') as on_commit:
+            signals.update_interaction_stats(sender=None, instance=self.interaction(), created=False)
+            signals.update_interaction_stats(sender=None, instance=self.interaction(None), created=True)
+        on_commit.assert_not_called()
+
+    def test_counter_failure_does_not_propagate(self):
+        with mock.patch.object(signals.transaction, 'on_commit') as on_commit, \
+                mock.patch.object(InteractionStatsService, 'record_interaction', side_effect=RuntimeError):
+            signals.update_interaction_stats(sender=None, instance=self.interaction(), created=True)
+            with self.assertLogs(signals.logger, 'ERROR'):
+                on_commit.call_args.args[0]()
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2025-06-26 10:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0004_alter_contentdetailcommon_summarize'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='contentsummarize',
+            name='autumn_sim',
+        ),
+        migrations.RemoveField(
+            model_name='contentsummarize',
+            name='spring_sim',
+        ),
+        migrations.RemoveField(
+            model_name='contentsummarize',
+            name='summer_sim',
+        ),
+        migrations.RemoveField(
+            model_name='contentsummarize',
+            name='winter_sim',
+        ),
+    ]
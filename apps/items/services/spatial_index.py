@@ -0,0 +1,222 @@
+import math
+import threading
+import time
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+from django.core.cache import cache
+from apps.items.models import ContentDetailCommon
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.195  # 위도 1도당 거리(km)
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(lat: float, lng: float, precision: int = 5) -> str:
+    """위경도를 geohash 문자열로 변환 (precision 5 ≈ 4.9km × 4.9km 셀)"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (target[0] + target[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            target[0] = mid
+        else:
+            target[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def decode_geohash_center(geohash: str) -> Tuple[float, float]:
+    """geohash 셀의 중심 (lat, lng) 반환"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if (value >> shift) & 1:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+class SpatialIndex:
+    """
+    ContentDetailCommon.mapx/mapy 기반 격자(grid) 공간 인덱스
+    - 위경도를 CELL_DEG 크기의 셀로 나눠 콘텐츠 인덱스를 보관
+    - 반경 질의 시 겹치는 셀만 후보로 뽑아 하버사인 거리로 최종 필터링
+    """
+    CELL_DEG = 0.1  # 약 11km 격자
+
+    def __init__(self, contentids, lats, lngs, areacodes=None):
+        self.contentids = np.asarray(contentids, dtype=np.int64)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lngs = np.asarray(lngs, dtype=np.float64)
+        # 지역 코드 (없으면 -1)
+        self.areacodes = (
+            np.asarray([-1 if a is None else a for a in areacodes], dtype=np.int64)
+            if areacodes is not None else np.full(self.contentids.size, -1, dtype=np.int64)
+        )
+        self._cells = {}
+
+        if self.contentids.size == 0:
+            return
+
+        cell_y = np.floor(self.lats / self.CELL_DEG).astype(np.int64)
+        cell_x = np.floor(self.lngs / self.CELL_DEG).astype(np.int64)
+
+        # 셀 단위로 정렬 후 연속 구간을 잘라 셀별 인덱스 배열 생성
+        order = np.lexsort((cell_x, cell_y))
+        keys = np.stack([cell_y[order], cell_x[order]], axis=1)
+        unique_keys, starts = np.unique(keys, axis=0, return_index=True)
+        bounds = np.append(starts, order.size)
+        for (cy, cx), start, end in zip(unique_keys, bounds[:-1], bounds[1:]):
+            self._cells[(int(cy), int(cx))] = order[start:end]
+
+    @property
+    def size(self) -> int:
+        return int(self.contentids.size)
+
+    def query_radius(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """반경 내 콘텐츠의 내부 인덱스를 거리 오름차순으로 반환"""
+        if not self._cells:
+            return np.empty(0, dtype=np.int64)
+
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        lng_span = radius_km / (KM_PER_DEGREE * cos_lat)
+
+        y_min = math.floor((lat - lat_span) / self.CELL_DEG)
+        y_max = math.floor((lat + lat_span) / self.CELL_DEG)
+        x_min = math.floor((lng - lng_span) / self.CELL_DEG)
+        x_max = math.floor((lng + lng_span) / self.CELL_DEG)
+
+        candidates = [
+            self._cells[(cy, cx)]
+            for cy in range(y_min, y_max + 1)
+            for cx in range(x_min, x_max + 1)
+            if (cy, cx) in self._cells
+        ]
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+
+        idx = np.concatenate(candidates)
+        distances = self._haversine_km(lat, lng, self.lats[idx], self.lngs[idx])
+        within = distances <= radius_km
+        idx, distances = idx[within], distances[within]
+        return idx[np.argsort(distances, kind='stable')]
+
+    def nearby(self, lat: float, lng: float, radius_km: float) -> Tuple[List[int], Optional[int]]:
+        """반경 조회 1회로 (거리순 콘텐츠 ID, 대표 지역 코드)"""
+        idx = self.query_radius(lat, lng, radius_km)
+        return self.contentids[idx].tolist(), self._dominant_areacode(idx)
+
+    def _dominant_areacode(self, idx: np.ndarray) -> Optional[int]:
+        codes = self.areacodes[idx]
+        codes = codes[codes >= 0]
+        if codes.size == 0:
+            return None
+        values, counts = np.unique(codes, return_counts=True)
+        return int(values[np.argmax(counts)])
+
+    def occupied_geohashes(self, precision: int = 5) -> List[str]:
+        """콘텐츠가 하나 이상 존재하는 geohash 셀 목록"""
+        return sorted({
+            encode_geohash(lat, lng, precision)
+            for lat, lng in zip(self.lats.tolist(), self.lngs.tolist())
+        })
+
+    @staticmethod
+    def _haversine_km(lat, lng, lats, lngs) -> np.ndarray:
+        lat1, lng1 = math.radians(lat), math.radians(lng)
+        lat2, lng2 = np.radians(lats), np.radians(lngs)
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    @classmethod
+    def build(cls) -> "SpatialIndex":
+        """DB의 좌표 컬럼으로 인덱스 생성 (좌표 없는 콘텐츠 제외)"""
+        rows = list(
+            ContentDetailCommon.objects
+            .exclude(mapx__isnull=True)
+            .exclude(mapy__isnull=True)
+            .values_list('contentid', 'mapy', 'mapx', 'areacode')
+        )
+        if not rows:
+            return cls([], [], [])
+        contentids, lats, lngs, areacodes = zip(*rows)
+        return cls(contentids, lats, lngs, areacodes)
+
+
+# 프로세스 단위 싱글톤 상태
+_lock = threading.Lock()
+_index: Optional[SpatialIndex] = None
+_index_version = None
+_last_checked = 0.0
+
+VERSION_KEY = "spatial_index_version"
+VERSION_CHECK_INTERVAL = 30  # 초 단위, 다른 프로세스의 변경 감지 주기
+
+
+def invalidate_spatial_index():
+    """콘텐츠 좌표 변경 시 모든 프로세스의 인덱스 재생성 유도"""
+    global _index
+    with _lock:
+        _index = None
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+    except Exception as e:
+        logger.warning(f"공간 인덱스 버전 갱신 실패: {str(e)}")
+
+
+def get_spatial_index() -> SpatialIndex:
+    """지연 로딩 + 버전 확인 기반 공간 인덱스 반환"""
+    global _index, _index_version, _last_checked
+
+    now = time.monotonic()
+    if _index is not None and now - _last_checked < VERSION_CHECK_INTERVAL:
+        return _index
+
+    with _lock:
+        try:
+            version = cache.get(VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"공간 인덱스 버전 조회 실패: {str(e)}")
+            version = _index_version
+        _last_checked = now
+
+        if _index is None or version != _index_version:
+            started = time.perf_counter()
+            _index = SpatialIndex.build()
+            _index_version = version
+            logger.info(
+                f"공간 인덱스 생성: {_index.size}개 콘텐츠, "
+                f"{(time.perf_counter() - started) * 1000:.1f}ms"
+            )
+        return _index
+
+
+def get_nearby_contents(user_lat: float, user_lng: float, radius_km: int = 20) -> Tuple[List[int], Optional[int]]:
+    """
+    로컬 공간 인덱스로 반경 내 (거리순 콘텐츠 ID 리스트, 대표 지역 코드) 반환 — 반경 조회 1회
+    TourAPI locationBasedList1 호출을 대체
+    """
+    return get_spatial_index().nearby(user_lat, user_lng, radius_km)
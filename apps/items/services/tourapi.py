@@ -1,4 +1,4 @@
-from openai import OpenAI
+from functools import lru_cache
 from typing import Optional, Dict, List, Any
 from django.conf import settings
 from apps.items.models import ContentSummarize
@@ -10,7 +10,11 @@ import json
 logger = logging.getLogger(__name__)
 
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+@lru_cache(maxsize=1)
+def get_openai_client():
+    """OpenAI 클라이언트 (첫 요약 생성 시 import·생성)"""
+    from openai import OpenAI
+    return OpenAI(api_key=settings.OPENAI_API_KEY)
 
 def parse_binary_flag(value, yes_text, no_text):
     if value == "1":
@@ -146,7 +150,7 @@ def gpt_summarize(text: str) -> str:
 텍스트: {text}
 """
     try:
-        response = client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": system_prompt},
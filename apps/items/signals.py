@@ -1,10 +1,15 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import ContentSummarize
+from django.db import transaction
+from .models import ContentDetailCommon
+from .services.spatial_index import invalidate_spatial_index
 
-@receiver(post_save, sender=ContentSummarize, dispatch_uid="update_season_sim")
-def update_similarity(sender, instance, **kwargs):
-    if not hasattr(instance, '_updating_season_sim'):
-        instance._updating_season_sim = True
-        instance.update_season_similarity()
-        del instance._updating_season_sim
\ No newline at end of file
+
+@receiver(post_save, sender=ContentDetailCommon, dispatch_uid="invalidate_spatial_index_on_save")
+@receiver(post_delete, sender=ContentDetailCommon, dispatch_uid="invalidate_spatial_index_on_delete")
+def refresh_spatial_index(sender, instance, **kwargs):
+    """콘텐츠 좌표/지역 코드 변경 시 공간 인덱스 재생성 (커밋 전 행으로 재생성되지 않도록 커밋 후 무효화)"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and not {'mapx', 'mapy', 'areacode'} & set(update_fields):
+        return
+    transaction.on_commit(invalidate_spatial_index)
@@ -1,3 +1,76 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.items import signals
+from apps.items.services.spatial_index import (
+    SpatialIndex, decode_geohash_center, encode_geohash, invalidate_spatial_index
+)
+
+# 서울 시청 부근
+CENTER = (37.5665, 126.9780)
+
+
+def make_index(size=300, seed=1):
+    rng = np.random.default_rng(seed)
+    lats = CENTER[0] + rng.uniform(-0.5, 0.5, size)
+    lngs = CENTER[1] + rng.uniform(-0.5, 0.5, size)
+    areacodes = [None if i % 10 == 0 else (1 if i % 3 else 31) for i in range(size)]
+    return SpatialIndex(np.arange(1, size + 1), lats, lngs, areacodes)
+
+
+class SpatialIndexTests(SimpleTestCase):
+    """격자 반경 질의가 전수 하버사인 거리 필터와 같은지 확인"""
+
+    def setUp(self):
+        self.index = make_index()
+
+    def brute_force(self, lat, lng, radius_km):
+        distances = SpatialIndex._haversine_km(lat, lng, self.index.lats, self.index.lngs)
+        idx = np.flatnonzero(distances <= radius_km)
+        return idx[np.argsort(distances[idx], kind='stable')]
+
+    def test_query_radius_matches_brute_force(self):
+        for radius_km in (1, 5, 20, 40):
+            with self.subTest(radius_km=radius_km):
+                np.testing.assert_array_equal(
+                    self.index.query_radius(*CENTER, radius_km), self.brute_force(*CENTER, radius_km)
+                )
+
+    def test_nearby_returns_ids_and_dominant_areacode(self):
+        contentids, areacode = self.index.nearby(*CENTER, 20)
+
+        expected = self.brute_force(*CENTER, 20)
+        self.assertEqual(contentids, self.index.contentids[expected].tolist())
+        codes = self.index.areacodes[expected]
+        values, counts = np.unique(codes[codes >= 0], return_counts=True)
+        self.assertEqual(areacode, int(values[np.argmax(counts)]))
+
+    def test_empty_index(self):
+        index = SpatialIndex([], [], [])
+        self.assertEqual(index.nearby(*CENTER, 20), ([], None))
+
+    def test_geohash_center_round_trip(self):
+        geohash = encode_geohash(*CENTER)
+        self.assertEqual(encode_geohash(*decode_geohash_center(geohash)), geohash)
+
+
+class SpatialIndexSignalTests(SimpleTestCase):
+    """좌표/지역 코드 변경 시 커밋 후에만 인덱스 무효화"""
+
+    def test_invalidation_is_deferred_until_commit(self):
+        with mock.patch.object(signals.transaction, 'on_commit') as on_commit:
+            signals.refresh_spatial_index(sender=None, instance=SimpleNamespace(), update_fields=None)
+        on_commit.assert_called_once_with(invalidate_spatial_index)
+
+    def test_unrelated_field_update_is_ignored(self):
+        with mock.patch.object(signals.transaction, 'on_commit') as on_commit:
+            signals.refresh_spatial_index(
+                sender=None, instance=SimpleNamespace(), update_fields=frozenset({'title'})
+            )
+            signals.refresh_spatial_index(
+                sender=None, instance=SimpleNamespace(), update_fields=frozenset({'areacode'})
+            )
+        on_commit.assert_called_once_with(invalidate_spatial_index)
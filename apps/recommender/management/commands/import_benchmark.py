@@ -0,0 +1,84 @@
+import json
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Django / Celery 기동 경로에서 import 되는 모듈 (Celery autodiscover 대상 tasks 포함)
+DEFAULT_MODULES = [
+    'sumteuyeo.urls',
+    'sumteuyeo.celery',
+    'apps.recommender.models',
+    'apps.recommender.services.chatbot.views',
+    'apps.users.tasks',
+    'apps.interactions.tasks',
+    'apps.recommender.tasks',
+]
+# 기동 시 import 되면 안 되는 무거운 패키지 (첫 사용 시 지연 import)
+HEAVY_MODULES = [
+    'torch', 'transformers', 'sentence_transformers', 'sklearn',
+    'scipy', 'bareunpy', 'openai', 'tqdm', 'joblib',
+]
+
+# 새 인터프리터에서 django.setup() + 대상 모듈 import 시간 측정
+PROBE = """
+import importlib, json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_seconds = time.perf_counter() - started
+importlib.import_module(sys.argv[1])
+print(json.dumps({
+    'setup': setup_seconds,
+    'total': time.perf_counter() - started,
+    'heavy': [m for m in json.loads(sys.argv[2]) if m in sys.modules],
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = '기동 경로 모듈 import 시간 측정 (모듈별 새 프로세스, 예산 초과 또는 무거운 패키지 import 시 실패)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modules', nargs='*',
+                            help='측정할 모듈 (기본값: Django/Celery 기동 경로 모듈)')
+        parser.add_argument('--budget', type=float, default=1.0,
+                            help='모듈별 허용 시간, 초 (django.setup 포함, 기본값: 1.0)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='반복 측정 횟수, 최솟값 사용 (기본값: 3)')
+
+    def handle(self, *args, **options):
+        budget = options['budget']
+        failures = []
+
+        for module in options['modules'] or DEFAULT_MODULES:
+            runs = [self._probe(module) for _ in range(max(1, options['repeat']))]
+            best = min(runs, key=lambda run: run['total'])
+            heavy = sorted({name for run in runs for name in run['heavy']})
+
+            line = (
+                f"{module}: {best['total'] * 1000:.0f}ms "
+                f"(django.setup {best['setup'] * 1000:.0f}ms)"
+            )
+            if heavy:
+                line += f" 무거운 모듈: {', '.join(heavy)}"
+
+            if best['total'] > budget or heavy:
+                failures.append(module)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if failures:
+            raise CommandError(f"import 예산 초과 ({budget:.1f}초): {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f'모든 모듈이 예산({budget:.1f}초) 이내'))
+
+    @staticmethod
+    def _probe(module: str) -> dict:
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE, module, json.dumps(HEAVY_MODULES)],
+            capture_output=True, text=True, cwd=str(settings.BASE_DIR)
+        )
+        if result.returncode != 0:
+            raise CommandError(f"{module} import 실패:\n{result.stderr.strip()}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from apps.recommender.services.model_registry import ModelRegistry
+
+
+class Command(BaseCommand):
+    help = '모델 사전 적재 및 모델별 적재 시간 / RSS 증가량 보고'
+
+    def add_arguments(self, parser):
+        parser.add_argument('keys', nargs='*',
+                            help='적재할 모델 키 "종류:모델명" (기본값: settings.MODEL_WARMUP)')
+
+    def handle(self, *args, **options):
+        rss_before = ModelRegistry.process_rss()
+        report = ModelRegistry.warm_up(options['keys'] or None)
+
+        if not report:
+            self.stdout.write('적재된 모델 없음')
+            return
+
+        for stats in report:
+            self.stdout.write(
+                f"{stats['key']}: {stats['load_seconds']:.1f}초, "
+                f"RSS +{stats['rss_bytes'] / 2**20:.0f}MB"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"총 {len(report)}개 모델, 프로세스 RSS "
+            f"{rss_before / 2**20:.0f}MB → {ModelRegistry.process_rss() / 2**20:.0f}MB"
+        ))
@@ -1,11 +1,13 @@
 # apps/items/management/commands/generate_feature_vectors.py
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db.models import F, Q
 from apps.items.models import ContentDetailCommon
 from apps.recommender.models import ContentFeature
+from apps.recommender.services.feature_matrix import invalidate_feature_matrix
+from apps.recommender.services.encoding_pool import EncodingPool
+from apps.recommender.services.embedding_cache import CachedEncoder
 from tqdm import tqdm
 import logging
-import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,18 @@ class Command(BaseCommand):
             default=1000,
             help='Number of records to process at a time'
         )
+        parser.add_argument(
+            '--encode-batch-size',
+            type=int,
+            default=256,
+            help='Number of texts per encoder batch'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of encoding processes (default: settings.EMBEDDING_WORKERS or CPU count)'
+        )
         parser.add_argument(
             '--force',
             action='store_true',
@@ -35,60 +49,61 @@ class Command(BaseCommand):
         force_update = options['force']
         verbose = options['verbose']
 
-        # 전체 콘텐츠 수 계산
-        total_count = ContentDetailCommon.objects.count()
+        # 강제 업데이트가 아니면 벡터가 없거나 생성 이후 수정된(modifiedtime) 콘텐츠만 대상
+        qs = ContentDetailCommon.objects.defer('overview')
+        if not force_update:
+            qs = qs.filter(
+                Q(feature__isnull=True)
+                | Q(feature__feature_vector__isnull=True)
+                | Q(feature__source_modifiedtime__isnull=True)
+                | Q(feature__source_modifiedtime__lt=F('modifiedtime'))
+            )
+
+        total_count = qs.count()
         success_count = 0
         error_count = 0
 
-        # 진행률 표시 설정
-        qs = ContentDetailCommon.objects.all().iterator(chunk_size=chunk_size)
-        if verbose:
-            qs = tqdm(qs, total=total_count, desc="Processing contents")
-
-        for content in qs:
-            try:
-                with transaction.atomic():
-                    # ContentFeature 객체 생성/조회
-                    feature, created = ContentFeature.objects.get_or_create(
-                        detail=content
-                    )
+        progress = tqdm(total=total_count, desc="Processing contents") if verbose else None
 
-                    # 기존 벡터가 있고 강제 업데이트가 아닌 경우 스킵
-                    def is_valid_vector(vec):
-                        # None, 빈 리스트, [None], [null] 등 모두 False로 간주
-                        if vec is None:
-                            return False
-                        if not isinstance(vec, (list, np.ndarray)):
-                            return False
-                        if len(vec) == 0:
-                            return False
-                        # 모든 값이 None이거나 null인 경우
-                        if all(v is None for v in vec):
-                            return False
-                        return True
+        # id 기준 키셋 페이지네이션 (처리된 항목이 필터에서 빠져도 안전)
+        last_id = 0
+        with EncodingPool(ContentFeature.get_text_model(), options['workers']) as pool:
+            # 요약문이 바뀌지 않은 콘텐츠는 임베딩 캐시 재사용 (--force 재생성도 변경분만 인코딩)
+            encoder = CachedEncoder(pool, ContentFeature.TEXT_MODEL_NAME)
+            while True:
+                chunk = list(qs.filter(id__gt=last_id).order_by('id')[:chunk_size])
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
 
-                    # 사용 예시
-                    if not created and not force_update and is_valid_vector(feature.feature_vector):
-                        continue
+                try:
+                    success, errors = ContentFeature.bulk_update_feature_vectors(
+                        chunk, batch_size=options['encode_batch_size'], pool=encoder
+                    )
+                    success_count += success
+                    error_count += errors
+                except Exception as e:
+                    logger.error(
+                        f"Failed to process chunk ending at id={last_id}: {str(e)}",
+                        exc_info=True
+                    )
+                    error_count += len(chunk)
 
+                if progress is not None:
+                    progress.update(len(chunk))
 
-                    # 특징 벡터 업데이트
-                    if feature.update_feature_vector():
-                        success_count += 1
-                    else:
-                        error_count += 1
+        if progress is not None:
+            progress.close()
 
-            except Exception as e:
-                logger.error(
-                    f"Failed to process contentid={content.contentid}: {str(e)}",
-                    exc_info=True
-                )
-                error_count += 1
+        # 인메모리 특징 행렬 갱신 유도
+        if success_count > 0:
+            invalidate_feature_matrix()
 
         # 결과 출력
         self.stdout.write("\nProcessing complete:")
         self.stdout.write(f" - Total items:   {total_count}")
         self.stdout.write(f" - Success:       {success_count}")
         self.stdout.write(f" - Errors:        {error_count}")
+        self.stdout.write(f" - Cache hits:    {encoder.hits}")
         if error_count > 0:
             self.stdout.write(self.style.ERROR("Some errors occurred. Check logs."))
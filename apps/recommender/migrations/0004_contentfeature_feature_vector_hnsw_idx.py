@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2025-06-20 10:12
+
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommender', '0003_alter_contentfeature_detail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contentfeature',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['feature_vector'], m=16, name='feature_vector_hnsw_idx', opclasses=['vector_cosine_ops']),
+        ),
+    ]
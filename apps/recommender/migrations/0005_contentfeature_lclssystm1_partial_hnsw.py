@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2025-06-21 14:03
+
+import pgvector.django.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommender', '0004_contentfeature_feature_vector_hnsw_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentfeature',
+            name='lclssystm1',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE content_feature AS cf
+                SET lclssystm1 = d.lclssystm1
+                FROM content_detail_common AS d
+                WHERE cf.detail_id = d.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='contentfeature',
+            index=pgvector.django.indexes.HnswIndex(condition=models.Q(('lclssystm1', 'FD')), ef_construction=64, fields=['feature_vector'], m=16, name='feature_vector_food_hnsw_idx', opclasses=['vector_cosine_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='contentfeature',
+            index=pgvector.django.indexes.HnswIndex(condition=models.Q(('lclssystm1__in', ['EX', 'HS', 'LS', 'NA', 'SH', 'VE'])), ef_construction=64, fields=['feature_vector'], m=16, name='feature_vector_tour_hnsw_idx', opclasses=['vector_cosine_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='contentfeature',
+            index=models.Index(fields=['lclssystm1'], name='content_feature_lcls1_idx'),
+        ),
+    ]
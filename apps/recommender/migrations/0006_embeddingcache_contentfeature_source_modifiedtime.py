@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2025-06-25 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommender', '0005_contentfeature_lclssystm1_partial_hnsw'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentfeature',
+            name='source_modifiedtime',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='EmbeddingCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=100)),
+                ('text_hash', models.CharField(max_length=64)),
+                ('vector', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'embedding_cache',
+                'unique_together': {('model_name', 'text_hash')},
+            },
+        ),
+    ]
@@ -1,24 +1,22 @@
 from django.db import models
 from pgvector.django import VectorField, HnswIndex
-from sentence_transformers import SentenceTransformer
 from apps.items.services.tourapi import get_summarize_content
-from functools import lru_cache
 import numpy as np
-import joblib
-from apps.items.models import ContentDetailCommon
-from sklearn.preprocessing import normalize
-import threading
+from apps.items.models import ContentDetailCommon, ContentSummarize
+from apps.recommender.services.model_registry import get_sentence_transformer
 import os
 import logging
 from sumteuyeo.settings import BASE_DIR
 from pathlib import Path
-from tqdm import tqdm
+from django.db import transaction
 from django.db.models import F
 
 
-_lock = threading.Lock()
 logger = logging.getLogger(__name__)
 
+TOURIST_CATEGORIES = ["EX", "HS", "LS", "NA", "SH", "VE"]  # 관광지 카테고리
+FOOD_CATEGORY = "FD"  # 음식점 카테고리
+
 
 class ContentFeature(models.Model):
     detail = models.OneToOneField(
@@ -29,16 +27,19 @@ class ContentFeature(models.Model):
         related_name='feature'
     )
     feature_vector = VectorField(dimensions=484, null=True, blank=True)
+    # 카테고리별 부분 인덱스(partial HNSW)를 위한 대분류 비정규화 컬럼
+    lclssystm1 = models.TextField(blank=True, null=True)
+    # 벡터 생성 시점의 ContentDetailCommon.modifiedtime (변경 감지용)
+    source_modifiedtime = models.DateTimeField(null=True, blank=True)
 
-    _text_model = None
+    TEXT_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
     _category_encoders = {}
+    CATEGORY_DIM_SIZES = {'lcls1': 40, 'lcls2': 30, 'lcls3': 30}  # 레벨별 차원 크기
 
     @classmethod
     def get_text_model(cls):
-        with _lock:
-            if cls._text_model is None:
-                cls._text_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        return cls._text_model
+        # 프로세스 공유 레지스트리 (첫 사용 시 1회 적재)
+        return get_sentence_transformer(cls.TEXT_MODEL_NAME)
 
     @classmethod
     def get_category_encoder(cls, level):
@@ -51,15 +52,114 @@ class ContentFeature(models.Model):
             if not encoder_path.exists():
                 raise FileNotFoundError(f"Encoder file not found: {encoder_path}")
                 
+            import joblib  # 인코더 최초 적재 시에만 필요
             encoder_data = joblib.load(encoder_path)
             cls._category_encoders[level] = encoder_data
         return cls._category_encoders[level]
 
 
-    def get_text_embedding(self):
-        summary_text = get_summarize_content(self.detail.contentid, self.detail.contenttypeid)
+    def get_text_embedding(self, summary_text=None):
+        if summary_text is None:
+            summary_text = get_summarize_content(self.detail.contentid, self.detail.contenttypeid)
         return self.get_text_model().encode(summary_text)
 
+    @classmethod
+    def get_category_embeddings(cls, details) -> np.ndarray:
+        """여러 콘텐츠의 카테고리 임베딩 (N×100, get_category_embedding 과 동일 결과)"""
+        total = np.zeros((len(details), 100), dtype=np.float32)
+        start_idx = 0
+        for i, (level, target_dim) in enumerate(cls.CATEGORY_DIM_SIZES.items()):
+            values = [getattr(detail, f'lclssystm{i+1}', None) for detail in details]
+            present = np.array([bool(v) for v in values])
+            if present.any():
+                encoder_data = cls.get_category_encoder(level)
+                mapping = encoder_data['mapping']
+                unknown_index = encoder_data['unknown_index']
+                embedding_matrix = np.asarray(encoder_data['embedding_matrix'])
+
+                idx = np.array([mapping.get(v, unknown_index) if v else unknown_index for v in values])
+                embeddings = embedding_matrix[idx][:, :target_dim]
+                total[present, start_idx:start_idx + target_dim] = embeddings[present]
+            start_idx += target_dim
+        return total
+
+    @classmethod
+    def bulk_update_feature_vectors(cls, details, batch_size: int = 256, pool=None):
+        """
+        여러 콘텐츠 특징 벡터 일괄 생성 → (성공 수, 실패 수)
+        - 요약문 일괄 조회 (DB에 없는 항목만 개별 생성)
+        - 텍스트 배치 인코딩 (pool: EncodingPool / CachedEncoder 등 encode(texts, batch_size) 제공 객체)
+          + 카테고리 임베딩 벡터화
+        - bulk_create / bulk_update 로 저장
+        """
+        details = list(details)
+        if not details:
+            return 0, 0
+
+        summaries = dict(
+            ContentSummarize.objects
+            .filter(contentid__in=[detail.contentid for detail in details])
+            .values_list('contentid', 'summarize_text')
+        )
+
+        valid_details, texts, failed = [], [], []
+        for detail in details:
+            summary_text = summaries.get(detail.contentid)
+            if summary_text is None and detail.contentid and detail.contenttypeid:
+                try:
+                    summary_text = get_summarize_content(detail.contentid, detail.contenttypeid)
+                except Exception as e:
+                    logger.error(f"[ContentFeature] Summary fetch failed for contentid={detail.contentid}: {str(e)}")
+                    summary_text = None
+            if not summary_text or not summary_text.strip():
+                failed.append(detail)
+                continue
+            valid_details.append(detail)
+            texts.append(summary_text)
+
+        vectors = np.empty((0, 484), dtype=np.float32)
+        if valid_details:
+            if pool is not None:
+                text_embs = pool.encode(texts, batch_size=batch_size)
+            else:
+                text_embs = cls.get_text_model().encode(
+                    texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+                ).astype(np.float32)
+            cat_embs = cls.get_category_embeddings(valid_details)
+            vectors = np.hstack([text_embs, cat_embs])
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms < 1e-12, 1.0, norms)
+
+        existing = cls.objects.in_bulk([detail.pk for detail in details])
+        to_create, to_update = [], []
+        for detail, vector in zip(valid_details, vectors):
+            feature = existing.get(detail.pk) or cls(detail=detail)
+            feature.feature_vector = vector.tolist()
+            feature.lclssystm1 = detail.lclssystm1
+            feature.source_modifiedtime = detail.modifiedtime
+            (to_update if detail.pk in existing else to_create).append(feature)
+
+        # 요약문이 없는 콘텐츠는 기존 벡터 제거 (단건 경로와 동일)
+        for detail in failed:
+            logger.error(f"[ContentFeature] Feature vector update failed for contentid={detail.contentid}: Empty summary text")
+            feature = existing.get(detail.pk)
+            if feature is not None and feature.feature_vector is not None:
+                feature.feature_vector = None
+                to_update.append(feature)
+
+        with transaction.atomic():
+            if to_create:
+                # 동시 실행으로 먼저 생성된 행이 있으면 새 벡터로 덮어씀 (ignore_conflicts 는 새 벡터를 버림)
+                cls.objects.bulk_create(
+                    to_create, batch_size=batch_size, update_conflicts=True, unique_fields=['detail'],
+                    update_fields=['feature_vector', 'lclssystm1', 'source_modifiedtime'],
+                )
+            if to_update:
+                cls.objects.bulk_update(
+                    to_update, ['feature_vector', 'lclssystm1', 'source_modifiedtime'], batch_size=batch_size
+                )
+        return len(valid_details), len(failed)
+
     def get_category_embedding(self):
         total_embedding = np.zeros(100, dtype=np.float32)
         dim_sizes = {'lcls1': 40, 'lcls2': 30, 'lcls3': 30}  # 레벨별 차원 크기
@@ -100,7 +200,7 @@ class ContentFeature(models.Model):
             if not summary_text or not summary_text.strip():
                 raise ValueError("Empty summary text")
 
-            text_emb = self.get_text_embedding()
+            text_emb = self.get_text_embedding(summary_text)
             if text_emb is None or len(text_emb) != 384:
                 raise ValueError("Invalid text embedding")
 
@@ -112,9 +212,12 @@ class ContentFeature(models.Model):
             if len(combined) != 484:
                 raise ValueError(f"Invalid combined vector dimension: {len(combined)}")
 
-            combined_normalized = normalize(combined.reshape(1, -1), norm='l2', axis=1).flatten()
+            combined_norm = np.linalg.norm(combined)
+            combined_normalized = combined / combined_norm if combined_norm > 0 else combined
             self.feature_vector = combined_normalized.tolist()
-            self.save(update_fields=['feature_vector'])
+            self.lclssystm1 = self.detail.lclssystm1
+            self.source_modifiedtime = self.detail.modifiedtime
+            self.save(update_fields=['feature_vector', 'lclssystm1', 'source_modifiedtime'])
             return True
 
         except Exception as e:
@@ -131,4 +234,41 @@ class ContentFeature(models.Model):
 
     class Meta:
         db_table = 'content_feature'
-        indexes = []
\ No newline at end of file
+        indexes = [
+            HnswIndex(
+                fields=['feature_vector'],
+                name='feature_vector_hnsw_idx',
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops']
+            ),
+            HnswIndex(
+                fields=['feature_vector'],
+                name='feature_vector_food_hnsw_idx',
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+                condition=models.Q(lclssystm1=FOOD_CATEGORY)
+            ),
+            HnswIndex(
+                fields=['feature_vector'],
+                name='feature_vector_tour_hnsw_idx',
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+                condition=models.Q(lclssystm1__in=TOURIST_CATEGORIES)
+            ),
+            models.Index(fields=['lclssystm1'], name='content_feature_lcls1_idx'),
+        ]
+
+
+class EmbeddingCache(models.Model):
+    """(모델명, 입력 텍스트 SHA-256) → 임베딩 캐시 (변경 없는 텍스트 재인코딩 방지)"""
+    model_name = models.CharField(max_length=100)
+    text_hash = models.CharField(max_length=64)
+    vector = models.BinaryField()  # float32 바이트열
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'embedding_cache'
+        unique_together = ('model_name', 'text_hash')
@@ -401,7 +401,20 @@ if __name__ == '__main__':
 
     print(f"  총 {len(texts_for_embedding)}개의 유효한 요약에 대해 임베딩을 생성합니다...")
 
-    embeddings = model.encode(texts_for_embedding, convert_to_numpy=True, show_progress_bar=True)
+    # CPU 코어 수만큼 인코딩 프로세스 사용 (EMBEDDING_WORKERS 로 조정, 1이면 단일 프로세스)
+    embedding_workers = int(os.getenv("EMBEDDING_WORKERS") or os.cpu_count() or 1)
+    if embedding_workers > 1 and len(texts_for_embedding) >= 200:
+        print(f"  {embedding_workers}개 프로세스로 인코딩합니다...")
+        pool = model.start_multi_process_pool(target_devices=['cpu'] * embedding_workers)
+        try:
+            embeddings = model.encode_multi_process(
+                texts_for_embedding, pool,
+                chunk_size=max(32, -(-len(texts_for_embedding) // (embedding_workers * 4)))
+            )
+        finally:
+            model.stop_multi_process_pool(pool)
+    else:
+        embeddings = model.encode(texts_for_embedding, convert_to_numpy=True, show_progress_bar=True)
     print("임베딩 생성 완료.")
 
     if embeddings.ndim == 1 and embeddings.shape[0] > 0:  # 단일 임베딩이면서 비어있지 않은 경우
@@ -1,7 +1,5 @@
-import torch
 import numpy as np
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from torch.nn.functional import softmax
+from apps.recommender.services.model_registry import get_sequence_classifier
 
 
 class KCrossEncoderReranker:
@@ -10,16 +8,23 @@ class KCrossEncoderReranker:
         초기화 메서드 수정:
         - summaries (dict): contentid를 키로, 요약문을 값으로 갖는 딕셔너리를 받습니다.
         """
-        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
-        self.model.eval()
-
-        self.device = device if device else ("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
+        self.model_path = model_path  # 모델은 첫 rerank 시 공유 레지스트리에서 적재
+        self.device = device  # None 이면 첫 적재 시 결정 (torch 는 사용 시점에 import)
+        self._loaded = None
         self.max_length = max_length
         self.normalize_scores = normalize_scores
         self.summaries = summaries  # ✅ 요약문 딕셔너리를 인스턴스 변수로 저장
 
+    def _get_model(self):
+        """(토크나이저, 모델) 반환 — 장치 이동은 첫 적재 시 1회만"""
+        if self._loaded is None:
+            import torch
+            if not self.device:
+                self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            tokenizer, model = get_sequence_classifier(self.model_path)
+            self._loaded = (tokenizer, model.to(self.device))
+        return self._loaded
+
     def rerank(self, query, candidates, top_n=5):
         """
         rerank 메서드 수정:
@@ -44,8 +49,13 @@ class KCrossEncoderReranker:
         # ✅ 2. (query, 요약문) 쌍을 생성합니다.
         pairs = [(query, text) for text in item_texts]
 
+        import torch
+        from torch.nn.functional import softmax
+
+        tokenizer, model = self._get_model()
+
         # tokenizer로 인코딩
-        encodings = self.tokenizer.batch_encode_plus(
+        encodings = tokenizer.batch_encode_plus(
             pairs,
             padding=True,
             truncation=True,
@@ -56,7 +66,7 @@ class KCrossEncoderReranker:
 
         # 모델 추론
         with torch.no_grad():
-            outputs = self.model(**encodings)
+            outputs = model(**encodings)
             logits = outputs.logits.squeeze()
 
             if logits.dim() == 0:
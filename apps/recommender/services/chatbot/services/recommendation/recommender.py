@@ -4,11 +4,10 @@ from django.conf import settings
 from ...constants import cat_dict, INTENT_TO_CATEGORY_MAP
 import json
 import os
-from .cross_reranking import KCrossEncoderReranker
+from functools import lru_cache
 from django.http import JsonResponse
-import geopy.distance  # 거리 계산을 위한 라이브러리 (pip install geopy)
 
-# --- 데이터 및 모델 로딩 ---
+# --- 데이터 및 모델 로딩 (import 시점이 아닌 첫 사용 시) ---
 DATA_DIR = os.path.join(settings.BASE_DIR, 'apps', 'recommender', 'services', 'chatbot', 'data')
 SPOT_METADATA_PATH = os.path.join(DATA_DIR, "spot_metadata.json")
 SUMMARIES_PATH = os.path.join(DATA_DIR, "persistent_spot_summaries.json")
@@ -19,17 +18,23 @@ def load_metadata_as_dict(path):
         raw_list = json.load(f)
     return {str(item["contentid"]): item for item in raw_list if "contentid" in item}
 
-with open(SUMMARIES_PATH, "r", encoding="utf-8") as f:
-    summaries = json.load(f)
-metadata = load_metadata_as_dict(SPOT_METADATA_PATH)
+@lru_cache(maxsize=1)
+def get_summaries():
+    with open(SUMMARIES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
 
+@lru_cache(maxsize=1)
+def get_metadata():
+    return load_metadata_as_dict(SPOT_METADATA_PATH)
 
-metadata = load_metadata_as_dict(SPOT_METADATA_PATH)
-
-reranker = KCrossEncoderReranker(
-    model_path=model_id,
-    summaries=summaries
-)
+@lru_cache(maxsize=1)
+def get_reranker():
+    # torch / transformers 는 첫 rerank 시점에 import
+    from .cross_reranking import KCrossEncoderReranker
+    return KCrossEncoderReranker(
+        model_path=model_id,
+        summaries=get_summaries()
+    )
 
 @sync_to_async
 def get_recommendations(user_input, user_profile, intent=None, keywords=None, extracted_locations=None, top_n=5):
@@ -37,6 +42,9 @@ def get_recommendations(user_input, user_profile, intent=None, keywords=None, ex
     [최종] 3단계 필터링/랭킹(선필터링 -> 점수정렬 -> 리랭킹) 전략을 모두 구현한 완전체 버전입니다.
     """
 
+    metadata = get_metadata()
+    reranker = get_reranker()
+
     # '한적한 곳' 추천 로직은 그대로 유지
     # ⭐️ [변경점] '한적한 곳' 추천 로직을 새로운 점수 모델로 전면 교체
     if intent.value == "recommend_quite":  # Enum 객체 비교를 위해 .value 사용
@@ -131,8 +139,12 @@ def get_nearby_recommendations(anchor_content_ids: list, target_category_id: str
     """
     주어진 기준 장소들 근처에서 특정 카테고리의 장소를 찾아 추천합니다.
     """
+    import geopy.distance  # 거리 계산을 위한 라이브러리 (pip install geopy)
+
     print(f"--- 주변 추천 시작: 기준 ID({anchor_content_ids}), 타겟 카테고리({target_category_id}) ---")
 
+    metadata = get_metadata()
+
     nearby_places = []
 
     # 1. 기준 장소들의 평균 좌표 계산
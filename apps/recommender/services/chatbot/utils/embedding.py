@@ -3,40 +3,46 @@ import os
 import re
 import json
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from functools import lru_cache
 from asgiref.sync import sync_to_async
 from dotenv import load_dotenv
-from bareunpy import Corrector
+from apps.recommender.services.model_registry import get_sentence_transformer
 
 
 # --------------------------------------------------------------------------
-# 1. 모델 및 데이터 로드 (API 키 로드 필수)
+# 1. 모델 및 데이터 로드 (API 키 로드 필수, import 시점이 아닌 첫 사용 시)
 # --------------------------------------------------------------------------
 
-# SentenceTransformer 모델 로드
-print("Loading SentenceTransformer model (snunlp/KR-SBERT-V40K-klueNLI-augSTS)...")
-model = SentenceTransformer("snunlp/KR-SBERT-V40K-klueNLI-augSTS")
-print("SentenceTransformer model loaded.")
+# SentenceTransformer 모델 (공유 레지스트리에서 첫 사용 시 적재)
+MODEL_NAME = "snunlp/KR-SBERT-V40K-klueNLI-augSTS"
 
-# [중요] API 키는 환경변수에서 가져옵니다.
-load_dotenv()
-BAREUN_API_KEY = os.getenv("BAREUN_API_KEY")
-if not BAREUN_API_KEY:
-    raise ValueError("[에러] BAREUN_API_KEY 환경 변수가 설정되지 않았습니다. API 키를 설정해주세요.")
-
-# 바른 교정기 초기화 (로컬 서버 사용 시)
+# 바른 교정기 설정 (로컬 서버 사용 시)
 HOST = "localhost"   # 로컬 서버가 아니라면 bareun.ai 등으로 변경
 PORT = 5656        # 포트는 서버 실행 환경에 따라 변경
-corrector = Corrector(apikey=BAREUN_API_KEY, host=HOST, port=PORT)
 
 current_file_dir = os.path.dirname(os.path.abspath(__file__))
 chatbot_service_dir = os.path.dirname(current_file_dir)
 data_dir = os.path.join(chatbot_service_dir, "data")
 metadata_file_path = os.path.join(data_dir, "persistent_spot_summaries.json")
-print(f"Reading metadata from: {metadata_file_path}")
-with open(metadata_file_path, "r", encoding="utf-8") as f:
-    spot_data = json.load(f)
-print("\n--- All models and data loaded successfully. ---")
+
+
+@lru_cache(maxsize=1)
+def get_corrector():
+    from bareunpy import Corrector
+
+    # [중요] API 키는 환경변수에서 가져옵니다.
+    load_dotenv()
+    BAREUN_API_KEY = os.getenv("BAREUN_API_KEY")
+    if not BAREUN_API_KEY:
+        raise ValueError("[에러] BAREUN_API_KEY 환경 변수가 설정되지 않았습니다. API 키를 설정해주세요.")
+    return Corrector(apikey=BAREUN_API_KEY, host=HOST, port=PORT)
+
+
+@lru_cache(maxsize=1)
+def _load_spot_data():
+    print(f"Reading metadata from: {metadata_file_path}")
+    with open(metadata_file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 # --------------------------------------------------------------------------
 # 2. 함수 정의 (bareunpy 라이브러리 사용)
@@ -46,6 +52,7 @@ def correct_text_with_bareunpy(text: str) -> str:
     if not text.strip():
         return text
 
+    corrector = get_corrector()
     try:
         response = corrector.correct_error(content=text)
         return response.revised
@@ -91,7 +98,7 @@ def normalize_query(query: str) -> str:
 
 @sync_to_async
 def embed_query(query):
-    return model.encode([query])
+    return get_sentence_transformer(MODEL_NAME).encode([query])
 
 def get_spot_data():
-    return spot_data
+    return _load_spot_data()
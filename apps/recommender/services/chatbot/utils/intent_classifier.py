@@ -1,18 +1,15 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+from apps.recommender.services.model_registry import get_sequence_classifier
 
 # 저장된 모델 경로 (fine_tune.py에서 저장한 곳과 같아야 함)
 MODEL_DIR = "udol/sumteuyeo-intent"
 
-# 토크나이저와 모델 로드
-tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_DIR)
 
-# 모델을 평가 모드로 전환
-model.eval()
+def predict_intent_transformer(text: str) -> str:
+    import torch  # 첫 예측 시 import (모듈 import 비용 제거)
 
+    # 토크나이저와 모델 (공유 레지스트리에서 첫 사용 시 적재, 평가 모드)
+    tokenizer, model = get_sequence_classifier(MODEL_DIR)
 
-def predict_intent_transformer(text: str) -> str:
     # 입력 문장 토크나이즈
     inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
 
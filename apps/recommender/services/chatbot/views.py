@@ -10,12 +10,11 @@ from .constants import SYSTEM_PROMPT, synonym_dict, INTENT_TO_CATEGORY_MAP, get_
 from .utils.filtering import is_malicious, Intent, INTENT_MESSAGES, is_travel_intent, analyze_user_input
 from .services.translation import translate_to_korean, translate_to_original
 from .services.gpt_service import call_openai_gpt, generate_follow_up_question
-from .services.recommendation.recommender import get_recommendations, get_places_summary_by_contentids, get_nearby_recommendations
+from .services.recommendation.recommender import get_recommendations, get_places_summary_by_contentids, get_nearby_recommendations, get_metadata
 from .services.recommendation.user_profile import get_user_profile
 from .utils.location_extractor import LocationExtractor
 from .services.recommendation.score import expand_keywords_with_synonyms
 import traceback
-from .services.recommendation.recommender import metadata
 
 def make_recommendation_cache_key(user_id: str, user_input: str) -> str:
     key_str = f"rec_cache:{user_id}:{user_input}"
@@ -127,7 +126,7 @@ class ChatbotAsyncView(View):
                 extracted_locations=extracted_locations, top_n=5
             )
             contentids = [r['contentid'] for r in recommendations]
-            places_summary = get_places_summary_by_contentids(contentids, metadata)
+            places_summary = get_places_summary_by_contentids(contentids, get_metadata())
 
             # --- [8] 다국어 응답 처리 ---
             if original_lang != "ko":
@@ -190,7 +189,7 @@ class ChatbotAsyncView(View):
             return None
 
         recommendations = await get_nearby_recommendations(anchor_ids, target_category_id)
-        places_summary = get_places_summary_by_contentids([p['contentid'] for p in recommendations], metadata)
+        places_summary = get_places_summary_by_contentids([p['contentid'] for p in recommendations], get_metadata())
 
         # 여기서도 언어 번역이 필요하다면 추가해야 합니다.
 
@@ -0,0 +1,121 @@
+import hashlib
+import logging
+from typing import Dict, Iterable, List
+
+import numpy as np
+from django.db import DatabaseError
+from apps.recommender.models import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+
+class CachedEncoder:
+    """
+    내용 해시 기반 임베딩 캐시를 거치는 인코더
+    - (모델명, 텍스트 SHA-256) 로 EmbeddingCache 를 일괄 조회해 변경 없는 텍스트는 재인코딩하지 않음
+    - 캐시 미스만 (중복 제거 후) encoder 로 인코딩하고 bulk_create 로 저장
+    - encoder: SentenceTransformer 또는 EncodingPool (encode(texts, batch_size) 를 제공하는 객체)
+
+    사용 예:
+        with EncodingPool(model) as pool:
+            encoder = CachedEncoder(pool, ContentFeature.TEXT_MODEL_NAME)
+            embeddings = encoder.encode(texts)
+    """
+    LOOKUP_CHUNK_SIZE = 1000
+
+    def __init__(self, encoder, model_name: str):
+        self.encoder = encoder
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _lookup(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        try:
+            for start in range(0, len(hashes), self.LOOKUP_CHUNK_SIZE):
+                rows = (
+                    EmbeddingCache.objects
+                    .filter(model_name=self.model_name, text_hash__in=hashes[start:start + self.LOOKUP_CHUNK_SIZE])
+                    .values_list('text_hash', 'vector')
+                )
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(bytes(vector), dtype=np.float32)
+        except DatabaseError as e:
+            logger.warning(f"임베딩 캐시 조회 실패, 전체 인코딩: {str(e)}")
+            return {}
+        return found
+
+    def _store(self, hashes: List[str], vectors: np.ndarray):
+        try:
+            EmbeddingCache.objects.bulk_create(
+                [
+                    EmbeddingCache(model_name=self.model_name, text_hash=h, vector=v.tobytes())
+                    for h, v in zip(hashes, vectors)
+                ],
+                batch_size=self.LOOKUP_CHUNK_SIZE,
+                ignore_conflicts=True
+            )
+        except DatabaseError as e:
+            logger.warning(f"임베딩 캐시 저장 실패: {str(e)}")
+
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        if hasattr(self.encoder, 'start_multi_process_pool'):  # SentenceTransformer
+            return self.encoder.encode(
+                texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+            )
+        return self.encoder.encode(texts, batch_size=batch_size)
+
+    @classmethod
+    def prune(cls, live_texts: Dict[str, Iterable[str]], older_than) -> int:
+        """
+        현재 사용되지 않는 캐시 항목 삭제 → 삭제 건수
+        - live_texts: 모델명 → 현재 인코딩 대상 텍스트 (여기에 없는 모델의 항목은 전부 삭제)
+        - older_than 이후 생성된 항목은 유지 (저장 직전 인코딩된 새 요약문 보호)
+        """
+        stale = EmbeddingCache.objects.filter(created_at__lt=older_than)
+        deleted, _ = stale.exclude(model_name__in=list(live_texts)).delete()
+
+        for model_name, texts in live_texts.items():
+            live = {cls.text_hash(text) for text in texts if text}
+            stale_ids = [
+                pk for pk, text_hash in
+                stale.filter(model_name=model_name)
+                .values_list('id', 'text_hash')
+                .iterator(chunk_size=cls.LOOKUP_CHUNK_SIZE * 10)
+                if text_hash not in live
+            ]
+            for start in range(0, len(stale_ids), cls.LOOKUP_CHUNK_SIZE):
+                count, _ = EmbeddingCache.objects.filter(
+                    id__in=stale_ids[start:start + cls.LOOKUP_CHUNK_SIZE]
+                ).delete()
+                deleted += count
+        return deleted
+
+    def encode(self, texts: List[str], batch_size: int = 256) -> np.ndarray:
+        """입력 순서가 보존된 (N×D) float32 임베딩"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        hashes = [self.text_hash(text) for text in texts]
+        cached = self._lookup(list(set(hashes)))
+
+        missing = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = text
+        self.hits += len(texts) - sum(1 for h in hashes if h in missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing_hashes = list(missing)
+            vectors = np.asarray(
+                self._encode([missing[h] for h in missing_hashes], batch_size), dtype=np.float32
+            )
+            self._store(missing_hashes, vectors)
+            cached.update(zip(missing_hashes, vectors))
+
+        return np.stack([cached[h] for h in hashes]).astype(np.float32, copy=False)
@@ -1,18 +1,21 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
+from .model_registry import get_sentence_transformer
 
 MODEL_NAME = "snunlp/KR-SBERT-V40K-klueNLI-augSTS"
 
-try:
-    embedding_model = SentenceTransformer(MODEL_NAME)
-except Exception as e:
-    print(f"모델 로딩 중 오류 발생: {e}")
-    embedding_model = None # 로딩 실패 시 None으로 설정
+
+def get_embedding_model():
+    """공유 레지스트리의 KR-SBERT 모델 (첫 호출 시 적재, 실패 시 None)"""
+    try:
+        return get_sentence_transformer(MODEL_NAME)
+    except Exception as e:
+        print(f"모델 로딩 중 오류 발생: {e}")
+        return None
 
 
 # 주의: 최대한 호출 횟수를 줄이기 (연산량이 많음)
 def get_korean_text_embedding(sentence: str) -> list[float] | None:
-    global embedding_model
+    embedding_model = get_embedding_model()
 
     if embedding_model is None:
         print("오류: 임베딩 모델이 로드되지 않았습니다.")
@@ -0,0 +1,69 @@
+import os
+import logging
+import multiprocessing
+from typing import List, Optional
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers() -> int:
+    """settings.EMBEDDING_WORKERS (미설정 시 CPU 코어 수)"""
+    return max(1, int(getattr(settings, 'EMBEDDING_WORKERS', None) or os.cpu_count() or 1))
+
+
+class EncodingPool:
+    """
+    SentenceTransformer 다중 프로세스 인코딩 풀 (카탈로그 전체 임베딩용)
+    - start_multi_process_pool 로 CPU 워커별 모델을 1회 적재하고 with 블록 동안 재사용
+    - encode_multi_process 는 청크 순서대로 결과를 모아 입력 순서 그대로 반환
+    - 워커 1개, 적은 입력, 데몬 프로세스(Celery prefork 워커 등)에서는 단일 프로세스 encode 로 대체
+
+    사용 예:
+        with EncodingPool(model, workers=8) as pool:
+            embeddings = pool.encode(texts, batch_size=256)
+    """
+    MIN_PARALLEL_TEXTS = 200  # 이보다 적으면 프로세스 간 전송 비용이 더 큼
+
+    def __init__(self, model, workers: Optional[int] = None):
+        self.model = model
+        self.workers = default_workers() if workers is None else max(1, workers)
+        self._pool = None
+
+        if self.workers > 1 and multiprocessing.current_process().daemon:
+            logger.info("데몬 프로세스에서는 자식 프로세스를 만들 수 없어 단일 프로세스 인코딩 사용")
+            self.workers = 1
+
+    def __enter__(self) -> "EncodingPool":
+        if self.workers > 1:
+            self._pool = self.model.start_multi_process_pool(target_devices=['cpu'] * self.workers)
+            logger.info(f"인코딩 풀 시작: {self.workers}개 프로세스")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def encode(self, texts: List[str], batch_size: int = 256) -> np.ndarray:
+        """입력 순서가 보존된 (N×D) float32 임베딩"""
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        if self._pool is None or len(texts) < self.MIN_PARALLEL_TEXTS:
+            embeddings = self.model.encode(
+                texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+            )
+        else:
+            # 워커당 여러 청크가 돌도록 분할 (긴 텍스트가 한 워커에 몰리는 것 완화)
+            chunk_size = max(32, -(-len(texts) // (self.workers * 4)))
+            embeddings = self.model.encode_multi_process(
+                texts, self._pool, batch_size=batch_size, chunk_size=chunk_size
+            )
+        return np.asarray(embeddings, dtype=np.float32)
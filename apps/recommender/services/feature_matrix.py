@@ -0,0 +1,248 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from apps.recommender.models import ContentFeature
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureMatrix:
+    """
+    ContentFeature.feature_vector 전체를 담은 N×484 float32 행렬
+    - 스냅샷을 .npy 파일로 저장하고 mmap으로 열어 워커 간 페이지 캐시 공유
+    - topk(): 행렬곱 1회 + argpartition 으로 여러 쿼리 벡터를 한 번에 점수화
+    """
+    VECTOR_DIM = 484
+
+    def __init__(self, contentids, categories, vectors):
+        self.contentids = np.asarray(contentids, dtype=np.int64)
+        self.categories = np.asarray(categories, dtype=object)
+        self.vectors = vectors
+
+    @property
+    def size(self) -> int:
+        return int(self.contentids.size)
+
+    def mask_for(self, contentids: Optional[Iterable[int]] = None,
+                 categories: Optional[Iterable[str]] = None) -> np.ndarray:
+        """콘텐츠 ID / 대분류 조건에 해당하는 행 마스크 (N,)"""
+        mask = np.ones(self.size, dtype=bool)
+        if contentids is not None:
+            mask &= np.isin(self.contentids, np.fromiter(contentids, dtype=np.int64))
+        if categories is not None:
+            mask &= np.isin(self.categories, list(categories))
+        return mask
+
+    def topk(self, query_vecs: np.ndarray, mask: Optional[np.ndarray] = None,
+             k: int = 30) -> List[List[Tuple[int, float]]]:
+        """
+        정규화된 쿼리 벡터(B×D)별 코사인 유사도 top-k → [[(contentid, similarity), ...], ...]
+        mask 는 모든 쿼리 공통 (N,) 또는 쿼리별 (B, N) 불리언 배열
+        """
+        queries = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+        if queries.shape[1] != self.VECTOR_DIM:
+            raise ValueError(f"Vector must have {self.VECTOR_DIM} dimensions")
+
+        if mask is None:
+            mask = np.ones(self.size, dtype=bool)
+        mask = np.asarray(mask, dtype=bool)
+        if mask.ndim == 1:
+            rows, row_mask = np.flatnonzero(mask), None
+        else:
+            rows = np.flatnonzero(mask.any(axis=0))
+            row_mask = mask[:, rows]
+
+        if rows.size == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        # (B×D)·(D×M) 단일 BLAS 호출
+        scores = queries @ self.vectors[rows].T
+        if row_mask is not None:
+            scores = np.where(row_mask, scores, -np.inf)
+
+        k_eff = min(k, rows.size)
+        top = np.argpartition(-scores, k_eff - 1, axis=1)[:, :k_eff]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for idx, sc in zip(top, top_scores):
+            valid = np.isfinite(sc)
+            results.append(list(zip(self.contentids[rows[idx[valid]]].tolist(), sc[valid].tolist())))
+        return results
+
+    @classmethod
+    def build(cls) -> "FeatureMatrix":
+        """DB에서 특징 벡터를 읽어 행렬 생성 (contentid 순, 청크 단위로 사전 할당된 버퍼에 채움)"""
+        qs = ContentFeature.objects.filter(feature_vector__isnull=False)
+        total = qs.count()
+        contentids = np.empty(total, dtype=np.int64)
+        categories = np.empty(total, dtype=object)
+        vectors = np.empty((total, cls.VECTOR_DIM), dtype=np.float32)
+
+        filled = 0
+        rows = (
+            qs.order_by('detail__contentid')
+            .values_list('detail__contentid', 'lclssystm1', 'feature_vector')
+            .iterator(chunk_size=2000)
+        )
+        for contentid, category, vector in rows:
+            if filled >= total:
+                break
+            vector = np.asarray(vector, dtype=np.float32)
+            if vector.shape != (cls.VECTOR_DIM,):
+                continue
+            contentids[filled] = contentid
+            categories[filled] = category or ''
+            vectors[filled] = vector
+            filled += 1
+
+        return cls(contentids[:filled], categories[:filled], vectors[:filled])
+
+    # ---------------- 스냅샷 (mmap 공유) ----------------
+    VECTORS_FILE = 'vectors.npy'
+    META_FILE = 'meta.npz'
+
+    @staticmethod
+    def _snapshot_dir(directory: Path, version) -> Path:
+        return directory / f'feature_matrix_v{version}'
+
+    def save_snapshot(self, directory: Path, version) -> None:
+        """
+        벡터/메타 파일을 임시 디렉터리에 쓴 뒤 디렉터리 rename 1회로 게시
+        - 읽는 쪽은 항상 같은 빌드의 벡터와 메타를 함께 보게 됨
+        - 같은 버전을 다른 워커가 먼저 게시했으면 그 스냅샷을 유지하고 임시 디렉터리 삭제
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        snapshot_dir = self._snapshot_dir(directory, version)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f'{snapshot_dir.name}.', suffix='.tmp', dir=directory))
+
+        try:
+            np.save(tmp_dir / self.VECTORS_FILE, np.ascontiguousarray(self.vectors, dtype=np.float32))
+            np.savez(tmp_dir / self.META_FILE, contentids=self.contentids, categories=self.categories.astype(str))
+            os.rename(tmp_dir, snapshot_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not snapshot_dir.exists():
+                raise
+            return
+
+        # 이전 버전 정리 (이미 mmap 중인 프로세스는 삭제 후에도 기존 페이지를 계속 사용 가능)
+        for path in directory.glob('feature_matrix_v*'):
+            if path == snapshot_dir or path.name.endswith('.tmp'):
+                continue
+            if not path.is_dir():
+                # 이전 형식(.npy / _meta.npz 분리 저장) 파일
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                continue
+            try:
+                older = int(path.name[len('feature_matrix_v'):]) < int(version)
+            except ValueError:
+                older = True
+            if older:  # 늦게 게시된 이전 버전이 최신 스냅샷을 지우지 않도록
+                shutil.rmtree(path, ignore_errors=True)
+
+    @classmethod
+    def load_snapshot(cls, directory: Path, version) -> Optional["FeatureMatrix"]:
+        """해당 버전 스냅샷이 있으면 mmap(읽기 전용)으로 열기 (행 수가 맞지 않으면 None)"""
+        snapshot_dir = cls._snapshot_dir(directory, version)
+        try:
+            meta = np.load(snapshot_dir / cls.META_FILE, allow_pickle=False)
+            vectors = np.load(snapshot_dir / cls.VECTORS_FILE, mmap_mode='r')
+            contentids, categories = meta['contentids'], meta['categories']
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if not (len(contentids) == len(categories) == vectors.shape[0]) or vectors.shape[1:] != (cls.VECTOR_DIM,):
+            logger.warning(f"특징 행렬 스냅샷 불일치, 무시: {snapshot_dir}")
+            return None
+        return cls(contentids, categories, vectors)
+
+
+# 프로세스 단위 싱글톤 상태
+_lock = threading.Lock()
+_matrix: Optional[FeatureMatrix] = None
+_matrix_version = None
+_last_checked = 0.0
+
+VERSION_KEY = "feature_matrix_version"
+REFRESH_INTERVAL = 600  # 초 단위, 버전 확인 주기 (버전이 바뀐 경우에만 재적재)
+
+
+def _snapshot_dir() -> Path:
+    return Path(getattr(settings, 'FEATURE_MATRIX_DIR', Path(settings.BASE_DIR) / 'var' / 'feature_matrix'))
+
+
+def invalidate_feature_matrix():
+    """특징 벡터 갱신 후 호출 → 모든 프로세스가 다음 확인 시점에 재적재"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time()), None)
+    except Exception as e:
+        logger.warning(f"특징 행렬 버전 갱신 실패: {str(e)}")
+
+
+def _current_version():
+    """공유 버전 (키가 없으면 시각 기반 값으로 생성 → 캐시 초기화 후 이전 스냅샷 재사용 방지)"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time()), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_feature_matrix() -> FeatureMatrix:
+    """지연 로딩 특징 행렬 반환 (주기적으로 버전만 확인, 버전이 바뀌면 재적재)"""
+    global _matrix, _matrix_version, _last_checked
+
+    now = time.monotonic()
+    if _matrix is not None and now - _last_checked < REFRESH_INTERVAL:
+        return _matrix
+
+    with _lock:
+        if _matrix is not None and now - _last_checked < REFRESH_INTERVAL:
+            return _matrix
+        try:
+            version = _current_version()
+        except Exception as e:
+            logger.warning(f"특징 행렬 버전 조회 실패: {str(e)}")
+            version = _matrix_version
+
+        if _matrix is not None and (version is None or version == _matrix_version):
+            _last_checked = now
+            return _matrix
+        version = version or 0
+
+        directory = _snapshot_dir()
+        matrix = FeatureMatrix.load_snapshot(directory, version)
+        if matrix is None:
+            started = time.perf_counter()
+            matrix = FeatureMatrix.build()
+            try:
+                matrix.save_snapshot(directory, version)
+                # 동시에 먼저 게시된 스냅샷이 있으면 그쪽을 mmap 으로 공유
+                matrix = FeatureMatrix.load_snapshot(directory, version) or matrix
+            except OSError as e:
+                logger.warning(f"특징 행렬 스냅샷 저장 실패: {str(e)}")
+            logger.info(
+                f"특징 행렬 생성: {matrix.size}개 벡터, "
+                f"{(time.perf_counter() - started) * 1000:.1f}ms"
+            )
+
+        _matrix, _matrix_version, _last_checked = matrix, version, now
+        return _matrix
@@ -1,14 +1,20 @@
 # services/feature_service.py
+from contextlib import contextmanager
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
 from pgvector.django import CosineDistance
 import numpy as np
-from typing import List, Dict
-from recommender.models import ContentFeature
-from users.models import UserPreferenceProfile, GlobalPreferenceProfile
-from django.db.models import QuerySet
+from typing import List, Dict, Optional, Iterable, Tuple
+from apps.recommender.models import ContentFeature, TOURIST_CATEGORIES, FOOD_CATEGORY
+from django.db.models import QuerySet, Q
+from .feature_matrix import get_feature_matrix
 
 class FeatureService:
     VECTOR_DIM = 484  # 384(텍스트) + 100(카테고리)
+    DEFAULT_EF_SEARCH = 40  # pgvector hnsw.ef_search 기본값
+    MAX_EF_SEARCH = 1000  # pgvector hnsw.ef_search 상한
+    OVERFETCH_FACTOR = 4  # 필터 검색 시 라운드마다 늘리는 후보 배수
+    EXACT_FILTER_THRESHOLD = 2000  # 허용 ID 수가 이 이하이면 바로 정확 검색
 
     @staticmethod
     def get_feature_vector(contentid: int) -> np.ndarray:
@@ -19,22 +25,130 @@ class FeatureService:
         except ObjectDoesNotExist:
             raise ValueError(f"ContentID {contentid} not found")
 
+    @staticmethod
+    @contextmanager
+    def vector_search(ef_search: Optional[int] = None, exact: bool = False):
+        """
+        벡터 검색 세션 설정 (트랜잭션 범위 SET LOCAL)
+        - exact=True: 인덱스 스캔을 끄고 순차 스캔으로 정확한 top-k 계산
+        - ef_search: HNSW 탐색 후보 수 (클수록 재현율↑, 지연↑)
+        쿼리셋은 반드시 이 컨텍스트 안에서 평가해야 설정이 적용됨
+        """
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if exact:
+                    cursor.execute("SET LOCAL enable_indexscan = off")
+                elif ef_search:
+                    cursor.execute("SET LOCAL hnsw.ef_search = %s", [int(ef_search)])
+            yield
+
     # 반드시 query_vector 는 L2 정규화를 한 후, 해당 함수를 호출해야함.
     @staticmethod
-    def find_similar_spots(query_vector: np.ndarray, max_results: int = 10):
+    def find_similar_spots(query_vector: np.ndarray, max_results: int = 10,
+                           ef_search: Optional[int] = None, exact: bool = False,
+                           use_matrix: bool = False) -> List[ContentFeature]:
         """정규화된 쿼리 벡터 기반 유사도 검색 (순수 계산만 담당)"""
         # 입력 벡터 검증
         if query_vector.shape != (FeatureService.VECTOR_DIM,):
             raise ValueError(f"Vector must have {FeatureService.VECTOR_DIM} dimensions")
-            
-        return (
-            ContentFeature.objects
-            .annotate(similarity=CosineDistance('feature_vector', query_vector))
-            .order_by('similarity')
-            .select_related('detail')
-            [:max_results]
+
+        if use_matrix:
+            # 인메모리 행렬로 top-k 계산 후 해당 행만 조회 (similarity 는 거리값으로 유지)
+            results = get_feature_matrix().topk(query_vector, k=max_results)[0]
+            features = {
+                feature.detail.contentid: feature
+                for feature in ContentFeature.objects
+                .filter(detail__contentid__in=[contentid for contentid, _ in results])
+                .select_related('detail')
+            }
+            spots = []
+            for contentid, score in results:
+                if (feature := features.get(contentid)) is not None:
+                    feature.similarity = 1 - score
+                    spots.append(feature)
+            return spots
+
+        # HNSW는 ef_search 보다 많은 결과를 돌려주지 못하므로 최소 max_results 보장
+        if not exact:
+            ef_search = max(ef_search or FeatureService.DEFAULT_EF_SEARCH, max_results)
+
+        with FeatureService.vector_search(ef_search=ef_search, exact=exact):
+            return list(
+                ContentFeature.objects
+                .annotate(similarity=CosineDistance('feature_vector', query_vector))
+                .order_by('similarity')
+                .select_related('detail')
+                [:max_results]
+            )
+
+    @staticmethod
+    def _partition_filter(categories: Optional[Iterable[str]]) -> Tuple[Q, bool]:
+        """카테고리 조건을 부분 인덱스 조건식과 동일한 형태로 변환 (인덱스 사용 여부 함께 반환)"""
+        if not categories:
+            return Q(), True
+        categories = set(categories)
+        if categories == {FOOD_CATEGORY}:
+            return Q(lclssystm1=FOOD_CATEGORY), True
+        if categories == set(TOURIST_CATEGORIES):
+            return Q(lclssystm1__in=TOURIST_CATEGORIES), True
+        return Q(lclssystm1__in=sorted(categories)), False
+
+    @staticmethod
+    def filtered_search(query_vector: np.ndarray, k: int = 30,
+                        categories: Optional[Iterable[str]] = None,
+                        contentids: Optional[Iterable[int]] = None,
+                        ef_search: Optional[int] = None,
+                        max_rounds: int = 3) -> List[Tuple[int, float]]:
+        """
+        카테고리/ID 필터를 적용한 벡터 top-k 검색 → [(contentid, similarity), ...]
+        - 카테고리는 lclssystm1 부분 HNSW 인덱스(음식점/관광지)로 먼저 좁힘
+        - ID 필터는 인덱스 결과를 k*배수만큼 과다 조회한 뒤 파이썬에서 거르고,
+          부족하면 배수를 늘려 재시도 (iterative over-fetching)
+        - 허용 ID가 적거나 라운드를 모두 소진하면 필터를 SQL에 넣은 정확 검색으로 전환
+        - 인덱스 결과가 요청 수보다 적으면 (필터가 걸린 HNSW 의 조기 종료일 수 있으므로) 바로 정확 검색으로 전환
+        """
+        if query_vector.shape != (FeatureService.VECTOR_DIM,):
+            raise ValueError(f"Vector must have {FeatureService.VECTOR_DIM} dimensions")
+
+        partition, indexed = FeatureService._partition_filter(categories)
+        allowed = set(contentids) if contentids is not None else None
+        if allowed is not None and not allowed:
+            return []
+
+        distance = CosineDistance('feature_vector', query_vector.tolist())
+        base_qs = (
+            ContentFeature.objects.filter(partition, feature_vector__isnull=False)
+            .annotate(distance=distance)
+            .order_by('distance')
         )
 
+        def to_results(rows):
+            return [(contentid, 1 - dist) for contentid, dist in rows]
+
+        use_index = indexed and (allowed is None or len(allowed) > FeatureService.EXACT_FILTER_THRESHOLD)
+        if use_index:
+            fetch = k if allowed is None else k * FeatureService.OVERFETCH_FACTOR
+            for _ in range(max_rounds):
+                if fetch > FeatureService.MAX_EF_SEARCH:
+                    break
+                ef = max(fetch, ef_search or FeatureService.DEFAULT_EF_SEARCH)
+                with FeatureService.vector_search(ef_search=ef):
+                    rows = list(base_qs.values_list('detail__contentid', 'distance')[:fetch])
+
+                hits = [row for row in rows if allowed is None or row[0] in allowed]
+                if len(hits) >= k:
+                    return to_results(hits[:k])
+                if len(rows) < fetch:
+                    # 필터가 걸린 HNSW 는 남은 행이 있어도 적게 반환할 수 있음 → 정확 검색으로 확인
+                    # (파티션이 작아 모두 반환된 경우에도 정확 검색 비용은 작음, 파티션 COUNT 생략)
+                    break
+                fetch *= FeatureService.OVERFETCH_FACTOR
+
+        exact_qs = base_qs
+        if allowed is not None:
+            exact_qs = exact_qs.filter(detail__contentid__in=allowed)
+        with FeatureService.vector_search(exact=True):
+            return to_results(exact_qs.values_list('detail__contentid', 'distance')[:k])
 
     @staticmethod
     def get_bulk_vectors(contentids: List[int]) -> Dict[int, np.ndarray]:
@@ -0,0 +1,93 @@
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core.cache import cache
+from apps.items.models import ContentDetailCommon
+from apps.items.services.spatial_index import encode_geohash, decode_geohash_center, get_spatial_index
+from .theme_recommender import ThemeRecommender
+import logging
+import time
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AnonymousFeedSnapshot:
+    """
+    비로그인 사용자용 메인 피드 스냅샷 (geohash 셀 × 월 단위 사전 계산)
+    - 비로그인 피드는 글로벌 벡터에만 의존하므로 셀 중심 좌표 기준 결과를 공유
+    - 요청 시에는 스냅샷의 콘텐츠 ID로 ContentDetailCommon 만 1회 조회 (벡터 쿼리 없음)
+    """
+    PRECISION = 5  # 약 4.9km × 4.9km 셀
+    CACHE_PREFIX = "rec:anon:snap"
+    CACHE_TIMEOUT = 60 * 60 * 48  # 48시간 (배치 주기보다 길게)
+
+    @classmethod
+    def cell_for(cls, lat: float, lng: float) -> str:
+        return encode_geohash(lat, lng, cls.PRECISION)
+
+    @classmethod
+    def cell_center(cls, lat: float, lng: float) -> Tuple[float, float]:
+        """좌표가 속한 셀의 중심 좌표 (스냅샷 생성 입력과 동일)"""
+        return decode_geohash_center(cls.cell_for(lat, lng))
+
+    @classmethod
+    def _cache_key(cls, geohash: str, month: int) -> str:
+        return f"{cls.CACHE_PREFIX}:{geohash}:m{month}"
+
+    @classmethod
+    def build_cell(cls, geohash: str, month: int) -> dict:
+        """셀 중심 좌표로 추천 행을 생성해 섹션별 제목/콘텐츠 ID만 저장"""
+        lat, lng = decode_geohash_center(geohash)
+        rows = ThemeRecommender.generate_recommendation_rows(
+            user_id=None, month=month, user_lat=lat, user_lng=lng
+        )
+        snapshot = {
+            section: {
+                'title': data['title'],
+                'ids': [item.contentid for item in data['items']],
+            }
+            for section, data in rows.items()
+        }
+        cache.set(cls._cache_key(geohash, month), snapshot, cls.CACHE_TIMEOUT)
+        return snapshot
+
+    @classmethod
+    def build_all(cls, month: int) -> int:
+        """콘텐츠가 존재하는 모든 셀의 스냅샷 생성"""
+        started = time.perf_counter()
+        cells = get_spatial_index().occupied_geohashes(cls.PRECISION)
+        built = 0
+        for geohash in cells:
+            try:
+                cls.build_cell(geohash, month)
+                built += 1
+            except SoftTimeLimitExceeded:
+                # 하드 제한에 쓰기 도중 종료되지 않도록 즉시 중단 (남은 셀은 다음 실행에서 생성)
+                logger.warning(f"피드 스냅샷 시간 제한 도달: {built}/{len(cells)}개 셀 생성 후 중단")
+                raise
+            except Exception as e:
+                logger.error(f"피드 스냅샷 생성 실패 ({geohash}, {month}월): {str(e)}", exc_info=True)
+        logger.info(
+            f"비로그인 피드 스냅샷 {built}/{len(cells)}개 셀 생성 "
+            f"({time.perf_counter() - started:.1f}초)"
+        )
+        return built
+
+    @classmethod
+    def get_rows(cls, lat: float, lng: float, month: int) -> Optional[dict]:
+        """스냅샷으로 generate_recommendation_rows 와 동일한 구조의 행 조립 (없으면 None)"""
+        snapshot = cache.get(cls._cache_key(cls.cell_for(lat, lng), month))
+        if snapshot is None:
+            return None
+
+        all_ids = {cid for data in snapshot.values() for cid in data['ids']}
+        detail_map = {
+            detail.contentid: detail
+            for detail in ContentDetailCommon.objects.filter(contentid__in=all_ids).defer('overview')
+        }
+        return {
+            section: {
+                'title': data['title'],
+                'items': [detail_map[cid] for cid in data['ids'] if cid in detail_map],
+            }
+            for section, data in snapshot.items()
+        }
@@ -0,0 +1,136 @@
+import os
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_TRANSFORMER = 'sentence'
+SEQUENCE_CLASSIFIER = 'sequence'
+
+
+def _current_rss() -> int:
+    """현재 프로세스 RSS (바이트, /proc 미지원 시 최대 RSS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _load_sentence_transformer(name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+def _load_sequence_classifier(name: str):
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModelForSequenceClassification.from_pretrained(name)
+    model.eval()
+    return tokenizer, model
+
+
+class ModelRegistry:
+    """
+    프로세스 단위 공유 모델 레지스트리
+    - (종류, 모델명) 키당 1회만 적재 → 같은 모델을 쓰는 모듈끼리 인스턴스 공유
+    - import 시점이 아닌 첫 사용 시(또는 warm_up 호출 시) 적재
+    - 모델별 적재 시간과 적재 전후 RSS 증가량 기록 (동시 할당이 있으면 근사값)
+    """
+    LOADERS: Dict[str, Callable[[str], Any]] = {
+        SENTENCE_TRANSFORMER: _load_sentence_transformer,
+        SEQUENCE_CLASSIFIER: _load_sequence_classifier,
+    }
+
+    _lock = threading.Lock()
+    _key_locks: Dict[str, threading.Lock] = {}
+    _models: Dict[str, Any] = {}
+    _stats: Dict[str, Dict] = {}
+
+    @staticmethod
+    def key(kind: str, name: str) -> str:
+        return f"{kind}:{name}"
+
+    @classmethod
+    def get(cls, kind: str, name: str):
+        """모델 반환 (미적재 시 적재)"""
+        key = cls.key(kind, name)
+        model = cls._models.get(key)
+        if model is not None:
+            return model
+
+        with cls._lock:
+            key_lock = cls._key_locks.setdefault(key, threading.Lock())
+        # 다른 모델 적재를 막지 않도록 키별 잠금
+        with key_lock:
+            model = cls._models.get(key)
+            if model is None:
+                model = cls._load(kind, name, key)
+        return model
+
+    @classmethod
+    def _load(cls, kind: str, name: str, key: str):
+        if kind not in cls.LOADERS:
+            raise ValueError(f"Unknown model kind: {kind}")
+
+        rss_before = _current_rss()
+        started = time.perf_counter()
+        model = cls.LOADERS[kind](name)
+        elapsed = time.perf_counter() - started
+        rss_delta = max(_current_rss() - rss_before, 0)
+
+        cls._stats[key] = {
+            'key': key,
+            'load_seconds': elapsed,
+            'rss_bytes': rss_delta,
+            'pid': os.getpid(),
+        }
+        cls._models[key] = model
+        logger.info(f"모델 적재: {key} ({elapsed:.1f}초, RSS +{rss_delta / 2**20:.0f}MB)")
+        return model
+
+    @classmethod
+    def is_loaded(cls, kind: str, name: str) -> bool:
+        return cls.key(kind, name) in cls._models
+
+    @classmethod
+    def warm_up(cls, keys: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        모델 사전 적재 (keys: "종류:모델명" 목록, 기본값 settings.MODEL_WARMUP)
+        적재 실패는 기록만 하고 첫 사용 시 다시 시도
+        """
+        keys = list(getattr(settings, 'MODEL_WARMUP', []) if keys is None else keys)
+        for key in keys:
+            kind, sep, name = key.partition(':')
+            if not sep or not name:
+                logger.warning(f"잘못된 모델 키: {key} (형식: 종류:모델명)")
+                continue
+            try:
+                cls.get(kind, name)
+            except Exception as e:
+                logger.error(f"모델 사전 적재 실패 ({key}): {str(e)}", exc_info=True)
+        return cls.report()
+
+    @classmethod
+    def report(cls) -> List[Dict]:
+        """적재된 모델별 적재 시간 / RSS 증가량 (적재 순)"""
+        return [dict(stats) for stats in cls._stats.values()]
+
+    @staticmethod
+    def process_rss() -> int:
+        return _current_rss()
+
+
+def get_sentence_transformer(name: str):
+    """공유 SentenceTransformer 인스턴스"""
+    return ModelRegistry.get(SENTENCE_TRANSFORMER, name)
+
+
+def get_sequence_classifier(name: str) -> Tuple[Any, Any]:
+    """공유 (토크나이저, 시퀀스 분류 모델) — 모델은 eval 모드"""
+    return ModelRegistry.get(SEQUENCE_CLASSIFIER, name)
@@ -0,0 +1,38 @@
+from django.core.cache import cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationCacheGeneration:
+    """
+    사용자별 추천 캐시 세대(generation) 카운터
+    - MainRecommendationAPI 캐시 키에 세대 번호를 포함
+    - 무효화는 패턴 삭제(SCAN) 대신 INCR 1회 → 이전 세대 키는 TTL 로 자연 소멸
+    """
+    KEY_PREFIX = "rec:gen"
+    TIMEOUT = 60 * 60 * 24 * 7  # 7일 (미사용 사용자 키 정리, 추천 캐시 TTL 보다 충분히 김)
+
+    @classmethod
+    def _key(cls, user_id: int) -> str:
+        return f"{cls.KEY_PREFIX}:{user_id}"
+
+    @classmethod
+    def get(cls, user_id: int) -> int:
+        try:
+            return int(cache.get(cls._key(user_id)) or 0)
+        except Exception as e:
+            logger.warning(f"추천 캐시 세대 조회 실패 ({user_id}): {str(e)}")
+            return 0
+
+    @classmethod
+    def bump(cls, user_id: int) -> None:
+        """사용자 추천 캐시 전체 무효화 (O(1))"""
+        key = cls._key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # 키가 없으면 현재 세대(0) 다음 값으로 생성
+            cache.set(key, 1, cls.TIMEOUT)
+        except Exception as e:
+            logger.error(f"추천 캐시 세대 갱신 실패 ({user_id}): {str(e)}")
@@ -0,0 +1,129 @@
+import time
+import threading
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+from django.core.cache import cache
+from apps.recommender.models import ContentFeature
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DIM = 484
+TEXT_DIM = 384
+
+# 계절 프로토타입 문장
+SEASON_SENTENCES = {
+    'spring': ['벚꽃이 피는 계절', '따뜻한 봄바람', '피크닉하기 좋은 봄'],
+    'summer': ['해변에서 수영', '여름 바캉스', '시원한 음료와 야외 활동'],
+    'autumn': ['단풍이 아름다운 가을', '수확의 계절', '선선한 바람'],
+    'winter': ['눈이 내리는 겨울', '스키와 온천', '따뜻한 음료'],
+}
+# 요약문에 포함된 계절 키워드 1개당 계절 점수 가산점 (상한 1.0)
+KEYWORD_BONUS = 0.1
+SEASON_KEYWORDS = {
+    'spring': ['벚꽃', '꽃놀이', '봄꽃', '산책'],
+    'summer': ['해변', '수영', '여름', '바캉스'],
+    'autumn': ['단풍', '가을', '수확', '축제'],
+    'winter': ['눈', '스키', '온천', '겨울'],
+}
+
+
+class SeasonPrototypes:
+    """
+    ContentFeature.feature_vector 공간(484차원)의 계절 프로토타입 벡터
+    - 텍스트 부분(384)은 특징 벡터와 같은 모델(TEXT_MODEL_NAME)로 인코딩한 계절 문장 평균, 카테고리 부분(100)은 0
+    - 계절 점수 = min(정규화된 특징 벡터와의 내적 + KEYWORD_BONUS × 요약문 계절 키워드 수, 1.0)
+      → 조회 시 계산하므로 별도 계절 모델/점수 컬럼, 저장 시점 계산 및 일괄 갱신 불필요
+    - 계산은 update_season_sim 명령 / batch 태스크에서만 수행하고 공유 캐시에 저장
+      (웹 프로세스는 모델을 적재하지 않음, 캐시가 없으면 계절 점수 생략)
+    - 프로세스 사본은 REFRESH_INTERVAL 마다 버전 키를 확인해 재계산 결과를 반영
+    """
+    CACHE_KEY = f"season_prototypes:v2:{ContentFeature.TEXT_MODEL_NAME}"
+    VERSION_KEY = f"{CACHE_KEY}:version"
+    BUILD_LOCK_KEY = f"{CACHE_KEY}:building"
+    BUILD_LOCK_TIMEOUT = 60 * 10
+    REFRESH_INTERVAL = 300  # 초 단위, 버전 확인 주기
+
+    _lock = threading.Lock()
+    _vectors: Optional[Dict[str, np.ndarray]] = None
+    _version = None
+    _last_checked = 0.0
+
+    @classmethod
+    def build(cls, model=None) -> Dict[str, np.ndarray]:
+        """계절별 정규화 프로토타입 계산 (model 미지정 시 ContentFeature 텍스트 모델)"""
+        model = model or ContentFeature.get_text_model()
+        vectors = {}
+        for season, sentences in SEASON_SENTENCES.items():
+            # 키워드는 콘텐츠별 가산점으로 반영 (프로토타입에 중복 포함하지 않음)
+            embeddings = model.encode(sentences, convert_to_numpy=True, show_progress_bar=False)
+            text_vec = np.mean(embeddings, axis=0).astype(np.float32)
+
+            vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+            vector[:TEXT_DIM] = text_vec
+            norm = np.linalg.norm(vector)
+            vectors[season] = vector / norm if norm > 1e-8 else vector
+        return vectors
+
+    @classmethod
+    def rebuild(cls, model=None) -> Dict[str, np.ndarray]:
+        """프로토타입 재계산 후 공유 캐시와 버전 갱신 (배치 경로 전용)"""
+        vectors = cls.build(model)
+        version = time.time_ns()
+        cache.set_many({
+            cls.CACHE_KEY: {season: vec.tolist() for season, vec in vectors.items()},
+            cls.VERSION_KEY: version,
+        }, None)
+        cache.delete(cls.BUILD_LOCK_KEY)
+        with cls._lock:
+            cls._vectors, cls._version, cls._last_checked = vectors, version, time.monotonic()
+        return vectors
+
+    @classmethod
+    def _request_build(cls):
+        """캐시 미스 시 batch 큐에 재계산 예약 (동시 요청은 1회로 병합)"""
+        from apps.recommender.tasks import rebuild_season_prototypes
+
+        if cache.add(cls.BUILD_LOCK_KEY, 1, cls.BUILD_LOCK_TIMEOUT):
+            logger.warning("계절 프로토타입 캐시 없음, 계절 점수 생략 (재계산 예약)")
+            rebuild_season_prototypes.delay()
+
+    @classmethod
+    def get_all(cls) -> Optional[Dict[str, np.ndarray]]:
+        """공유 캐시의 프로토타입 (없으면 재계산을 예약하고 None)"""
+        now = time.monotonic()
+        if cls._vectors is not None and now - cls._last_checked < cls.REFRESH_INTERVAL:
+            return cls._vectors
+
+        with cls._lock:
+            if cls._vectors is not None and now - cls._last_checked < cls.REFRESH_INTERVAL:
+                return cls._vectors
+            try:
+                version = cache.get(cls.VERSION_KEY)
+                if version is not None and version == cls._version:
+                    cls._last_checked = now
+                    return cls._vectors
+
+                cached = cache.get(cls.CACHE_KEY) if version is not None else None
+                if not cached:
+                    cls._vectors, cls._version, cls._last_checked = None, None, now
+                    cls._request_build()
+                    return None
+            except Exception as e:
+                # 캐시 장애 시 기존 사본 유지
+                logger.warning(f"계절 프로토타입 캐시 조회 실패: {str(e)}")
+                cls._last_checked = now
+                return cls._vectors
+
+            cls._vectors = {
+                season: np.asarray(vec, dtype=np.float32) for season, vec in cached.items()
+            }
+            cls._version, cls._last_checked = version, now
+            return cls._vectors
+
+    @classmethod
+    def get(cls, season: str) -> Optional[np.ndarray]:
+        """(484,) 정규화된 계절 프로토타입 (캐시가 없으면 None → 계절 점수 생략)"""
+        vectors = cls.get_all()
+        return vectors.get(season) if vectors else None
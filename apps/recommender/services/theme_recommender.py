@@ -1,35 +1,40 @@
+import heapq
 import numpy as np
-from django.db.models import F, FloatField, Count, Q
-from django.utils import timezone
-from datetime import timedelta
+from django.db.models import F, Q, Case, When, Value, FloatField
+from django.db.models.functions import Coalesce, Least
 from pgvector.django import CosineDistance
-from apps.users.models import UserPreferenceProfile, GlobalPreferenceProfile
-from apps.users.services.preference_service import PreferenceService
-from ..models import ContentFeature
+from apps.core.constants import SEASON_MAP
+from apps.users.services.user_query_vector import UserQueryVector
+from apps.users.services.global_preference_service import GlobalPreferenceService
 from apps.items.models import ContentDetailCommon
-from apps.items.models import ContentSummarize
-from django.core.exceptions import ObjectDoesNotExist
-from django.db.models.functions import Cast
-from django.db.models.expressions import RawSQL
-from apps.interactions.models import ContentInteraction
-from apps.items.services.tourapi import get_nearby_content_ids
-import joblib
+from apps.items.services.spatial_index import get_nearby_contents
+from .feature_service import FeatureService
+from .feature_matrix import get_feature_matrix
+from .season_prototypes import SeasonPrototypes, SEASON_KEYWORDS, KEYWORD_BONUS
+from ..models import TOURIST_CATEGORIES, FOOD_CATEGORY
 import logging
-import random
-import time
-from typing import List, Dict
-import json
-from datetime import timedelta
-from django.utils import timezone
-from django.db.models import Count, Q
+from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 VECTOR_DIM = 484  # 모델 차원 수
-TOURIST_CATEGORIES = ["EX", "HS", "LS", "NA", "SH", "VE"]  # 관광지 카테고리
-FOOD_CATEGORY = "FD"  # 음식점 카테고리
+
+SEASON_TITLES = {
+    'winter': '겨울에 가기 좋은 곳',
+    'spring': '봄에 가기 좋은 곳',
+    'summer': '여름에 가기 좋은 곳',
+    'autumn': '가을에 가기 좋은 곳',
+}
 
 class ThemeRecommender:
+    # 'combined': 주변 후보군을 단일 쿼리로 가져와 파이썬에서 섹션 분할
+    # 'matrix': 인메모리 특징 행렬(FeatureMatrix)로 전 섹션을 한 번에 점수화
+    # 'sectioned': 섹션별로 개별 쿼리 실행 (기존 방식)
+    RETRIEVAL_MODE = 'combined'
+    SECTION_SIZE = 30
+    # 'sectioned' 모드의 벡터 검색 설정 (None이면 pgvector 기본 ef_search, EXACT면 순차 스캔)
+    EF_SEARCH = None
+    EXACT_SEARCH = False
 
     # 벡터 정규화 함수
     @staticmethod
@@ -38,202 +43,291 @@ class ThemeRecommender:
         return vec / norm if norm > 1e-8 else vec
 
     @staticmethod
-    def generate_recommendation_rows(user_id: int, month: int, user_lat: float, user_lng: float) -> dict:
+    def generate_recommendation_rows(user_id: int, month: int, user_lat: float, user_lng: float, mode: str = None) -> dict:
         """다양한 테마의 추천 행을 생성 (제목 포함)"""
-        # 계절 이름 매핑 (영문)
-        season_map = {
-            12: 'winter', 1: 'winter', 2: 'winter',
-            3: 'spring', 4: 'spring', 5: 'spring',
-            6: 'summer', 7: 'summer', 8: 'summer',
-            9: 'autumn', 10: 'autumn', 11: 'autumn'
-        }
-        
+        current_season = SEASON_MAP.get(month, 'winter')
+
         rows = {
             'personalized': {'title': '당신을 위한 맞춤 추천', 'items': []},
             'hidden_gems': {'title': '나만 알고 싶은 숨은 명소', 'items': []},
             'hot_places': {'title': '실시간 인기 명소', 'items': []},
-            'seasonal': {'title': f'{season_map.get(month, "특별")}에 가기 좋은 곳', 'items': []},
+            'seasonal': {'title': SEASON_TITLES.get(current_season, '여름에 가기 좋은 곳'), 'items': []},
             'restaurants': {'title': '당신의 입맛을 저격할 맛집', 'items': []}
         }
 
-        nearby_ids = get_nearby_content_ids(user_lat, user_lng)
+        nearby_ids, areacode = get_nearby_contents(user_lat, user_lng)
+        if not nearby_ids:
+            return rows
 
-        def get_db_results(blend_vec: np.ndarray, filters: Dict, size: int=30) -> List[int]:
-            blend_vec_list = blend_vec.tolist()  # NumPy 배열을 리스트로 변환
+        exp_blend, food_blend = ThemeRecommender._build_blend_vectors(
+            user_id, areacode, current_season
+        )
 
-            return (
+        fill_rows = {
+            'combined': ThemeRecommender._fill_rows_combined,
+            'matrix': ThemeRecommender._fill_rows_matrix,
+        }.get(mode or ThemeRecommender.RETRIEVAL_MODE, ThemeRecommender._fill_rows_sectioned)
+        fill_rows(rows, nearby_ids, exp_blend, food_blend, current_season)
+        return rows
+
+    @staticmethod
+    def _build_blend_vectors(user_id: int, areacode: Optional[int] = None,
+                             season: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """사용자 벡터와 지역/계절 세그먼트 사전 벡터를 가중 혼합한 (체험, 음식) 쿼리 벡터"""
+        prior = GlobalPreferenceService.get_segment_prior(areacode, season)
+        query = UserQueryVector.get(user_id, prior=prior)
+        return query['experience'], query['food']
+
+    @staticmethod
+    def _season_keyword_hits(season: str):
+        """요약문에 포함된 계절 키워드 수 (요약문이 없으면 0)"""
+        hits = [
+            Case(When(summarize__summarize_text__contains=keyword, then=Value(1)), default=Value(0))
+            for keyword in SEASON_KEYWORDS[season]
+        ]
+        return sum(hits[1:], hits[0])
+
+    @staticmethod
+    def _season_score(season: str, season_vec: Optional[np.ndarray]):
+        """계절 점수 식: min(계절 프로토타입 코사인 유사도 + KEYWORD_BONUS × 계절 키워드 수, 1.0)
+        (season_vec 가 없으면 NULL → 계절 섹션 비움)"""
+        if season_vec is None:
+            return Value(None, output_field=FloatField())
+        return Least(
+            1 - CosineDistance('feature__feature_vector', season_vec.tolist())
+            + KEYWORD_BONUS * ThemeRecommender._season_keyword_hits(season),
+            Value(1.0),
+            output_field=FloatField(),
+        )
+
+    @staticmethod
+    def _rank_seasonal(matrix, mask: np.ndarray, season_vec: np.ndarray,
+                       keyword_hits: Dict[int, int], size: int) -> List[int]:
+        """특징 행렬 기준 계절 점수 상위 size개 contentid (_season_score 와 같은 식)"""
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return []
+        contentids = matrix.contentids[rows]
+        hits = np.array([keyword_hits.get(cid, 0) for cid in contentids.tolist()], dtype=np.float32)
+        scores = np.minimum(matrix.vectors[rows] @ season_vec + KEYWORD_BONUS * hits, 1.0)
+        return contentids[np.argsort(-scores, kind='stable')[:size]].tolist()
+
+    @staticmethod
+    def _annotate_section_stats(queryset, season: Optional[str] = None,
+                                season_vec: Optional[np.ndarray] = None):
+        """숨은 명소/핫플/계절 섹션 선정에 필요한 상호작용 수·계절 점수 주석 (비정규화 카운터 조회)"""
+        return queryset.annotate(
+            interaction_count=Coalesce(F('interaction_stats__total_count'), Value(0)),
+            recent_interaction_count=Coalesce(F('interaction_stats__recent_count'), Value(0)),
+            season_sim=ThemeRecommender._season_score(season, season_vec),
+        )
+
+    @staticmethod
+    def _select_section_ids(stats) -> Tuple[List[int], List[int], List[int]]:
+        """(contentid, similarity, interaction_count, recent_count, season_sim) 목록에서
+        숨은 명소/핫플/계절 후보 ID 선정 (섹션 기준값 상위 size개)"""
+        size = ThemeRecommender.SECTION_SIZE
+        hidden = [c[0] for c in stats if c[2] == 0]
+        hot = [c[0] for c in heapq.nlargest(size, stats, key=lambda c: (c[3], c[1] or 0))]
+        seasonal = [c[0] for c in heapq.nlargest(
+            size, [c for c in stats if c[4] is not None], key=lambda c: c[4]
+        )]
+        return hidden, hot, seasonal
+
+    @staticmethod
+    def _assign_items(rows: dict, section_results: Dict[str, List[Tuple[int, float]]]) -> None:
+        """섹션별 (contentid, similarity) 결과를 ContentDetailCommon 객체로 1회 조회해 채움"""
+        similarity_map = {
+            contentid: similarity
+            for results in section_results.values()
+            for contentid, similarity in results
+        }
+        detail_map = {
+            detail.contentid: detail
+            for detail in ContentDetailCommon.objects.filter(contentid__in=similarity_map).defer('overview')
+        }
+        for detail in detail_map.values():
+            detail.similarity = similarity_map.get(detail.contentid)
+
+        for section, results in section_results.items():
+            rows[section]['items'] = [
+                detail_map[contentid] for contentid, _ in results if contentid in detail_map
+            ]
+
+    @staticmethod
+    def _fill_rows_combined(rows: dict, nearby_ids: List[int], exp_blend: np.ndarray,
+                            food_blend: np.ndarray, current_season: str) -> None:
+        """주변 후보군 1회 조회 후 파이썬에서 5개 섹션으로 분할 (DB 왕복 2회)"""
+        size = ThemeRecommender.SECTION_SIZE
+
+        # 음식점은 음식 벡터, 관광지는 체험 벡터 기준 유사도
+        candidates = list(
+            ThemeRecommender._annotate_section_stats(
                 ContentDetailCommon.objects
-                .select_related('feature')  # ContentFeature와 JOIN
-                .annotate(
-                    similarity=1 - CosineDistance(
-                        'feature__feature_vector',  # 역방향 관계 접근
-                        blend_vec_list
-                    )
-                )
-                .filter(
-                    **filters  # ContentDetailCommon 필드 직접 사용
-                )
-                .order_by('-similarity')  # 내림차순 정렬
-                [: size]  # 상위 size개만 추출
+                .filter(contentid__in=nearby_ids, feature__feature_vector__isnull=False)
+                .filter(Q(lclssystm1__in=TOURIST_CATEGORIES) | Q(lclssystm1=FOOD_CATEGORY)),
+                current_season, SeasonPrototypes.get(current_season)
+            )
+            .annotate(
+                similarity=1 - Case(
+                    When(lclssystm1=FOOD_CATEGORY,
+                         then=CosineDistance('feature__feature_vector', food_blend.tolist())),
+                    default=CosineDistance('feature__feature_vector', exp_blend.tolist()),
+                ),
+            )
+            .values_list(
+                'contentid', 'lclssystm1', 'similarity',
+                'interaction_count', 'recent_interaction_count', 'season_sim'
+            )
+        )
+
+        tourist = [(c[0], c[2], c[3], c[4], c[5]) for c in candidates if c[1] in TOURIST_CATEGORIES]
+        restaurants = [(c[0], c[2]) for c in candidates if c[1] == FOOD_CATEGORY]
+        hidden_ids, hot_ids, seasonal_ids = ThemeRecommender._select_section_ids(tourist)
+
+        def by_similarity(items, allowed=None):
+            if allowed is not None:
+                allowed = set(allowed)
+                items = [c for c in items if c[0] in allowed]
+            return [(c[0], c[1]) for c in heapq.nlargest(size, items, key=lambda c: c[1])]
+
+        ThemeRecommender._assign_items(rows, {
+            'personalized': by_similarity(tourist),
+            'hidden_gems': by_similarity(tourist, hidden_ids),
+            'hot_places': by_similarity(tourist, hot_ids),
+            'seasonal': by_similarity(tourist, seasonal_ids),
+            'restaurants': by_similarity(restaurants),
+        })
+
+    @staticmethod
+    def _fill_rows_matrix(rows: dict, nearby_ids: List[int], exp_blend: np.ndarray,
+                          food_blend: np.ndarray, current_season: str) -> None:
+        """인메모리 특징 행렬로 5개 섹션을 한 번의 행렬곱으로 점수화"""
+        matrix = get_feature_matrix()
+        nearby_mask = matrix.mask_for(contentids=nearby_ids)
+        tourist_mask = nearby_mask & matrix.mask_for(categories=TOURIST_CATEGORIES)
+        food_mask = nearby_mask & matrix.mask_for(categories=[FOOD_CATEGORY])
+
+        # 벡터 계산 없는 가벼운 통계 쿼리 1회 (상호작용 수 + 요약문 계절 키워드 수)
+        rows_stats = list(
+            ThemeRecommender._annotate_section_stats(
+                ContentDetailCommon.objects.filter(contentid__in=matrix.contentids[tourist_mask].tolist())
             )
+            .annotate(season_keywords=ThemeRecommender._season_keyword_hits(current_season))
+            .values_list('contentid', 'interaction_count', 'recent_interaction_count', 'season_keywords')
+        )
+        stats = [(c[0], None, c[1], c[2], None) for c in rows_stats]
+        hidden_ids, hot_ids, _ = ThemeRecommender._select_section_ids(stats)
 
-        # 1. 맞춤형 추천
-        try:
-            user_profile = UserPreferenceProfile.objects.get(user_id=user_id)
-            user_exp = np.array(user_profile.experience, dtype=np.float32)
-        except ObjectDoesNotExist:
-            user_exp = np.zeros(VECTOR_DIM)
+        # 계절 후보: 계절 프로토타입과 특징 행렬의 내적 1회 + 키워드 가산점 (프로토타입 캐시가 없으면 생략)
+        season_vec = SeasonPrototypes.get(current_season)
+        seasonal_ids = [] if season_vec is None else ThemeRecommender._rank_seasonal(
+            matrix, tourist_mask, season_vec, {c[0]: c[3] for c in rows_stats},
+            ThemeRecommender.SECTION_SIZE
+        )
 
-        # 가중치 동적 계산
-        interaction_count = ContentInteraction.objects.filter(user_id=user_id).count()
-        user_weight = PreferenceService.calculate_user_weight(interaction_count)
-        global_weight = 1.0 - user_weight
+        sections = ['personalized', 'hidden_gems', 'hot_places', 'seasonal', 'restaurants']
+        masks = np.stack([
+            tourist_mask,
+            tourist_mask & matrix.mask_for(contentids=hidden_ids),
+            tourist_mask & matrix.mask_for(contentids=hot_ids),
+            tourist_mask & matrix.mask_for(contentids=seasonal_ids),
+            food_mask,
+        ])
+        queries = np.stack([exp_blend, exp_blend, exp_blend, exp_blend, food_blend])
+        results = matrix.topk(queries, masks, k=ThemeRecommender.SECTION_SIZE)
 
-        global_exp = GlobalPreferenceProfile.objects.first().experience
-        try:
-            global_exp_vec = np.array(global_exp, dtype=np.float32)
-            assert global_exp_vec.size == VECTOR_DIM  # 차원 일치 확인
-        except (TypeError, ValueError, AssertionError):
-            global_exp_vec = np.zeros(VECTOR_DIM)
-
-        
-        blended_vec = ThemeRecommender.l2_normalize(user_weight*ThemeRecommender.l2_normalize(user_exp) + global_weight*ThemeRecommender.l2_normalize(global_exp_vec))
-        
-        rows['personalized']['items'] = get_db_results(
-            blended_vec,
-            {'lclssystm1__in': TOURIST_CATEGORIES, 'contentid__in': nearby_ids}
+        ThemeRecommender._assign_items(rows, dict(zip(sections, results)))
+
+    @staticmethod
+    def _fill_rows_sectioned(rows: dict, nearby_ids: List[int], exp_blend: np.ndarray,
+                             food_blend: np.ndarray, current_season: str) -> None:
+        """섹션별 개별 쿼리 방식"""
+
+        section_results = {section: [] for section in rows}
+
+        def get_db_results(blend_vec: np.ndarray, categories: List[str], contentids, size: int=30) -> List[Tuple[int, float]]:
+            # 카테고리 부분 인덱스 + 과다 조회 기반 필터 벡터 검색 (라운드 0이면 바로 정확 검색)
+            return FeatureService.filtered_search(
+                blend_vec,
+                k=size,
+                categories=categories,
+                contentids=list(contentids),
+                ef_search=ThemeRecommender.EF_SEARCH,
+                max_rounds=0 if ThemeRecommender.EXACT_SEARCH else 3,
+            )
+
+        # 1. 맞춤형 추천
+        section_results['personalized'] = get_db_results(
+            exp_blend, TOURIST_CATEGORIES, nearby_ids
         )
 
         # 2. 숨은 명소
         try:
             # 저조한 상호작용 콘텐츠 ID 추출
             low_interaction_ids = (
-                ContentDetailCommon.objects  # 모든 콘텐츠 대상
-                .annotate(
-                    interaction_count=Count(
-                        'contentinteraction',  # ContentInteraction 모델의 related_name
-                        filter=Q(contentinteraction__user__isnull=False)
-                    )
-                )
+                ContentDetailCommon.objects
                 .filter(contentid__in=nearby_ids)
                 .filter(lclssystm1__in=TOURIST_CATEGORIES)
                 .filter(
-                    Q(interaction_count__isnull=True) | Q(interaction_count=0)
+                    Q(interaction_stats__isnull=True) | Q(interaction_stats__total_count=0)
                 )
-                .order_by('interaction_count')
                 .values_list('contentid', flat=True)[:30]
             )
 
-            # 가중치 동적 계산
-            hidden_blend = ThemeRecommender.l2_normalize(
-                user_weight*ThemeRecommender.l2_normalize(user_exp) + 
-                global_weight*ThemeRecommender.l2_normalize(global_exp_vec)
-            )
-            
-            rows['hidden_gems']['items'] = get_db_results(
-                hidden_blend,
-                {'contentid__in': low_interaction_ids},
+            section_results['hidden_gems'] = get_db_results(
+                exp_blend, TOURIST_CATEGORIES, low_interaction_ids,
                 size=30
             )
         except Exception as e:
             logger.error(f"숨은 명소 추천 오류: {str(e)}")
-            rows['hidden_gems']['items'] = []
+            section_results['hidden_gems'] = []
 
         # 3. 핫한 명소
-        now = timezone.now()
-        week_ago = now - timedelta(days=7)
-
         try:
-            # 최근 7일 간 상호작용이 많은 콘텐츠 ID 추출
+            # 최근 7일 간 상호작용이 많은 콘텐츠 ID 추출 (롤업 카운터 기준)
             hot_interaction_ids = (
                 ContentDetailCommon.objects
-                .annotate(
-                    recent_interaction_count=Count(
-                        'contentinteraction',
-                        filter=Q(
-                            contentinteraction__user__isnull=False,
-                            contentinteraction__timestamp__gte=week_ago
-                        )
-                    )
-                )
                 .filter(contentid__in=nearby_ids)
                 .filter(lclssystm1__in=TOURIST_CATEGORIES)
-                .order_by('-recent_interaction_count')
+                .order_by(F('interaction_stats__recent_count').desc(nulls_last=True))
                 .values_list('contentid', flat=True)[:30]
             )
 
-            # 핫한 명소 벡터 계산 (숨은 명소와 동일하게 가중치 적용)
-            hot_blend = ThemeRecommender.l2_normalize(
-                user_weight * ThemeRecommender.l2_normalize(user_exp) +
-                global_weight * ThemeRecommender.l2_normalize(global_exp_vec)
-            )
-
             # 검색 및 필터 적용
-            rows['hot_places']['items'] = get_db_results(
-                hot_blend,
-                {'contentid__in': hot_interaction_ids},
+            section_results['hot_places'] = get_db_results(
+                exp_blend, TOURIST_CATEGORIES, hot_interaction_ids,
                 size=30
             )
         except Exception as e:
             logger.error(f"핫한 명소 추천 오류: {str(e)}")
-            rows['hot_places']['items'] = []
+            section_results['hot_places'] = []
 
-        # 4. 계절 추천 (유사도 점수 기반)
+        # 4. 계절 추천 (계절 프로토타입 유사도 + 키워드 가산점 기반)
         try:
-            current_season = season_map.get(month, 'winter')
-
-            # 가중치 동적 계산
-            seasonal_blend = ThemeRecommender.l2_normalize(
-                user_weight*ThemeRecommender.l2_normalize(user_exp) + 
-                global_weight*ThemeRecommender.l2_normalize(global_exp_vec)
-            )
-
-            # 계절 유사도가 높은 콘텐츠 ID 추출
-            seasonal_ids = (
+            # 계절 점수가 높은 콘텐츠 ID 추출 (프로토타입 캐시가 없으면 생략)
+            season_vec = SeasonPrototypes.get(current_season)
+            seasonal_ids = [] if season_vec is None else list(
                 ContentDetailCommon.objects
-                .filter(contentid__in=nearby_ids)
-                .filter(lclssystm1__in=TOURIST_CATEGORIES)
-                .filter(summarize__isnull=False)  # 요약 정보가 있는 경우만
-                .order_by(f'-summarize__{current_season}_sim')  # OneToOne 관계 접근
+                .filter(contentid__in=nearby_ids, lclssystm1__in=TOURIST_CATEGORIES,
+                        feature__feature_vector__isnull=False)
+                .annotate(season_sim=ThemeRecommender._season_score(current_season, season_vec))
+                .order_by('-season_sim')
                 .values_list('contentid', flat=True)[:30]
             )
 
-            if current_season == 'winter':
-                rows['seasonal']['title'] = '겨울에 가기 좋은 곳'
-            elif current_season == 'spring':
-                rows['seasonal']['title'] = '봄에 가기 좋은 곳'
-            elif current_season == 'summer':
-                rows['seasonal']['title'] = '여름에 가기 좋은 곳'
-            elif current_season == 'autumn':
-                rows['seasonal']['title'] = '가을에 가기 좋은 곳'
-            else:
-                rows['seasonal']['title'] = '여름에 가기 좋은 곳'
-
-            rows['seasonal']['items'] = get_db_results(
-                seasonal_blend,
-                {'contentid__in': seasonal_ids},
+            section_results['seasonal'] = get_db_results(
+                exp_blend, TOURIST_CATEGORIES, seasonal_ids,
                 size=30
             )
 
         except Exception as e:
             logger.error(f"계절 추천 오류: {str(e)}", exc_info=True)
-            rows['seasonal']['items'] = []
+            section_results['seasonal'] = []
 
         # 5. 맛집 추천
-        try:
-            user_food = np.array(user_profile.food, dtype=np.float32)
-        except:
-            user_food = np.zeros(VECTOR_DIM)
-
-        global_food = GlobalPreferenceProfile.objects.first().food
-        global_food_vec = np.array(global_food, dtype=np.float32) if global_food is not None else np.zeros(VECTOR_DIM)
-        
-        # 가중치 동적 계산
-        food_blend = ThemeRecommender.l2_normalize(user_weight*ThemeRecommender.l2_normalize(user_food) + global_weight*ThemeRecommender.l2_normalize(global_food_vec))
-        
-        rows['restaurants']['items'] = get_db_results(
-            food_blend,
-            {'lclssystm1': FOOD_CATEGORY, 'contentid__in': nearby_ids}
+        section_results['restaurants'] = get_db_results(
+            food_blend, [FOOD_CATEGORY], nearby_ids
         )
 
-        return rows
+        ThemeRecommender._assign_items(rows, section_results)
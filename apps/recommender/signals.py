@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from apps.items.models import ContentDetailCommon
+from .models import ContentFeature
+
+
+@receiver(post_save, sender=ContentDetailCommon, dispatch_uid="sync_feature_lclssystm1")
+def sync_feature_category(sender, instance, created, **kwargs):
+    """대분류 변경 시 ContentFeature.lclssystm1(부분 HNSW 인덱스/필터 검색 컬럼) 동기화 (벡터 재생성을 기다리지 않음)"""
+    update_fields = kwargs.get('update_fields')
+    if created or (update_fields and 'lclssystm1' not in update_fields):
+        return
+    (
+        ContentFeature.objects
+        .filter(detail=instance)
+        .exclude(lclssystm1=instance.lclssystm1)
+        .update(lclssystm1=instance.lclssystm1)
+    )
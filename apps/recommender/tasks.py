@@ -0,0 +1,59 @@
+import logging
+from celery import shared_task
+from django.utils import timezone
+from django.core.cache import cache
+from .services.feed_snapshot import AnonymousFeedSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    queue='batch',
+    priority=3,
+    soft_time_limit=3000,
+    time_limit=3300,
+    ignore_result=True
+)
+def build_anonymous_feed_snapshots(month=None):
+    """비로그인 메인 피드 스냅샷 일괄 생성 (geohash 셀 × 월)"""
+    month = month or timezone.now().month
+    built = AnonymousFeedSnapshot.build_all(month)
+    logger.info(f"[SNAPSHOT] {month}월 스냅샷 {built}개 셀 생성 완료")
+    return built
+
+
+@shared_task(queue='batch', priority=4, ignore_result=True)
+def rebuild_season_prototypes():
+    """계절 프로토타입 재계산 (공유 캐시 미스 시 예약, 텍스트 모델은 batch 워커에서만 적재)"""
+    from .services.season_prototypes import SeasonPrototypes
+
+    vectors = SeasonPrototypes.rebuild()
+    logger.info(f"[SEASON] 계절 프로토타입 {len(vectors)}개 갱신")
+    return len(vectors)
+
+
+@shared_task(queue='maintenance', ignore_result=True)
+def prune_embedding_cache(grace_days=1):
+    """현재 요약문이 쓰지 않는 임베딩 캐시 항목 정리 (요약문 개정 시 남는 이전 해시, 미사용 모델)"""
+    from datetime import timedelta
+    from apps.items.models import ContentSummarize
+    from .models import ContentFeature
+    from .services.embedding_cache import CachedEncoder
+
+    summaries = ContentSummarize.objects.values_list('summarize_text', flat=True).iterator(chunk_size=2000)
+    live_texts = {ContentFeature.TEXT_MODEL_NAME: summaries}
+    deleted = CachedEncoder.prune(live_texts, older_than=timezone.now() - timedelta(days=grace_days))
+    logger.info(f"[EMBEDDING] 미사용 임베딩 캐시 {deleted}건 삭제")
+    return deleted
+
+
+@shared_task(queue='realtime', priority=5, ignore_result=True)
+def refresh_main_recommendation(cache_key, user_id, month, lat, lng):
+    """만료된 메인 피드 캐시 백그라운드 갱신 (stale-while-revalidate)"""
+    from .views import MainRecommendationAPI
+
+    view = MainRecommendationAPI()
+    try:
+        view.refresh_cache(cache_key, user_id, month, lat, lng)
+    finally:
+        cache.delete(view._lock_key(cache_key))
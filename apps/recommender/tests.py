@@ -1,3 +1,503 @@
-from django.test import TestCase
+import contextlib
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import DatabaseError
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from django.test import SimpleTestCase, override_settings
+
+from apps.recommender import signals as recommender_signals
+from apps.recommender.models import TOURIST_CATEGORIES
+from apps.recommender.services import embedding_cache, feature_service
+from apps.recommender.services.embedding_cache import CachedEncoder
+from apps.recommender.services.feature_matrix import FeatureMatrix
+from apps.recommender.services.model_registry import ModelRegistry
+from apps.recommender.services.feature_service import FeatureService
+from apps.recommender.services.feed_snapshot import AnonymousFeedSnapshot
+from apps.recommender.services.recommendation_cache import RecommendationCacheGeneration
+from apps.recommender.services.season_prototypes import KEYWORD_BONUS
+from apps.recommender.services.theme_recommender import ThemeRecommender
+from apps.recommender import views
+from apps.recommender.views import MainRecommendationAPI
+
+DIM = FeatureMatrix.VECTOR_DIM
+
+
+def make_matrix(size=40, seed=3):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(size, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    contentids = rng.permutation(np.arange(1000, 1000 + size))
+    categories = np.array(['FD' if i % 3 == 0 else 'EX' for i in range(size)], dtype=object)
+    return FeatureMatrix(contentids, categories, vectors)
+
+
+def make_queries(count=3, seed=11):
+    rng = np.random.default_rng(seed)
+    queries = rng.normal(size=(count, DIM)).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def brute_force_topk(matrix, query, mask, k):
+    """마스크된 행 전체 점수를 정렬한 기준 결과"""
+    rows = np.flatnonzero(mask)
+    scores = matrix.vectors[rows] @ query
+    order = np.argsort(-scores, kind='stable')[:k]
+    return [(int(matrix.contentids[rows[i]]), float(scores[i])) for i in order]
+
+
+class FeatureMatrixTopkTests(SimpleTestCase):
+    """topk() 결과가 마스크 적용 후 전수 정렬 결과와 같은지 확인"""
+
+    def setUp(self):
+        self.matrix = make_matrix()
+        self.queries = make_queries()
+
+    def assertSameRanking(self, result, expected):
+        self.assertEqual([cid for cid, _ in result], [cid for cid, _ in expected])
+        np.testing.assert_allclose(
+            [score for _, score in result], [score for _, score in expected], rtol=1e-5, atol=1e-6
+        )
+
+    def test_shared_mask_matches_brute_force(self):
+        mask = self.matrix.mask_for(categories=['EX'])
+        results = self.matrix.topk(self.queries, mask, k=5)
+
+        self.assertEqual(len(results), len(self.queries))
+        for query, result in zip(self.queries, results):
+            self.assertSameRanking(result, brute_force_topk(self.matrix, query, mask, 5))
+
+    def test_per_query_mask_matches_brute_force(self):
+        rng = np.random.default_rng(5)
+        masks = rng.random((len(self.queries), self.matrix.size)) < 0.4
+        masks[-1] = False
+        masks[-1, :2] = True  # k 보다 적은 후보
+
+        results = self.matrix.topk(self.queries, masks, k=5)
+        for query, mask, result in zip(self.queries, masks, results):
+            self.assertSameRanking(result, brute_force_topk(self.matrix, query, mask, 5))
+        self.assertEqual(len(results[-1]), 2)
+
+    def test_mask_for_contentids(self):
+        picked = self.matrix.contentids[[1, 4, 7]].tolist()
+        mask = self.matrix.mask_for(contentids=picked)
+
+        result = self.matrix.topk(self.queries[0], mask, k=10)[0]
+        self.assertCountEqual([cid for cid, _ in result], picked)
+
+    def test_empty_mask_returns_empty_lists(self):
+        mask = np.zeros(self.matrix.size, dtype=bool)
+        self.assertEqual(self.matrix.topk(self.queries, mask, k=5), [[], [], []])
+
+
+class FeatureMatrixSnapshotTests(SimpleTestCase):
+    """save_snapshot → load_snapshot 왕복 후 같은 행렬인지 확인"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        self.matrix = make_matrix()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.matrix.save_snapshot(self.directory, 7)
+        loaded = FeatureMatrix.load_snapshot(self.directory, 7)
+
+        self.assertIsNotNone(loaded)
+        np.testing.assert_array_equal(loaded.contentids, self.matrix.contentids)
+        self.assertEqual(loaded.categories.tolist(), self.matrix.categories.tolist())
+        np.testing.assert_array_equal(np.asarray(loaded.vectors), self.matrix.vectors)
+
+        queries = make_queries()
+        mask = self.matrix.mask_for(categories=['FD'])
+        self.assertEqual(loaded.topk(queries, mask, k=5), self.matrix.topk(queries, mask, k=5))
+
+    def test_missing_version_returns_none(self):
+        self.matrix.save_snapshot(self.directory, 7)
+        self.assertIsNone(FeatureMatrix.load_snapshot(self.directory, 8))
+
+    def test_newer_snapshot_removes_older_versions(self):
+        self.matrix.save_snapshot(self.directory, 7)
+        self.matrix.save_snapshot(self.directory, 8)
+
+        self.assertIsNone(FeatureMatrix.load_snapshot(self.directory, 7))
+        self.assertIsNotNone(FeatureMatrix.load_snapshot(self.directory, 8))
+
+    def test_mismatched_snapshot_is_ignored(self):
+        self.matrix.save_snapshot(self.directory, 7)
+        snapshot_dir = self.directory / 'feature_matrix_v7'
+        np.save(snapshot_dir / FeatureMatrix.VECTORS_FILE, np.asarray(self.matrix.vectors)[:-1])
+
+        self.assertIsNone(FeatureMatrix.load_snapshot(self.directory, 7))
+
+
+class SeasonalRankingTests(SimpleTestCase):
+    """행렬 모드 계절 순위가 min(프로토타입 코사인 + 키워드 가산점, 1.0) 기준 전수 정렬과 같은지 확인"""
+
+    def test_rank_seasonal_adds_capped_keyword_bonus(self):
+        matrix = make_matrix()
+        season_vec = make_queries(1)[0]
+        mask = matrix.mask_for(categories=['EX'])
+        rows = np.flatnonzero(mask)
+        # 코사인 하위 콘텐츠에 키워드 가산점 → 순위 상승
+        cosine = matrix.vectors[rows] @ season_vec
+        boosted = matrix.contentids[rows[np.argsort(cosine)[:3]]].tolist()
+        keyword_hits = {cid: 4 for cid in boosted}
+
+        result = ThemeRecommender._rank_seasonal(matrix, mask, season_vec, keyword_hits, 5)
+
+        hits = np.array([keyword_hits.get(cid, 0) for cid in matrix.contentids[rows].tolist()])
+        scores = np.minimum(cosine + KEYWORD_BONUS * hits, 1.0)
+        expected = matrix.contentids[rows[np.argsort(-scores, kind='stable')[:5]]].tolist()
+        self.assertEqual(result, expected)
+        self.assertTrue(set(boosted) & set(result))
+
+    def test_rank_seasonal_empty_mask(self):
+        matrix = make_matrix()
+        mask = np.zeros(matrix.size, dtype=bool)
+        self.assertEqual(ThemeRecommender._rank_seasonal(matrix, mask, make_queries(1)[0], {}, 5), [])
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_rows(*contentids):
+    item = lambda cid: SimpleNamespace(
+        contentid=cid, title=f'콘텐츠 {cid}', addr1='서울', addr2=None,
+        firstimage=None, firstimage2=None, lclssystm3=None,
+    )
+    return {'personalized': {'title': '맞춤 추천', 'items': [item(cid) for cid in contentids]}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AnonymousFeedSnapshotTests(SimpleTestCase):
+    """비로그인 피드는 스냅샷 유무와 관계없이 셀 중심 좌표 기준으로 생성"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_snapshot_miss_uses_cell_center(self):
+        first, second = (37.5665, 126.9780), (37.5675, 126.9790)
+        self.assertEqual(AnonymousFeedSnapshot.cell_for(*first), AnonymousFeedSnapshot.cell_for(*second))
+
+        view = MainRecommendationAPI()
+        with mock.patch.object(
+            ThemeRecommender, 'generate_recommendation_rows', return_value=make_rows(1)
+        ) as generate:
+            view.refresh_cache('rec:test', None, 7, *first)
+            view.refresh_cache('rec:test', None, 7, *second)
+
+        center = AnonymousFeedSnapshot.cell_center(*first)
+        self.assertEqual(generate.call_count, 2)
+        for call in generate.call_args_list:
+            self.assertEqual((call.kwargs['user_lat'], call.kwargs['user_lng']), center)
+
+    def test_build_cell_uses_same_center(self):
+        geohash = AnonymousFeedSnapshot.cell_for(37.5665, 126.9780)
+        with mock.patch.object(
+            ThemeRecommender, 'generate_recommendation_rows', return_value=make_rows(1, 2)
+        ) as generate:
+            snapshot = AnonymousFeedSnapshot.build_cell(geohash, 7)
+
+        self.assertEqual(
+            (generate.call_args.kwargs['user_lat'], generate.call_args.kwargs['user_lng']),
+            AnonymousFeedSnapshot.cell_center(37.5665, 126.9780)
+        )
+        self.assertEqual(snapshot['personalized']['ids'], [1, 2])
+
+    def test_snapshot_hit_skips_live_pipeline(self):
+        with mock.patch.object(AnonymousFeedSnapshot, 'get_rows', return_value=make_rows(3)), \
+                mock.patch.object(ThemeRecommender, 'generate_recommendation_rows') as generate:
+            data = MainRecommendationAPI().refresh_cache('rec:test', None, 7, 37.5665, 126.9780)
+
+        generate.assert_not_called()
+        self.assertEqual([item['contentid'] for item in data['sections'][0]['items']], [3])
+        self.assertEqual(cache.get('rec:test')['data'], data)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class MainRecommendationCacheTests(SimpleTestCase):
+    """stale-while-revalidate / single-flight: 갱신 중인 요청은 대기하지 않음"""
+    LAT, LNG = 37.5665, 126.9780
+
+    def setUp(self):
+        cache.clear()
+        self.view = MainRecommendationAPI()
+        self.cache_key = self.view._generate_cache_key(AnonymousUser(), timezone.now().month, self.LAT, self.LNG)
+        self.generate = mock.patch.object(
+            ThemeRecommender, 'generate_recommendation_rows', return_value=make_rows(1)
+        ).start()
+        self.delay = mock.patch.object(views.refresh_main_recommendation, 'delay').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def get(self):
+        request = APIRequestFactory().get('/recommendations/main/', {'lat': self.LAT, 'lng': self.LNG})
+        return MainRecommendationAPI.as_view()(request)
+
+    def store(self, age, *contentids):
+        data = {'status': 'success', 'sections': [{'items': [{'contentid': c} for c in contentids]}]}
+        cache.set(self.cache_key, {'data': data, 'generated_at': time.time() - age})
+        return data
+
+    def test_fresh_entry_is_served_without_refresh(self):
+        data = self.store(0, 5)
+        self.assertEqual(self.get().data, data)
+        self.delay.assert_not_called()
+        self.generate.assert_not_called()
+
+    def test_stale_entry_is_served_and_refreshed_once(self):
+        data = self.store(MainRecommendationAPI.CACHE_TIMEOUT + 1, 5)
+        self.assertEqual(self.get().data, data)
+        self.assertEqual(self.get().data, data)
+        self.delay.assert_called_once()
+        self.generate.assert_not_called()
+
+    def test_miss_while_locked_returns_snapshot_without_waiting(self):
+        cache.add(self.view._lock_key(self.cache_key), 1)
+        with mock.patch.object(AnonymousFeedSnapshot, 'get_rows', return_value=make_rows(7)), \
+                mock.patch.object(views.time, 'sleep') as sleep:
+            response = self.get()
+
+        sleep.assert_not_called()
+        self.generate.assert_not_called()
+        self.assertEqual([item['contentid'] for item in response.data['sections'][0]['items']], [7])
+        self.assertIsNone(cache.get(self.cache_key))  # 계산 중인 요청의 결과를 덮어쓰지 않음
+
+    def test_miss_computes_once_and_releases_lock(self):
+        response = self.get()
+
+        self.generate.assert_called_once()
+        self.assertEqual(cache.get(self.cache_key)['data'], response.data)
+        self.assertIsNone(cache.get(self.view._lock_key(self.cache_key)))
+
+
+class FilteredSearchTests(SimpleTestCase):
+    """인덱스 과다 조회가 부족하면 파티션 COUNT 없이 정확 검색으로 전환"""
+
+    def setUp(self):
+        self.objects = mock.MagicMock()
+        self.base_qs = self.objects.filter.return_value.annotate.return_value.order_by.return_value
+        for target in [
+            mock.patch.object(feature_service.ContentFeature, 'objects', self.objects),
+            mock.patch.object(FeatureService, 'vector_search', lambda **kwargs: contextlib.nullcontext()),
+        ]:
+            target.start()
+            self.addCleanup(target.stop)
+        self.query = make_queries(1)[0]
+
+    def test_full_index_pass_returns_without_exact_scan(self):
+        fetch = self.base_qs.values_list.return_value.__getitem__
+        fetch.return_value = [(i, 0.1) for i in range(30)]
+
+        result = FeatureService.filtered_search(self.query, k=30, categories=TOURIST_CATEGORIES)
+
+        self.assertEqual([cid for cid, _ in result], list(range(30)))
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_short_index_pass_falls_back_to_exact_scan(self):
+        fetch = self.base_qs.values_list.return_value.__getitem__
+        fetch.side_effect = [[(1, 0.1), (2, 0.2)], [(i, 0.3) for i in range(30)]]
+
+        result = FeatureService.filtered_search(self.query, k=30, categories=TOURIST_CATEGORIES)
+
+        self.assertEqual([cid for cid, _ in result], list(range(30)))
+        self.assertEqual(fetch.call_count, 2)
+        self.objects.filter.return_value.count.assert_not_called()
+        self.base_qs.count.assert_not_called()
+
+
+class FeatureCategorySyncTests(SimpleTestCase):
+    """ContentDetailCommon 대분류 변경 시 ContentFeature.lclssystm1 동기화"""
+
+    def setUp(self):
+        self.objects = mock.MagicMock()
+        patcher = mock.patch.object(recommender_signals.ContentFeature, 'objects', self.objects)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.instance = SimpleNamespace(lclssystm1='FD')
+
+    def test_category_change_updates_feature(self):
+        recommender_signals.sync_feature_category(
+            sender=None, instance=self.instance, created=False, update_fields=None
+        )
+        self.objects.filter.assert_called_once_with(detail=self.instance)
+        self.objects.filter.return_value.exclude.assert_called_once_with(lclssystm1='FD')
+        self.objects.filter.return_value.exclude.return_value.update.assert_called_once_with(lclssystm1='FD')
+
+    def test_unrelated_update_and_create_are_ignored(self):
+        recommender_signals.sync_feature_category(
+            sender=None, instance=self.instance, created=False, update_fields=frozenset({'title'})
+        )
+        recommender_signals.sync_feature_category(
+            sender=None, instance=self.instance, created=True, update_fields=None
+        )
+        self.objects.filter.assert_not_called()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RecommendationCacheGenerationTests(SimpleTestCase):
+    """세대 번호 증가로 사용자 추천 캐시 키가 바뀌는지 확인 (패턴 삭제 없음)"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = SimpleNamespace(id=7, is_authenticated=True)
+
+    def test_bump_starts_from_missing_key_and_increments(self):
+        self.assertEqual(RecommendationCacheGeneration.get(7), 0)
+        RecommendationCacheGeneration.bump(7)
+        self.assertEqual(RecommendationCacheGeneration.get(7), 1)
+        RecommendationCacheGeneration.bump(7)
+        self.assertEqual(RecommendationCacheGeneration.get(7), 2)
+        self.assertEqual(RecommendationCacheGeneration.get(8), 0)
+
+    def test_bump_changes_only_that_users_cache_key(self):
+        api = MainRecommendationAPI()
+        other = SimpleNamespace(id=8, is_authenticated=True)
+        before = api._generate_cache_key(self.user, 10, 37.5665, 126.978)
+        other_before = api._generate_cache_key(other, 10, 37.5665, 126.978)
+
+        RecommendationCacheGeneration.bump(self.user.id)
+
+        self.assertNotEqual(api._generate_cache_key(self.user, 10, 37.5665, 126.978), before)
+        self.assertEqual(api._generate_cache_key(other, 10, 37.5665, 126.978), other_before)
+
+    def test_cache_errors_fall_back_to_generation_zero(self):
+        with mock.patch.object(cache, 'get', side_effect=ConnectionError), \
+                self.assertLogs('apps.recommender.services.recommendation_cache', 'WARNING'):
+            self.assertEqual(RecommendationCacheGeneration.get(7), 0)
+
+
+class FakeEncoder:
+    """텍스트 길이로 결정되는 2차원 임베딩 (인코딩 호출 기록)"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+class CachedEncoderTests(SimpleTestCase):
+    """캐시 적중 텍스트는 재인코딩하지 않고, 결과 순서는 입력 순서를 유지하는지 확인"""
+
+    def setUp(self):
+        self.store = {}
+        self.encoder = FakeEncoder()
+        self.cached = CachedEncoder(self.encoder, 'test-model')
+        for target in [
+            mock.patch.object(CachedEncoder, '_lookup',
+                              lambda _, hashes: {h: self.store[h] for h in hashes if h in self.store}),
+            mock.patch.object(CachedEncoder, '_store',
+                              lambda _, hashes, vectors: self.store.update(zip(hashes, vectors))),
+        ]:
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_only_missing_unique_texts_are_encoded(self):
+        first = self.cached.encode(['바다', '산', '바다'])
+        self.assertEqual(self.encoder.calls, [['바다', '산']])
+        np.testing.assert_array_equal(first, [[2, 1], [1, 1], [2, 1]])
+
+        second = self.cached.encode(['산', '계곡 캠핑', '바다'])
+        self.assertEqual(self.encoder.calls[-1], ['계곡 캠핑'])
+        np.testing.assert_array_equal(second, [[1, 1], [5, 1], [2, 1]])
+        self.assertEqual((self.cached.hits, self.cached.misses), (2, 3))
+
+
+
+class EmbeddingCacheStorageTests(SimpleTestCase):
+    """캐시 테이블 장애 시 전체 인코딩, 정리 시 사용 중인 해시는 유지"""
+
+    def test_lookup_failure_encodes_everything(self):
+        encoder = FakeEncoder()
+        with mock.patch.object(embedding_cache.EmbeddingCache, 'objects') as objects, \
+                self.assertLogs(embedding_cache.logger, 'WARNING'):
+            objects.filter.side_effect = DatabaseError('down')
+            objects.bulk_create.side_effect = DatabaseError('down')
+            result = CachedEncoder(encoder, 'test-model').encode(['바다', '산'])
+        np.testing.assert_array_equal(result, [[2, 1], [1, 1]])
+        self.assertEqual(encoder.calls, [['바다', '산']])
+
+    def test_prune_deletes_only_stale_unused_hashes(self):
+        objects = mock.MagicMock()
+        stale = objects.filter.return_value
+        stale.exclude.return_value.delete.return_value = (2, {})
+        live_hash, dead_hash = CachedEncoder.text_hash('바다'), CachedEncoder.text_hash('폐업한 식당')
+        stale.filter.return_value.values_list.return_value.iterator.return_value = [
+            (1, live_hash), (2, dead_hash)
+        ]
+        objects.filter.return_value.delete.return_value = (1, {})
+        cutoff = timezone.now()
+
+        with mock.patch.object(embedding_cache.EmbeddingCache, 'objects', objects):
+            deleted = CachedEncoder.prune({'test-model': ['바다', None]}, older_than=cutoff)
+
+        self.assertEqual(deleted, 3)
+        objects.filter.assert_any_call(created_at__lt=cutoff)
+        stale.exclude.assert_called_once_with(model_name__in=['test-model'])
+        objects.filter.assert_any_call(id__in=[2])
+
+
+class ModelRegistryTests(SimpleTestCase):
+    """모델은 키당 1회만 적재되고, 사전 적재 실패/잘못된 키는 기록만 하는지 확인"""
+
+    def setUp(self):
+        self.loads = []
+        self.release = threading.Event()
+
+        def load(name):
+            self.loads.append(name)
+            self.release.wait(1)
+            if name == 'broken':
+                raise OSError('missing weights')
+            return SimpleNamespace(name=name)
+
+        for target in [
+            mock.patch.object(ModelRegistry, 'LOADERS', {'fake': load}),
+            mock.patch.object(ModelRegistry, '_models', {}),
+            mock.patch.object(ModelRegistry, '_stats', {}),
+            mock.patch.object(ModelRegistry, '_key_locks', {}),
+        ]:
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_concurrent_first_use_loads_once(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(ModelRegistry.get('fake', 'encoder')))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.loads, ['encoder'])
+        self.assertEqual(len({id(model) for model in results}), 1)
+        self.assertTrue(ModelRegistry.is_loaded('fake', 'encoder'))
+        self.assertEqual([stats['key'] for stats in ModelRegistry.report()], ['fake:encoder'])
+
+    def test_warm_up_skips_invalid_keys_and_logs_failures(self):
+        self.release.set()
+        with self.assertLogs('apps.recommender.services.model_registry', 'WARNING') as logs:
+            report = ModelRegistry.warm_up(['fake:encoder', 'no-separator', 'fake:broken'])
+
+        self.assertEqual([stats['key'] for stats in report], ['fake:encoder'])
+        self.assertFalse(ModelRegistry.is_loaded('fake', 'broken'))
+        self.assertEqual(len(logs.records), 2)
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ModelRegistry.get('unknown', 'encoder')
@@ -16,6 +16,9 @@ from rest_framework import status, permissions
 from datetime import datetime
 from django.db.models import Prefetch
 from .services.theme_recommender import ThemeRecommender
+from .services.feed_snapshot import AnonymousFeedSnapshot
+from .services.recommendation_cache import RecommendationCacheGeneration
+from .tasks import refresh_main_recommendation
 from django.core.cache import cache
 import random
 import time
@@ -26,6 +29,8 @@ logger = logging.getLogger(__name__)
 class MainRecommendationAPI(APIView):
     permission_classes = [permissions.AllowAny]
     CACHE_TIMEOUT = 600  # 10분 (초 단위)
+    STALE_TIMEOUT = 1800  # 만료 후 이전 값을 응답할 수 있는 유예 기간 (30분)
+    LOCK_TIMEOUT = 60  # 갱신 락 최대 보유 시간
     CACHE_PREFIX = "rec"
 
     def get(self, request):
@@ -45,31 +50,44 @@ class MainRecommendationAPI(APIView):
         current_month = timezone.now().month  # 시간대 인식
         cache_key = self._generate_cache_key(user, current_month, user_lat, user_lng)
 
-        # 캐시 체크
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            logger.info(f"캐시 히트: {cache_key}")
-            return Response(cached_data, status=status.HTTP_200_OK)
+        # 캐시 체크 (신선하면 즉시, 만료 후 유예 기간이면 이전 값 응답 + 백그라운드 갱신)
+        entry = self._get_entry(cache_key)
+        if entry is not None:
+            if time.time() - entry['generated_at'] < self.CACHE_TIMEOUT:
+                logger.info(f"캐시 히트: {cache_key}")
+            elif self._acquire_refresh_lock(cache_key):
+                try:
+                    refresh_main_recommendation.delay(
+                        cache_key,
+                        user.id if user.is_authenticated else None,
+                        current_month, user_lat, user_lng
+                    )
+                    logger.info(f"만료 캐시 응답 + 백그라운드 갱신: {cache_key}")
+                except Exception as e:
+                    cache.delete(self._lock_key(cache_key))
+                    logger.error(f"백그라운드 갱신 요청 실패: {str(e)}")
+            return Response(entry['data'], status=status.HTTP_200_OK)
 
         try:
-            # 추천 엔진 실행
-            recommendation_rows = ThemeRecommender.generate_recommendation_rows(
-                user_id=user.id if user.is_authenticated else None,
-                month=current_month,
-                user_lat=user_lat,
-                user_lng=user_lng
-            )
-
-            # 데이터 직렬화
-            serialized_sections = self._serialize_recommendations(recommendation_rows)
-            
-            # 캐시 저장
-            response_data = {
-                "status": "success",
-                "sections": serialized_sections
-            }
-            cache.set(cache_key, response_data, self.CACHE_TIMEOUT)
-            logger.info(f"캐시 저장: {cache_key}")
+            # 단일 비행(single-flight): 락을 얻은 요청만 계산, 나머지는 대기 없이 셀 스냅샷으로 응답
+            if self._acquire_refresh_lock(cache_key):
+                try:
+                    response_data = self.refresh_cache(
+                        cache_key, user.id if user.is_authenticated else None,
+                        current_month, user_lat, user_lng
+                    )
+                finally:
+                    cache.delete(self._lock_key(cache_key))
+            else:
+                response_data = self._fallback_response(current_month, user_lat, user_lng)
+                if response_data is not None:
+                    logger.info(f"갱신 중 스냅샷 응답: {cache_key}")
+                else:
+                    # 스냅샷도 없으면 직접 계산 (스냅샷 배치 이전 등 예외 상황)
+                    response_data = self.refresh_cache(
+                        cache_key, user.id if user.is_authenticated else None,
+                        current_month, user_lat, user_lng
+                    )
 
             return Response(response_data, status=status.HTTP_200_OK)
 
@@ -80,10 +98,69 @@ class MainRecommendationAPI(APIView):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
 
+    def refresh_cache(self, cache_key, user_id, month, lat, lng):
+        """추천 생성 → 직렬화 → 캐시 저장 (요청 경로와 백그라운드 갱신 공용)"""
+        # 비로그인 사용자는 사전 계산된 셀 스냅샷 우선 사용
+        recommendation_rows = None
+        if user_id is None:
+            recommendation_rows = AnonymousFeedSnapshot.get_rows(lat, lng, month)
+            # 스냅샷 미스 시에도 셀 중심 좌표로 생성 (셀 단위 캐시 항목이 첫 요청자 위치에 좌우되지 않도록)
+            lat, lng = AnonymousFeedSnapshot.cell_center(lat, lng)
+
+        # 추천 엔진 실행
+        if recommendation_rows is None:
+            recommendation_rows = ThemeRecommender.generate_recommendation_rows(
+                user_id=user_id,
+                month=month,
+                user_lat=lat,
+                user_lng=lng
+            )
+
+        # 데이터 직렬화
+        serialized_sections = self._serialize_recommendations(recommendation_rows)
+
+        # 캐시 저장 (유예 기간만큼 더 보관해 stale-while-revalidate 에 사용)
+        response_data = {
+            "status": "success",
+            "sections": serialized_sections
+        }
+        cache.set(
+            cache_key,
+            {'data': response_data, 'generated_at': time.time()},
+            self.CACHE_TIMEOUT + self.STALE_TIMEOUT
+        )
+        logger.info(f"캐시 저장: {cache_key}")
+        return response_data
+
+    def _get_entry(self, cache_key):
+        entry = cache.get(cache_key)
+        if isinstance(entry, dict) and 'generated_at' in entry:
+            return entry
+        return None
+
+    def _lock_key(self, cache_key):
+        return f"{cache_key}:lock"
+
+    def _acquire_refresh_lock(self, cache_key):
+        """cache_key 별 갱신 락 (Redis SET NX, 타임아웃으로 장애 시 자동 해제)"""
+        return cache.add(self._lock_key(cache_key), 1, self.LOCK_TIMEOUT)
+
+    def _fallback_response(self, month, lat, lng):
+        """다른 요청이 계산 중일 때 즉시 응답할 셀 스냅샷 피드 (캐시에 저장하지 않음, 없으면 None)"""
+        recommendation_rows = AnonymousFeedSnapshot.get_rows(lat, lng, month)
+        if recommendation_rows is None:
+            return None
+        return {
+            "status": "success",
+            "sections": self._serialize_recommendations(recommendation_rows)
+        }
+
     def _generate_cache_key(self, user, month, lat, lng):
-        """정밀한 캐시 키 생성"""
-        user_id = user.id if user.is_authenticated else "anon"
-        return f"{self.CACHE_PREFIX}:{user_id}:m{month}:{lat:.4f}:{lng:.4f}"
+        """정밀한 캐시 키 생성 (비로그인은 스냅샷과 같은 geohash 셀 단위, 로그인은 세대 번호 포함)"""
+        if not user.is_authenticated:
+            return f"{self.CACHE_PREFIX}:anon:m{month}:{AnonymousFeedSnapshot.cell_for(lat, lng)}"
+        generation = RecommendationCacheGeneration.get(user.id)
+        return f"{self.CACHE_PREFIX}:{user.id}:g{generation}:m{month}:{lat:.4f}:{lng:.4f}"
 
     def _serialize_recommendations(self, recommendation_rows):
         """섹션 구조 유지하며 직렬화"""
@@ -4,6 +4,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from apps.users.tasks import update_user_preference_task
+from apps.users.services.preference_batch_service import PreferenceBatchService
 import logging
 import numpy as np
 
@@ -29,6 +30,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Celery 작업 큐 대신 동기 방식 실행'
         )
+        parser.add_argument(
+            '--vectorized',
+            action='store_true',
+            help='--all 과 함께 사용: 사용자 블록 단위 벡터화 일괄 재계산 (동기 실행)'
+        )
         parser.add_argument(
             '--batch-size',
             type=int,
@@ -43,6 +49,9 @@ class Command(BaseCommand):
         try:
             if options['user_id']:
                 self._process_single_user(options)
+            elif options['all'] and options['vectorized']:
+                processed = PreferenceBatchService.rebuild_all(block_size=options['batch_size'])
+                self.stdout.write(self.style.SUCCESS(f"총 {processed}명 사용자 벡터화 재계산 완료"))
             elif options['all']:
                 self._process_bulk_users(options)
             else:
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2025-06-23 16:20
+
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_userrating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userpreferenceprofile',
+            name='experience_acc',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=484, null=True),
+        ),
+        migrations.AddField(
+            model_name='userpreferenceprofile',
+            name='food_acc',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=484, null=True),
+        ),
+        migrations.AddField(
+            model_name='userpreferenceprofile',
+            name='acc_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
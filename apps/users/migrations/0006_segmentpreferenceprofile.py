@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2025-06-24 11:37
+
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_userpreferenceprofile_accumulators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SegmentPreferenceProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('segment', models.CharField(max_length=50, unique=True)),
+                ('experience', pgvector.django.vector.VectorField(dimensions=484)),
+                ('food', pgvector.django.vector.VectorField(dimensions=484)),
+                ('interaction_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': '세그먼트 선호도 프로필',
+                'db_table': 'segment_preference_profile',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2025-06-28 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_segmentpreferenceprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userpreferenceprofile',
+            name='acc_last_interaction_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -15,6 +15,12 @@ class UserPreferenceProfile(models.Model):
     # 3개 메인 카테고리별 484차원 벡터 (pgvector)
     experience = VectorField(dimensions=484, default=default_vector, blank=True)        # 체험관광+역사+레저+자연+쇼핑+문화
     food = VectorField(dimensions=484, default=default_vector, blank=True)              # 음식
+    # 증분 갱신용 비정규화 누적 벡터 (acc_updated_at 시점 기준 시간 감쇠 적용 상태)
+    experience_acc = VectorField(dimensions=484, null=True, blank=True)
+    food_acc = VectorField(dimensions=484, null=True, blank=True)
+    acc_updated_at = models.DateTimeField(null=True, blank=True)
+    # 누적 벡터에 반영된 마지막 상호작용 id (증분 갱신 워터마크, PreferenceService.SETTLE_SECONDS 이전 상호작용까지만 확정)
+    acc_last_interaction_id = models.BigIntegerField(null=True, blank=True)
     last_updated = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -56,6 +62,21 @@ class GlobalPreferenceProfile(models.Model):
     def __str__(self):
         return f"Global Profile ({self.updated_at})"
 
+class SegmentPreferenceProfile(models.Model):
+    """세그먼트별 선호도 사전 벡터 (콜드스타트용, 예: area:1, season:summer)"""
+    segment = models.CharField(max_length=50, unique=True)
+    experience = VectorField(dimensions=484)
+    food = VectorField(dimensions=484)
+    interaction_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'segment_preference_profile'
+        verbose_name = '세그먼트 선호도 프로필'
+
+    def __str__(self):
+        return f"Segment Profile {self.segment} ({self.updated_at})"
+
 class UserBookmark(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookmarks')
     content_id = models.PositiveIntegerField()
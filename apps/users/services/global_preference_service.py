@@ -1,8 +1,15 @@
 import numpy as np
 from django.utils import timezone
-from apps.users.models import UserPreferenceProfile, GlobalPreferenceProfile
+from django.core.cache import cache
+from apps.core.constants import SEASON_MAP
+from apps.users.models import UserPreferenceProfile, GlobalPreferenceProfile, SegmentPreferenceProfile
 import logging
+import threading
+import time
+from typing import Dict, Optional
 from django.db import transaction, DatabaseError
+from django.db.models import Count, DateTimeField, DurationField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import ExtractDay
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +17,21 @@ class GlobalPreferenceService:
     TIME_DECAY_RATE = 0.01  # 시간 가중치 감쇠율 (일 단위)
     MIN_USERS = 1  # 최소 사용자 수 조건
     VECTOR_DIM = 484  # 벡터 차원 상수화
+    AGGREGATE_CHUNK_SIZE = 1000  # 스트리밍 집계 청크 크기
+    AGGREGATE_BACKEND = 'sql'  # 'sql': pgvector sum 집계 (실패 시 numpy), 'numpy': 스트리밍 집계
+
+    # 세그먼트(지역/계절)별 콜드스타트 사전 벡터
+    SEGMENT_CHUNK_SIZE = 5000
+    SEGMENT_MIN_INTERACTIONS = 30  # 이보다 적은 세그먼트는 노이즈로 보고 저장하지 않음
+
+    # 프로세스 내 정규화 벡터 캐시 (버전 키로 무효화)
+    VERSION_KEY = "global_profile_version"
+    VERSION_CHECK_INTERVAL = 30  # 초 단위
+    _cache_lock = threading.Lock()
+    _cached_vectors = None
+    _cached_segments = None
+    _cached_version = None
+    _last_checked = 0.0
 
     @classmethod
     def _calculate_decay_weight(cls, current_time, last_updated):
@@ -18,46 +40,123 @@ class GlobalPreferenceService:
         return np.exp(-cls.TIME_DECAY_RATE * days_diff)
 
     @classmethod
-    def _aggregate_vectors(cls, category_field, force=False):
-        """벡터 집계 최적화 (쿼리 1회 실행 보장)"""
-        try:
-            # 단일 쿼리 실행으로 데이터 캐싱
-            profiles = list(UserPreferenceProfile.objects
-                .exclude(**{category_field: None})
-                .only(category_field, 'last_updated', 'user_id')
-                .iterator(chunk_size=1000))
-            
-            if not force and len(profiles) < cls.MIN_USERS:
-                return None
+    def _aggregate(cls, force=False) -> Dict[str, list]:
+        """설정된 백엔드로 집계 (SQL 실패 시 numpy 스트리밍 집계로 대체)"""
+        if cls.AGGREGATE_BACKEND == 'sql':
+            try:
+                # 세이브포인트: 실패해도 바깥 트랜잭션에서 대체 경로 실행 가능
+                with transaction.atomic():
+                    return cls._aggregate_vectors_sql(force=force)
+            except DatabaseError as e:
+                logger.warning(f"SQL 집계 실패, numpy 집계로 대체: {str(e)}")
+        return cls._aggregate_vectors(force=force)
 
-            current_time = timezone.now()
-            vectors = []
-            weights = []
+    @classmethod
+    def _aggregate_vectors_sql(cls, force=False) -> Dict[str, list]:
+        """
+        DB 측 집계: 경과 일수별 pgvector sum(vector) → 일수 그룹 벡터만 전송
+        감쇠 가중치는 일 단위이므로 Σ exp(-λ·d)·sum_d / Σ exp(-λ·d)·n_d 로 기존 결과와 동일
+        """
+        fields = ('experience', 'food')
+        current_time = timezone.now()
+        age = ExpressionWrapper(
+            Value(current_time, output_field=DateTimeField()) - F('last_updated'),
+            output_field=DurationField()
+        )
+        groups = (
+            UserPreferenceProfile.objects
+            .annotate(age_days=ExtractDay(age))
+            .values('age_days')
+            .annotate(
+                **{f'{field}_sum': Sum(field) for field in fields},
+                **{f'{field}_count': Count(field) for field in fields},
+            )
+            .order_by()
+        )
 
-            # 벡터 사전 처리
-            for profile in profiles:
-                vector = np.array(getattr(profile, category_field), dtype=np.float32)
-                if vector.shape != (cls.VECTOR_DIM,):
-                    logger.warning(f"Invalid vector shape {vector.shape} for user {profile.user_id}")
+        sums = {field: np.zeros(cls.VECTOR_DIM, dtype=np.float64) for field in fields}
+        weight_sums = {field: 0.0 for field in fields}
+        counts = {field: 0 for field in fields}
+        for group in groups:
+            weight = float(np.exp(-cls.TIME_DECAY_RATE * (group['age_days'] or 0)))
+            for field in fields:
+                count = group[f'{field}_count']
+                if not count:
                     continue
-                
-                weight = cls._calculate_decay_weight(current_time, profile.last_updated)
-                vectors.append(vector)
-                weights.append(weight)
+                vector = np.asarray(group[f'{field}_sum'], dtype=np.float64)
+                if vector.shape != (cls.VECTOR_DIM,):
+                    raise ValueError(f"Invalid aggregated vector shape {vector.shape}")
+                sums[field] += weight * vector
+                weight_sums[field] += weight * count
+                counts[field] += count
 
-            if not vectors:
-                return None
+        results = {}
+        for field in fields:
+            if (not force and counts[field] < cls.MIN_USERS) or weight_sums[field] < 1e-9:
+                results[field] = None
+                continue
+            normalized = sums[field] / weight_sums[field]
+            results[field] = normalized.tolist() if not np.isnan(normalized).any() else None
+        return results
 
-            # 벡터 연산 일괄 처리
-            weight_sum = np.sum(weights)
-            if weight_sum < 1e-9:
-                return None
+    @classmethod
+    def _aggregate_vectors(cls, force=False) -> Dict[str, list]:
+        """
+        체험/음식 벡터 스트리밍 집계 (쿼리 1회, 단일 패스)
+        - 청크 단위로 float32 버퍼에 채운 뒤 가중합을 float64 누적 버퍼에 더함 → 메모리 O(dim)
+        - 반환: {'experience': 가중 평균 벡터 또는 None, 'food': ...}
+        """
+        fields = ('experience', 'food')
+        chunk = cls.AGGREGATE_CHUNK_SIZE
+        try:
+            current_time = timezone.now()
+            sums = {field: np.zeros(cls.VECTOR_DIM, dtype=np.float64) for field in fields}
+            weight_sums = {field: 0.0 for field in fields}
+            counts = {field: 0 for field in fields}
+            buffers = {field: np.empty((chunk, cls.VECTOR_DIM), dtype=np.float32) for field in fields}
+            buffer_weights = {field: np.empty(chunk, dtype=np.float64) for field in fields}
+            filled = {field: 0 for field in fields}
 
-            weighted_vectors = np.array(vectors) * np.array(weights)[:, None]
-            sum_vector = np.sum(weighted_vectors, axis=0)
-            normalized = sum_vector / weight_sum
+            def flush(field):
+                n = filled[field]
+                if n:
+                    sums[field] += buffer_weights[field][:n] @ buffers[field][:n].astype(np.float64)
+                    weight_sums[field] += float(buffer_weights[field][:n].sum())
+                    filled[field] = 0
 
-            return normalized.tolist() if not np.isnan(normalized).any() else None
+            rows = (
+                UserPreferenceProfile.objects
+                .values_list('user_id', 'last_updated', *fields)
+                .iterator(chunk_size=chunk)
+            )
+            for user_id, last_updated, *vectors in rows:
+                weight = cls._calculate_decay_weight(current_time, last_updated)
+                for field, raw in zip(fields, vectors):
+                    if raw is None:
+                        continue
+                    counts[field] += 1
+                    vector = np.asarray(raw, dtype=np.float32)
+                    if vector.shape != (cls.VECTOR_DIM,):
+                        logger.warning(f"Invalid vector shape {vector.shape} for user {user_id}")
+                        continue
+                    buffers[field][filled[field]] = vector
+                    buffer_weights[field][filled[field]] = weight
+                    filled[field] += 1
+                    if filled[field] == chunk:
+                        flush(field)
+
+            results = {}
+            for field in fields:
+                flush(field)
+                if not force and counts[field] < cls.MIN_USERS:
+                    results[field] = None
+                    continue
+                if weight_sums[field] < 1e-9:
+                    results[field] = None
+                    continue
+                normalized = sums[field] / weight_sums[field]
+                results[field] = normalized.tolist() if not np.isnan(normalized).any() else None
+            return results
 
         except DatabaseError as e:
             logger.error(f"DB 오류 발생: {str(e)}", exc_info=True)
@@ -82,9 +181,10 @@ class GlobalPreferenceService:
                 }
             )
 
+            aggregated = cls._aggregate(force=force)
             update_fields = []
             for field in ['experience', 'food']:
-                vector = cls._aggregate_vectors(field, force=force)
+                vector = aggregated[field]
                 
                 # NULL 값 방지 안전장치
                 if vector is None:
@@ -119,4 +219,192 @@ class GlobalPreferenceService:
         """카테고리별 최소 사용자 수 충족 여부 검증"""
         experience_count = UserPreferenceProfile.objects.exclude(experience=None).count()
         food_count = UserPreferenceProfile.objects.exclude(food=None).count()
-        return min(experience_count, food_count) >= cls.MIN_USERS
\ No newline at end of file
+        return min(experience_count, food_count) >= cls.MIN_USERS
+
+    @classmethod
+    def bump_version(cls):
+        """글로벌 프로필 갱신 후 호출 → 모든 프로세스의 캐시 무효화"""
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.set(cls.VERSION_KEY, 1, None)
+
+    @classmethod
+    def get_normalized_vectors(cls) -> Dict[str, np.ndarray]:
+        """L2 정규화된 글로벌 벡터 {'experience', 'food'} 반환 (요청 경로에서 DB 조회 없음)"""
+        now = time.monotonic()
+        if cls._cached_vectors is not None and now - cls._last_checked < cls.VERSION_CHECK_INTERVAL:
+            return cls._cached_vectors
+
+        with cls._cache_lock:
+            try:
+                version = cache.get(cls.VERSION_KEY)
+            except Exception as e:
+                logger.warning(f"글로벌 프로필 버전 조회 실패: {str(e)}")
+                version = cls._cached_version
+            cls._last_checked = now
+
+            if cls._cached_vectors is None or version != cls._cached_version:
+                cls._cached_vectors = cls._load_normalized_vectors()
+                cls._cached_segments = cls._load_segment_vectors()
+                cls._cached_version = version
+            return cls._cached_vectors
+
+    @classmethod
+    def get_version(cls):
+        """현재 프로세스가 보유한 글로벌 벡터 캐시 버전"""
+        cls.get_normalized_vectors()
+        return cls._cached_version
+
+    @classmethod
+    def _load_normalized_vectors(cls) -> Dict[str, np.ndarray]:
+        global_profile = GlobalPreferenceProfile.objects.first()
+        vectors = {}
+        for field in ('experience', 'food'):
+            try:
+                vec = np.array(getattr(global_profile, field), dtype=np.float32)
+                assert vec.shape == (cls.VECTOR_DIM,)  # 차원 일치 확인
+            except (TypeError, ValueError, AssertionError, AttributeError):
+                vec = np.zeros(cls.VECTOR_DIM, dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            vectors[field] = vec / norm if norm > 1e-8 else vec
+        return vectors
+
+    @classmethod
+    def _load_segment_vectors(cls) -> Dict[str, Dict[str, np.ndarray]]:
+        segments = {}
+        try:
+            profiles = SegmentPreferenceProfile.objects.only('segment', 'experience', 'food')
+            for profile in profiles:
+                vectors = {}
+                for field in ('experience', 'food'):
+                    vec = np.asarray(getattr(profile, field), dtype=np.float32)
+                    norm = np.linalg.norm(vec)
+                    if vec.shape == (cls.VECTOR_DIM,) and norm > 1e-8:
+                        vectors[field] = vec / norm
+                segments[profile.segment] = vectors
+        except DatabaseError as e:
+            logger.warning(f"세그먼트 프로필 로드 실패: {str(e)}")
+        return segments
+
+    @staticmethod
+    def segment_key(kind: str, value) -> str:
+        return f"{kind}:{value}"
+
+    @classmethod
+    def get_segment_prior(cls, areacode: Optional[int] = None,
+                          season: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        콜드스타트 사전 벡터: 글로벌 + 지역 + 계절 세그먼트 벡터의 정규화 합
+        (프로세스 내 캐시만 사용, 해당 세그먼트가 없으면 글로벌 벡터와 동일)
+        """
+        global_vecs = cls.get_normalized_vectors()
+        segments = cls._cached_segments or {}
+        keys = []
+        if areacode is not None:
+            keys.append(cls.segment_key('area', areacode))
+        if season:
+            keys.append(cls.segment_key('season', season))
+
+        prior = {}
+        for field in ('experience', 'food'):
+            parts = [segments[key][field] for key in keys if field in segments.get(key, {})]
+            if not parts:
+                prior[field] = global_vecs[field]
+                continue
+            combined = global_vecs[field] + np.sum(parts, axis=0)
+            norm = np.linalg.norm(combined)
+            prior[field] = (combined / norm if norm > 1e-8 else global_vecs[field]).astype(np.float32)
+        return prior
+
+    @classmethod
+    def update_segment_profiles(cls) -> int:
+        """
+        지역(areacode)/계절 세그먼트 사전 벡터 일괄 생성 (상호작용 스트리밍 단일 패스)
+        - 각 상호작용을 콘텐츠 지역 세그먼트와 발생 계절 세그먼트에 동시에 누적
+        - 청크 단위 희소 행렬곱으로 누적 → 메모리 O(세그먼트 수 × dim)
+        """
+        from apps.interactions.models import ContentInteraction
+        from apps.users.services.preference_service import ACTION_WEIGHTS
+        from apps.users.services.preference_batch_service import PreferenceBatchService
+
+        started = time.perf_counter()
+        now = timezone.now()
+        lookup = PreferenceBatchService.feature_lookup()
+        segment_index: Dict[str, int] = {}
+        accumulators = []  # 세그먼트별 (2, D) 누적 벡터
+        counts = []
+
+        def index_of(key):
+            if key not in segment_index:
+                segment_index[key] = len(accumulators)
+                accumulators.append(np.zeros((2, cls.VECTOR_DIM), dtype=np.float64))
+                counts.append(0)
+            return segment_index[key]
+
+        def flush(chunk):
+            if not chunk:
+                return
+            contentids, actions, timestamps, durations, areacodes = zip(*chunk)
+            weighed = PreferenceBatchService.weigh_interactions(
+                lookup, contentids, actions, timestamps, durations, now, cls.TIME_DECAY_RATE
+            )
+            if weighed is None:
+                return
+            valid = np.flatnonzero(weighed['valid'])
+            targets, members = [], []
+            for i, row in enumerate(valid):
+                keys = [cls.segment_key('season', SEASON_MAP[timezone.localtime(timestamps[row]).month])]
+                if areacodes[row] is not None:
+                    keys.append(cls.segment_key('area', areacodes[row]))
+                for key in keys:
+                    idx = index_of(key)
+                    counts[idx] += 1
+                    targets.append(idx * 2 + weighed['slots'][i])
+                    members.append(i)
+            members = np.asarray(members, dtype=np.int64)
+            result = PreferenceBatchService.accumulate(
+                lookup, np.asarray(targets, dtype=np.int64), weighed['feature_rows'][members],
+                weighed['weights'][members], weighed['dislike_sign'][members], len(accumulators) * 2
+            )
+            for idx, acc in enumerate(accumulators):
+                acc += result[idx * 2: idx * 2 + 2]
+
+        rows = (
+            ContentInteraction.objects
+            .filter(action_type__in=list(ACTION_WEIGHTS))
+            .values_list('content_id', 'action_type', 'timestamp', 'duration', 'content__areacode')
+            .iterator(chunk_size=cls.SEGMENT_CHUNK_SIZE)
+        )
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= cls.SEGMENT_CHUNK_SIZE:
+                flush(chunk)
+                chunk = []
+        flush(chunk)
+
+        profiles = []
+        for key, idx in segment_index.items():
+            if counts[idx] < cls.SEGMENT_MIN_INTERACTIONS:
+                continue
+            profiles.append(SegmentPreferenceProfile(
+                segment=key,
+                experience=accumulators[idx][0].astype(np.float32).tolist(),
+                food=accumulators[idx][1].astype(np.float32).tolist(),
+                interaction_count=counts[idx],
+            ))
+
+        with transaction.atomic():
+            SegmentPreferenceProfile.objects.exclude(segment__in=[p.segment for p in profiles]).delete()
+            SegmentPreferenceProfile.objects.bulk_create(
+                profiles,
+                update_conflicts=True,
+                unique_fields=['segment'],
+                update_fields=['experience', 'food', 'interaction_count', 'updated_at'],
+            )
+        logger.info(
+            f"세그먼트 프로필 {len(profiles)}개 생성 ({len(segment_index)}개 중), "
+            f"{time.perf_counter() - started:.1f}초"
+        )
+        return len(profiles)
@@ -0,0 +1,239 @@
+import time
+from datetime import timedelta
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from apps.users.models import UserPreferenceProfile
+from apps.interactions.models import ContentInteraction
+from apps.recommender.models import FOOD_CATEGORY
+from apps.recommender.services.feature_matrix import get_feature_matrix
+from apps.users.services.preference_service import (
+    PreferenceService, VECTOR_DIM, ACTION_WEIGHTS, DISLIKE_IMPACT
+)
+from apps.users.services.user_query_vector import UserQueryVector
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+TEXT_DIM = 384
+TEXT_WEIGHT = 0.6
+CATEGORY_WEIGHT = 1.4
+SLOTS = ('experience', 'food')
+
+
+class PreferenceBatchService:
+    """
+    여러 사용자 프로필 벡터 일괄 재계산 (PreferenceService.update_user_preference 와 동일한 결과)
+    - 사용자 블록 단위로 상호작용을 쿼리 1회로 읽고, 특징 벡터는 공유 FeatureMatrix 에서 조회
+    - (사용자×카테고리) × 콘텐츠 희소 가중치 행렬 × 특징 행렬 곱으로 모든 누적 벡터를 한 번에 계산
+    - 결과는 bulk_update / bulk_create 로 저장
+    """
+    DEFAULT_BLOCK_SIZE = 1000
+
+    @classmethod
+    def rebuild_all(cls, block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+        """전체 사용자 프로필 재계산, 처리 사용자 수 반환"""
+        started = time.perf_counter()
+        lookup = cls.feature_lookup()
+        processed = 0
+
+        block: List[int] = []
+        for user_id in User.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=block_size):
+            block.append(user_id)
+            if len(block) >= block_size:
+                processed += cls.rebuild_users(block, lookup)
+                block = []
+        if block:
+            processed += cls.rebuild_users(block, lookup)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"사용자 프로필 일괄 재계산: {processed}명, {elapsed:.1f}초 "
+            f"({processed / max(elapsed, 1e-9):.0f}명/초)"
+        )
+        return processed
+
+    @staticmethod
+    def feature_lookup() -> Dict:
+        """contentid → 특징 행렬 행 조회용 정렬 인덱스"""
+        matrix = get_feature_matrix()
+        order = np.argsort(matrix.contentids, kind='stable')
+        return {
+            'sorted_ids': matrix.contentids[order],
+            'rows': order,
+            'vectors': matrix.vectors,
+            'is_food': matrix.categories == FOOD_CATEGORY,
+        }
+
+    @classmethod
+    def rebuild_users(cls, user_ids: Iterable[int], lookup: Dict = None) -> int:
+        """사용자 블록의 프로필 재계산 및 저장"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        lookup = lookup or cls.feature_lookup()
+        now = timezone.now()
+
+        accumulators, pending, watermarks = cls._accumulate_block(user_ids, lookup, now)
+        cls._save_block(user_ids, accumulators, pending, watermarks, now)
+        UserQueryVector.invalidate_many(user_ids)
+        return len(user_ids)
+
+    @staticmethod
+    def weigh_interactions(lookup: Dict, contentids, actions, timestamps, durations,
+                           now, decay_rate: float) -> Optional[Dict]:
+        """
+        상호작용 배열 → 특징 행 / 가중치(행동 × 체류시간 × 시간 감쇠) / 카테고리 슬롯 / 싫어요 부호
+        특징 벡터가 없는 상호작용은 제외 (valid 마스크로 원본 위치 표시), 남는 항목이 없으면 None
+        """
+        sorted_ids = lookup['sorted_ids']
+        if sorted_ids.size == 0 or not len(contentids):
+            return None
+        contentids = np.asarray(contentids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(sorted_ids, contentids), sorted_ids.size - 1)
+        valid = sorted_ids[pos] == contentids
+        if not valid.any():
+            return None
+        feature_rows = lookup['rows'][pos[valid]]
+
+        actions = np.asarray(actions, dtype=object)[valid]
+        action_weights = np.array([ACTION_WEIGHTS[a] for a in actions])
+        durations = np.array([d or 0.0 for d in durations], dtype=np.float64)[valid]
+        duration_weights = np.where(
+            (actions == 'duration') & (durations > 0), np.log1p(durations / 60), 1.0
+        )
+        ages = now.timestamp() - np.array([ts.timestamp() for ts in timestamps], dtype=np.float64)[valid]
+        time_weights = np.exp(-decay_rate * ages / 86400)
+
+        # 카테고리 슬롯 및 싫어요 부호 (카테고리 부분에만 적용)
+        is_food = lookup['is_food'][feature_rows]
+        dislike_sign = np.where(
+            actions == 'dislike',
+            np.where(is_food, -DISLIKE_IMPACT['food'], -DISLIKE_IMPACT['experience']),
+            1.0
+        )
+        return {
+            'valid': valid,
+            'feature_rows': feature_rows,
+            'weights': action_weights * duration_weights * time_weights,
+            'slots': is_food.astype(np.int64),
+            'dislike_sign': dislike_sign,
+        }
+
+    @staticmethod
+    def accumulate(lookup: Dict, targets: np.ndarray, feature_rows: np.ndarray,
+                   weights: np.ndarray, dislike_sign: np.ndarray, num_targets: int) -> np.ndarray:
+        """
+        (num_targets × D) 비정규화 누적 벡터
+        고유 콘텐츠만 행렬에서 읽어 (num_targets × C) 희소 가중치 행렬과 곱셈 (중복 항목은 합산됨)
+        """
+        unique_rows, col = np.unique(feature_rows, return_inverse=True)
+        vectors = np.asarray(lookup['vectors'][unique_rows], dtype=np.float64)
+        shape = (num_targets, unique_rows.size)
+        text_weights = sparse.csr_matrix((weights * TEXT_WEIGHT, (targets, col)), shape=shape)
+        cat_weights = sparse.csr_matrix((weights * dislike_sign * CATEGORY_WEIGHT, (targets, col)), shape=shape)
+
+        result = np.empty((num_targets, VECTOR_DIM), dtype=np.float64)
+        result[:, :TEXT_DIM] = text_weights @ vectors[:, :TEXT_DIM]
+        result[:, TEXT_DIM:] = cat_weights @ vectors[:, TEXT_DIM:]
+        return result
+
+    @classmethod
+    def _accumulate_block(cls, user_ids: List[int], lookup: Dict, now):
+        """
+        ((2, U, D) 확정 누적 벡터, (2, U, D) 미확정 벡터, (U,) 워터마크) — 슬롯 0: 체험, 1: 음식
+        워터마크/확정 기준은 PreferenceService._split_settled 와 동일
+        (SETTLE_SECONDS 이전 상호작용의 최대 id, 그보다 큰 id 는 정규화 벡터에만 반영)
+        """
+        num_users = len(user_ids)
+        watermarks = np.zeros(num_users, dtype=np.int64)
+        empty = np.zeros((len(SLOTS), num_users, VECTOR_DIM), dtype=np.float64)
+        rows = list(
+            ContentInteraction.objects
+            .filter(user_id__in=user_ids, action_type__in=list(ACTION_WEIGHTS))
+            .values_list('id', 'user_id', 'content_id', 'action_type', 'timestamp', 'duration')
+        )
+        if not rows:
+            return empty, empty.copy(), watermarks
+
+        interaction_ids, interaction_users, contentids, actions, timestamps, durations = zip(*rows)
+        user_index = {uid: i for i, uid in enumerate(user_ids)}
+        user_rows = np.array([user_index[u] for u in interaction_users], dtype=np.int64)
+        interaction_ids = np.array(interaction_ids, dtype=np.int64)
+
+        cutoff = (now - timedelta(seconds=PreferenceService.SETTLE_SECONDS)).timestamp()
+        settled = np.array([ts.timestamp() <= cutoff for ts in timestamps], dtype=bool)
+        np.maximum.at(watermarks, user_rows[settled], interaction_ids[settled])
+
+        weighed = cls.weigh_interactions(
+            lookup, contentids, actions, timestamps, durations, now, PreferenceService.DECAY_RATE
+        )
+        if weighed is None:
+            return empty, empty.copy(), watermarks
+
+        valid = weighed['valid']
+        pending = interaction_ids[valid] > watermarks[user_rows[valid]]
+        # 대상 행: (확정/미확정, 슬롯, 사용자)
+        targets = (
+            pending.astype(np.int64) * len(SLOTS) * num_users
+            + weighed['slots'] * num_users
+            + user_rows[valid]
+        )
+
+        flat = cls.accumulate(
+            lookup, targets, weighed['feature_rows'], weighed['weights'],
+            weighed['dislike_sign'], 2 * len(SLOTS) * num_users
+        )
+        blocks = flat.reshape(2, len(SLOTS), num_users, VECTOR_DIM)
+        return blocks[0], blocks[1], watermarks
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """PreferenceService._normalize_vector 와 동일 기준 (노름 < 1e-4 → 0 벡터)"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        safe = np.where(norms < 1e-4, 1.0, norms)
+        return np.where(norms < 1e-4, 0.0, matrix / safe).astype(np.float32)
+
+    @classmethod
+    @transaction.atomic
+    def _save_block(cls, user_ids: List[int], accumulators: np.ndarray, pending: np.ndarray,
+                    watermarks: np.ndarray, now):
+        normalized = {
+            slot: cls._normalize_rows(accumulators[i] + pending[i]) for i, slot in enumerate(SLOTS)
+        }
+
+        profiles = {
+            profile.user_id: profile
+            for profile in UserPreferenceProfile.objects
+            .filter(user_id__in=user_ids)
+            .only('id', 'user_id')
+        }
+        to_update, to_create = [], []
+        for i, user_id in enumerate(user_ids):
+            profile = profiles.get(user_id)
+            if profile is None:
+                profile = UserPreferenceProfile(user_id=user_id)
+                to_create.append(profile)
+            else:
+                to_update.append(profile)
+            profile.experience = normalized['experience'][i].tolist()
+            profile.food = normalized['food'][i].tolist()
+            profile.experience_acc = accumulators[0, i].astype(np.float32).tolist()
+            profile.food_acc = accumulators[1, i].astype(np.float32).tolist()
+            profile.acc_updated_at = now
+            profile.acc_last_interaction_id = int(watermarks[i])
+            profile.last_updated = now  # bulk_update 는 auto_now 를 적용하지 않음
+
+        if to_update:
+            UserPreferenceProfile.objects.bulk_update(
+                to_update,
+                ['experience', 'food', 'experience_acc', 'food_acc', 'acc_updated_at',
+                 'acc_last_interaction_id', 'last_updated'],
+                batch_size=500
+            )
+        if to_create:
+            UserPreferenceProfile.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
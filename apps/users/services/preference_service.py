@@ -1,3 +1,6 @@
+import time
+from datetime import timedelta
+import math
 import numpy as np
 from django.db import transaction, DatabaseError
 from django.utils import timezone
@@ -6,8 +9,10 @@ from apps.users.models import UserPreferenceProfile
 from apps.interactions.models import ContentInteraction
 from apps.recommender.models import ContentFeature
 from apps.items.models import ContentDetailCommon
+from apps.recommender.services.recommendation_cache import RecommendationCacheGeneration
 from celery import shared_task
 from django.contrib.auth import get_user_model
+from django_redis import get_redis_connection
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,6 +34,16 @@ ACTION_WEIGHTS = {
 class PreferenceService:
     DECAY_RATE = 0.05
 
+    # 실시간 갱신 디바운스 (윈도우 내 연속 상호작용은 사용자당 1회 재계산으로 병합)
+    REALTIME_DEBOUNCE_SECONDS = 30
+    DIRTY_USERS_KEY = "pref:dirty_users"  # sorted set: user_id → 갱신 예정 시각
+    FULL_RECOMPUTE_KEY = "pref:full_recompute"  # set: 증분 대신 전체 재계산이 필요한 사용자
+    DRAIN_SCHEDULED_KEY = "pref:drain_scheduled"
+    DRAIN_BATCH_SIZE = 500
+    # 누적 벡터 확정 유예 (상호작용 저장 트랜잭션 최대 지속 시간 + 서버 간 시계 오차 상한)
+    # 이보다 최근 timestamp 의 상호작용은 정규화 벡터에만 반영하고 다음 갱신에서 누적
+    SETTLE_SECONDS = 300
+
     ACTION_WEIGHTS = {
         'click': 0.1, 'like': 0.8, 'dislike': 0.6, 
         'bookmark': 1.0, 'duration': 0.2
@@ -61,13 +76,15 @@ class PreferenceService:
         return min(raw_weight, max_weight)  # 0.9 상한선 적용
 
     @classmethod
-    def _process_interactions(cls, user):
-        """상호작용-특징벡터 정확한 매핑 구현"""
+    def _process_interactions(cls, user, after_id=None):
+        """상호작용-특징벡터 정확한 매핑 구현 (after_id 지정 시 해당 id 이후 상호작용만)"""
+        queryset = ContentInteraction.objects.filter(user=user)
+        if after_id is not None:
+            queryset = queryset.filter(id__gt=after_id)
         interactions = list(
-            ContentInteraction.objects
-            .filter(user=user)
+            queryset
             .select_related('content__feature')  # content.detail 사전 로드
-            .only('action_type', 'timestamp', 'duration', 'content_id')
+            .only('id', 'action_type', 'timestamp', 'duration', 'content_id')
         )
         
         # ContentDetailCommon.contentid 추출
@@ -90,16 +107,89 @@ class PreferenceService:
 
 
     @classmethod
-    def _calculate_time_weights(cls, interactions):
+    def _calculate_time_weights(cls, interactions, now=None):
         """시간 가중치 벡터화 계산"""
-        now = timezone.now()
+        now = now or timezone.now()
         time_deltas = np.array([(now - i.timestamp).total_seconds() for i in interactions])
         return np.exp(-cls.DECAY_RATE * time_deltas / 86400)
 
+    @classmethod
+    def _decay_factor(cls, since, now):
+        """누적 벡터를 since → now 로 옮기는 감쇠 계수 exp(-DECAY_RATE·Δt[일])"""
+        return float(np.exp(-cls.DECAY_RATE * max((now - since).total_seconds(), 0.0) / 86400))
+
+    @classmethod
+    def _accumulate_vectors(cls, interactions, content_map, now):
+        """now 기준 시간 가중치를 적용한 카테고리별 비정규화 누적 벡터"""
+        vectors = {'experience': np.zeros(VECTOR_DIM), 'food': np.zeros(VECTOR_DIM)}
+        if not interactions:
+            return vectors
+
+        time_weights = cls._calculate_time_weights(interactions, now)
+        
+        # 가중치 계산
+        action_weights = np.array([ACTION_WEIGHTS[i.action_type] for i in interactions])
+        duration_weights = np.array([
+            np.log1p(i.duration/60) if i.duration and i.action_type == 'duration' else 1.0 
+            for i in interactions
+        ])
+        total_weights = action_weights * duration_weights * time_weights
+
+        # 벡터 누적
+        for idx, interaction in enumerate(interactions):
+            contentid = interaction.content.contentid
+            if (cf := content_map.get(contentid)) is None:
+                logger.warning(f"특징 벡터 없음: 콘텐츠 {contentid}")
+                continue
+
+            lclssystm1 = cf.detail.lclssystm1
+            category = CATEGORY_MAP.get(lclssystm1, 'experience')
+            
+            # 특징 벡터 강제 1D 변환
+            raw_vector = np.array(cf.feature_vector, dtype=np.float32).flatten()
+            
+            # 차원 검증 (반드시 필요)
+            if raw_vector.shape != (VECTOR_DIM,):
+                logger.error(f"잘못된 벡터 차원 {raw_vector.shape} (콘텐츠 {contentid})")
+                continue
+            
+            # 가중치 분해 및 적용
+            text_part = raw_vector[:384] * 0.6
+            cat_part = raw_vector[384:] * 1.4
+            
+            if interaction.action_type == 'dislike':
+                cat_part *= -DISLIKE_IMPACT.get(category, 1.0)
+            
+            vectors[category] += np.concatenate([text_part, cat_part]) * total_weights[idx]
+        return vectors
+
+    @classmethod
+    def _split_settled(cls, interactions, now, after_id=None):
+        """
+        (누적 확정 상호작용, 미확정 상호작용, 새 워터마크)
+        - 워터마크 = SETTLE_SECONDS 이전 timestamp 를 가진 상호작용 중 최대 id
+        - 더 낮은 id 를 받고 아직 커밋되지 않은 상호작용은 그보다 늦게 저장되기 시작했으므로 워터마크보다 큰 id
+          (트랜잭션이 SETTLE_SECONDS 안에 끝난다는 가정) → 다음 갱신의 id > 워터마크 조회에 포함됨
+        """
+        cutoff = now - timedelta(seconds=cls.SETTLE_SECONDS)
+        watermark = max(
+            [i.id for i in interactions if i.timestamp <= cutoff], default=after_id or 0
+        )
+        settled = [i for i in interactions if i.id <= watermark]
+        pending = [i for i in interactions if i.id > watermark]
+        return settled, pending, watermark
+
     @classmethod
     @transaction.atomic
-    def update_user_preference(cls, user):
-        """원자적 프로필 업데이트 (pgvector 최적화)"""
+    def update_user_preference(cls, user, incremental=False):
+        """
+        원자적 프로필 업데이트 (pgvector 최적화)
+        - incremental=True: 저장된 누적 벡터에 감쇠를 적용하고 acc_last_interaction_id 이후 상호작용만 더함
+          (누적 상태가 없으면 전체 재계산)
+        - 누적 벡터와 워터마크는 SETTLE_SECONDS 이전 상호작용까지만 확정 (_split_settled),
+          최근 상호작용은 정규화 벡터에만 더함
+        - 상호작용 삭제/수정은 증분으로 반영되지 않으므로 full 재계산 예약 및 야간 일괄 재계산으로 보정
+        """
         try:
             # 프로필 안전 생성 및 락 획득
             profile, created = UserPreferenceProfile.objects.select_for_update().get_or_create(
@@ -109,61 +199,56 @@ class PreferenceService:
                     'food': np.zeros(VECTOR_DIM).tolist()
                 }
             )
-            
-            interactions, content_map = cls._process_interactions(user)
-            time_weights = cls._calculate_time_weights(interactions)
-            
-            # 가중치 계산
-            action_weights = np.array([ACTION_WEIGHTS[i.action_type] for i in interactions])
-            duration_weights = np.array([
-                np.log1p(i.duration/60) if i.duration and i.action_type == 'duration' else 1.0 
-                for i in interactions
-            ])
-            total_weights = action_weights * duration_weights * time_weights
-
-            # 벡터 누적
-            vectors = {'experience': np.zeros(VECTOR_DIM), 'food': np.zeros(VECTOR_DIM)}
-            for idx, interaction in enumerate(interactions):
-                contentid = interaction.content.contentid
-                if (cf := content_map.get(contentid)) is None:
-                    logger.warning(f"특징 벡터 없음: 콘텐츠 {contentid}")
-                    continue
 
-                lclssystm1 = cf.detail.lclssystm1
-                category = CATEGORY_MAP.get(lclssystm1, 'experience')
-                
-                # 특징 벡터 강제 1D 변환
-                raw_vector = np.array(cf.feature_vector, dtype=np.float32).flatten()
-                
-                # 차원 검증 (반드시 필요)
-                if raw_vector.shape != (VECTOR_DIM,):
-                    logger.error(f"잘못된 벡터 차원 {raw_vector.shape} (콘텐츠 {contentid})")
-                    continue
-                
-                # 가중치 분해 및 적용
-                text_part = raw_vector[:384] * 0.6
-                cat_part = raw_vector[384:] * 1.4
-                
-                if interaction.action_type == 'dislike':
-                    cat_part *= -DISLIKE_IMPACT.get(category, 1.0)
-                
-                vectors[category] += np.concatenate([text_part, cat_part]) * total_weights[idx]
+            now = timezone.now()
+            use_incremental = (
+                incremental
+                and profile.acc_updated_at is not None
+                and profile.experience_acc is not None
+                and profile.food_acc is not None
+                and profile.acc_last_interaction_id is not None
+            )
+            after_id = profile.acc_last_interaction_id if use_incremental else None
+
+            interactions, content_map = cls._process_interactions(user, after_id=after_id)
+            if use_incremental and not interactions:
+                # 새 상호작용이 없으면 감쇠만으로는 정규화 벡터 방향이 바뀌지 않음
+                return True
+
+            settled, pending, watermark = cls._split_settled(interactions, now, after_id)
+            vectors = cls._accumulate_vectors(settled, content_map, now)
+            pending_vectors = cls._accumulate_vectors(pending, content_map, now)
+            if use_incremental:
+                decay = cls._decay_factor(profile.acc_updated_at, now)
+                vectors['experience'] += np.asarray(profile.experience_acc, dtype=np.float64) * decay
+                vectors['food'] += np.asarray(profile.food_acc, dtype=np.float64) * decay
 
             # 벡터 저장
             update_fields = []
             for category, vector in vectors.items():
                 try:
                     validated = cls._validate_vector(vector)
-                    normalized = cls._normalize_vector(validated)
+                    normalized = cls._normalize_vector(validated + pending_vectors[category])
                     setattr(profile, category, normalized.tolist())
-                    update_fields.append(category)
+                    setattr(profile, f'{category}_acc', validated.astype(np.float32).tolist())
+                    update_fields += [category, f'{category}_acc']
                 except ValidationError as e:
                     logger.error(f"벡터 저장 실패 ({category}): {str(e)}")
                     continue
 
             if update_fields:
-                profile.save(update_fields=update_fields + ['last_updated'])
-                logger.info(f"사용자 {user.id} {len(update_fields)}개 벡터 갱신")
+                profile.acc_updated_at = now
+                profile.acc_last_interaction_id = watermark
+                profile.save(update_fields=update_fields + ['acc_updated_at', 'acc_last_interaction_id', 'last_updated'])
+                logger.info(
+                    f"사용자 {user.id} {len(update_fields) // 2}개 벡터 갱신 "
+                    f"({'증분' if use_incremental else '전체'}, 상호작용 {len(interactions)}건, 미확정 {len(pending)}건)"
+                )
+
+                # 커밋 후 추천용 혼합 쿼리 벡터 캐시 무효화
+                from apps.users.services.user_query_vector import UserQueryVector
+                user_id = user.id
+                transaction.on_commit(lambda: UserQueryVector.invalidate(user_id))
             
             return True
 
@@ -174,6 +259,84 @@ class PreferenceService:
             logger.error(f"예상치 못한 오류 ({user.id}): {str(e)}")
             raise
 
+    @classmethod
+    def schedule_realtime_update(cls, user_id, full=False):
+        """
+        사용자 프로필 실시간 갱신 예약 (디바운스)
+        - 첫 상호작용 시점 + 윈도우를 갱신 예정 시각으로 기록 (ZADD NX → 이후 상호작용은 병합)
+        - 드레인 태스크는 윈도우당 1회만 예약
+        - full=True: 기존 상호작용 수정 등 증분으로 반영할 수 없는 변경 → 전체 재계산 표시
+        """
+        from apps.users.tasks import drain_realtime_preference_updates, update_user_preference_task
+
+        try:
+            redis = get_redis_connection("default")
+            if full:
+                redis.sadd(cls.FULL_RECOMPUTE_KEY, str(user_id))
+            redis.zadd(
+                cls.DIRTY_USERS_KEY,
+                {str(user_id): time.time() + cls.REALTIME_DEBOUNCE_SECONDS},
+                nx=True
+            )
+            if redis.set(cls.DRAIN_SCHEDULED_KEY, 1, nx=True, ex=cls.REALTIME_DEBOUNCE_SECONDS):
+                drain_realtime_preference_updates.apply_async(countdown=cls.REALTIME_DEBOUNCE_SECONDS)
+        except Exception as e:
+            # Redis 장애 시 디바운스 없이 개별 갱신
+            logger.warning(f"실시간 갱신 예약 실패, 즉시 갱신으로 대체 ({user_id}): {str(e)}")
+            update_user_preference_task.delay(user_id)
+
+    @classmethod
+    def drain_realtime_updates(cls):
+        """
+        갱신 예정 시각이 지난 사용자 프로필 재계산
+        반환: (처리 사용자 수, 남은 항목 중 가장 이른 예정 시각 또는 None)
+        """
+        redis = get_redis_connection("default")
+        redis.delete(cls.DRAIN_SCHEDULED_KEY)
+
+        due = redis.zrangebyscore(
+            cls.DIRTY_USERS_KEY, '-inf', time.time(), start=0, num=cls.DRAIN_BATCH_SIZE
+        )
+        processed = 0
+        for member in due:
+            # ZREM 성공한 워커만 처리 (중복 드레인 방지)
+            if not redis.zrem(cls.DIRTY_USERS_KEY, member):
+                continue
+            user_id = int(member)
+            full = bool(redis.srem(cls.FULL_RECOMPUTE_KEY, member))
+            try:
+                user = User.objects.get(pk=user_id)
+                cls.update_user_preference(user, incremental=not full)
+                # 갱신된 프로필 반영: 디바운스 구간에 이전 프로필로 캐시된 피드 무효화
+                transaction.on_commit(lambda uid=user_id: RecommendationCacheGeneration.bump(uid))
+                processed += 1
+            except User.DoesNotExist:
+                logger.warning(f"사용자 없음: {user_id}")
+            except DatabaseError as e:
+                logger.warning(f"DB 오류, 다음 윈도우에 재시도 ({user_id}): {str(e)}")
+                if full:
+                    redis.sadd(cls.FULL_RECOMPUTE_KEY, member)
+                redis.zadd(
+                    cls.DIRTY_USERS_KEY,
+                    {member: time.time() + cls.REALTIME_DEBOUNCE_SECONDS},
+                    nx=True
+                )
+            except Exception as e:
+                logger.error(f"실시간 갱신 실패 ({user_id}): {str(e)}", exc_info=True)
+
+        earliest = redis.zrange(cls.DIRTY_USERS_KEY, 0, 0, withscores=True)
+        return processed, (earliest[0][1] if earliest else None)
+
+    @classmethod
+    def reschedule_drain(cls, next_due):
+        """남은 항목의 예정 시각에 맞춰 드레인 재예약 (이미 예약돼 있으면 생략)"""
+        from apps.users.tasks import drain_realtime_preference_updates
+
+        countdown = max(1, math.ceil(next_due - time.time()))
+        redis = get_redis_connection("default")
+        if redis.set(cls.DRAIN_SCHEDULED_KEY, 1, nx=True, ex=countdown):
+            drain_realtime_preference_updates.apply_async(countdown=countdown)
+
     @shared_task(
         bind=True, 
         queue='realtime', 
@@ -0,0 +1,118 @@
+import numpy as np
+from django.core.cache import cache
+from apps.users.models import UserPreferenceProfile
+from apps.interactions.models import ContentInteraction
+from apps.users.services.preference_service import PreferenceService
+from apps.users.services.global_preference_service import GlobalPreferenceService
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DIM = 484
+
+
+class UserQueryVector:
+    """
+    추천 쿼리용 사용자/글로벌 혼합 벡터
+    - 사용자별 정규화 벡터와 사용자 가중치를 1회 계산 후 캐시에 보관 (DB 조회는 캐시 미스 시에만)
+    - 혼합 대상(글로벌 또는 세그먼트 사전 벡터)은 요청마다 O(dim) 연산으로 결합
+    - PreferenceService.update_user_preference 가 새 프로필을 저장하면 무효화
+    """
+    CACHE_PREFIX = "user_query_vec:v2"  # 캐시 항목 형식 변경 (사용자 벡터만 보관)
+    CACHE_TIMEOUT = 60 * 60 * 6  # 6시간 (프로필 변경 시 즉시 무효화)
+
+    @staticmethod
+    def _l2_normalize(vec: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 1e-8 else vec
+
+    @classmethod
+    def _cache_key(cls, user_id: int) -> str:
+        return f"{cls.CACHE_PREFIX}:{user_id}"
+
+    @classmethod
+    def get(cls, user_id: Optional[int], prior: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+        """
+        {'experience': 혼합 벡터, 'food': 혼합 벡터, 'user_weight': float} 반환
+        prior: 글로벌 대신 혼합할 정규화 사전 벡터 (GlobalPreferenceService.get_segment_prior)
+        """
+        base = prior or GlobalPreferenceService.get_normalized_vectors()
+
+        # 비로그인 사용자는 사전 벡터만 사용
+        if user_id is None:
+            return {
+                'experience': base['experience'],
+                'food': base['food'],
+                'user_weight': 0.0,
+            }
+
+        user_vecs = cls._get_user_vectors(user_id)
+        user_weight = user_vecs['user_weight']
+        if user_weight <= 0.0:
+            return {'experience': base['experience'], 'food': base['food'], 'user_weight': 0.0}
+
+        global_weight = 1.0 - user_weight
+        normalize = cls._l2_normalize
+        return {
+            'experience': normalize(
+                user_weight * user_vecs['experience'] + global_weight * base['experience']
+            ).astype(np.float32),
+            'food': normalize(
+                user_weight * user_vecs['food'] + global_weight * base['food']
+            ).astype(np.float32),
+            'user_weight': user_weight,
+        }
+
+    @classmethod
+    def _get_user_vectors(cls, user_id: int) -> Dict:
+        key = cls._cache_key(user_id)
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.warning(f"쿼리 벡터 캐시 조회 실패 ({user_id}): {str(e)}")
+            cached = None
+        if cached is not None:
+            return cached
+
+        user_vecs = cls._compute(user_id)
+        try:
+            cache.set(key, user_vecs, cls.CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"쿼리 벡터 캐시 저장 실패 ({user_id}): {str(e)}")
+        return user_vecs
+
+    @classmethod
+    def _compute(cls, user_id: int) -> Dict:
+        """사용자 정규화 벡터 + 상호작용 수 기반 사용자 가중치"""
+        try:
+            profile = UserPreferenceProfile.objects.only('experience', 'food').get(user_id=user_id)
+            user_exp = np.array(profile.experience, dtype=np.float32)
+            user_food = np.array(profile.food, dtype=np.float32)
+        except UserPreferenceProfile.DoesNotExist:
+            user_exp = np.zeros(VECTOR_DIM, dtype=np.float32)
+            user_food = np.zeros(VECTOR_DIM, dtype=np.float32)
+
+        # 가중치 동적 계산
+        interaction_count = ContentInteraction.objects.filter(user_id=user_id).count()
+        return {
+            'experience': cls._l2_normalize(user_exp),
+            'food': cls._l2_normalize(user_food),
+            'user_weight': float(PreferenceService.calculate_user_weight(interaction_count)),
+        }
+
+    @classmethod
+    def invalidate(cls, user_id: int):
+        """사용자 프로필 갱신 시 호출"""
+        try:
+            cache.delete(cls._cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"쿼리 벡터 캐시 무효화 실패 ({user_id}): {str(e)}")
+
+    @classmethod
+    def invalidate_many(cls, user_ids):
+        """일괄 프로필 재계산 후 호출"""
+        try:
+            cache.delete_many([cls._cache_key(user_id) for user_id in user_ids])
+        except Exception as e:
+            logger.warning(f"쿼리 벡터 캐시 일괄 무효화 실패: {str(e)}")
@@ -6,6 +6,7 @@ from django.utils import timezone
 from apps.users.services.global_preference_service import GlobalPreferenceService  # 서비스 클래스 임포트 방식 변경
 from apps.users.services.preference_service import PreferenceService
 from apps.users.models import User
+from apps.recommender.services.recommendation_cache import RecommendationCacheGeneration
 from django.db import transaction
 from django.db.utils import DatabaseError
 
@@ -39,7 +40,13 @@ def update_global_profile_task(self, force=False):
                     logger.error(f"[GLOBAL] 최대 재시도 횟수 초과: {self.request.retries}")
                 raise self.retry(countdown=300)  # 5분 대기 후 재시도
                 
-            cache.delete("global_profile_cache")  # 캐시 무효화
+            try:
+                GlobalPreferenceService.update_segment_profiles()
+            except Exception as e:
+                # 세그먼트 실패 시 기존 세그먼트 유지, 글로벌 갱신은 그대로 반영
+                logger.error(f"[GLOBAL] 세그먼트 프로필 갱신 실패: {str(e)}", exc_info=True)
+
+            GlobalPreferenceService.bump_version()  # 프로세스 내 글로벌/세그먼트 벡터 캐시 무효화
             return {'status': 'success', 'timestamp': timezone.now().isoformat()}
     
     except Exception as e:
@@ -72,6 +79,7 @@ def update_user_preference_task(self, user_id):
             PreferenceService.update_user_preference(user)
             
         cache.delete(f"user_pref_{user_id}")  # 사용자 캐시 무효화
+        RecommendationCacheGeneration.bump(user_id)  # 갱신된 프로필 기준으로 피드 재생성
         logger.info(f"[USER {user_id}] 업데이트 성공")
         return {'status': 'success'}
     
@@ -82,3 +90,32 @@ def update_user_preference_task(self, user_id):
     except Exception as e:
         logger.error(f"[USER {user_id}] 예상치 못한 오류: {str(e)}")
         raise
+
+
+@shared_task(queue='realtime', priority=9, ignore_result=True)
+def drain_realtime_preference_updates():
+    """디바운스된 실시간 프로필 갱신 일괄 처리"""
+    processed, next_due = PreferenceService.drain_realtime_updates()
+    if next_due is not None:
+        PreferenceService.reschedule_drain(next_due)
+    logger.info(f"[REALTIME] 프로필 {processed}건 갱신")
+    return processed
+
+
+@shared_task(
+    queue='batch',
+    priority=3,
+    soft_time_limit=3000,
+    time_limit=3300,
+    ignore_result=True
+)
+def rebuild_user_profiles():
+    """
+    전체 사용자 프로필 야간 재계산 (누적 벡터 재구성)
+    증분 갱신이 반영하지 못한 상호작용 삭제/수정과 SETTLE_SECONDS 를 넘긴 지연 커밋 보정
+    """
+    from apps.users.services.preference_batch_service import PreferenceBatchService
+
+    processed = PreferenceBatchService.rebuild_all()
+    logger.info(f"[USER] 프로필 {processed}명 일괄 재계산 완료")
+    return processed
@@ -1,3 +1,405 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+
+from apps.users import tasks
+from apps.users.services import preference_service, preference_batch_service
+from apps.users.services.preference_service import PreferenceService, VECTOR_DIM
+from apps.users.services.preference_batch_service import PreferenceBatchService, SLOTS
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=dt_timezone.utc)
+
+# (contentid, lclssystm1) 고정 콘텐츠
+CONTENTS = [(101, 'EX'), (102, 'FD'), (103, 'NA'), (104, 'FD'), (105, 'HS')]
+
+# (user_id, contentid, action_type, 경과 일수, duration)
+INTERACTIONS = [
+    (1, 101, 'click', 0.5, None),
+    (1, 102, 'like', 3.0, None),
+    (1, 104, 'dislike', 10.0, None),
+    (1, 103, 'duration', 1.0, 300.0),
+    (1, 101, 'bookmark', 20.0, None),
+    (2, 105, 'dislike', 2.0, None),
+    (2, 102, 'duration', 0.1, 45.0),
+    (2, 999, 'like', 1.0, None),  # 특징 벡터 없는 콘텐츠
+]
+
+
+def make_features(seed=7):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(len(CONTENTS), VECTOR_DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def make_lookup(vectors):
+    """PreferenceBatchService.feature_lookup 과 같은 구조 (FeatureMatrix 없이)"""
+    contentids = np.array([cid for cid, _ in CONTENTS], dtype=np.int64)
+    categories = np.array([cat for _, cat in CONTENTS], dtype=object)
+    order = np.argsort(contentids, kind='stable')
+    return {
+        'sorted_ids': contentids[order],
+        'rows': order,
+        'vectors': vectors,
+        'is_food': categories == 'FD',
+    }
+
+
+def make_content_map(vectors):
+    """PreferenceService._process_interactions 의 content_map 과 같은 구조"""
+    return {
+        cid: SimpleNamespace(feature_vector=vectors[i].tolist(), detail=SimpleNamespace(lclssystm1=cat))
+        for i, (cid, cat) in enumerate(CONTENTS)
+    }
+
+
+def make_interactions(rows, now=NOW, start_id=1):
+    return [
+        SimpleNamespace(
+            id=start_id + i,
+            content=SimpleNamespace(contentid=cid),
+            action_type=action,
+            timestamp=now - timedelta(days=age),
+            duration=duration,
+        )
+        for i, (_, cid, action, age, duration) in enumerate(rows)
+    ]
+
+
+class PreferenceBatchEquivalenceTests(SimpleTestCase):
+    """PreferenceBatchService(희소 행렬곱) 결과가 사용자별 PreferenceService 경로와 같은지 확인"""
+
+    def setUp(self):
+        self.vectors = make_features()
+        self.lookup = make_lookup(self.vectors)
+        self.content_map = make_content_map(self.vectors)
+
+    def _batch_accumulate(self, user_ids, rows):
+        _, contentids, actions, ages, durations = zip(*rows)
+        timestamps = [NOW - timedelta(days=age) for age in ages]
+        weighed = PreferenceBatchService.weigh_interactions(
+            self.lookup, contentids, actions, timestamps, durations, NOW, PreferenceService.DECAY_RATE
+        )
+        user_index = {uid: i for i, uid in enumerate(user_ids)}
+        user_rows = np.array([user_index[row[0]] for row in rows], dtype=np.int64)
+        targets = weighed['slots'] * len(user_ids) + user_rows[weighed['valid']]
+        flat = PreferenceBatchService.accumulate(
+            self.lookup, targets, weighed['feature_rows'], weighed['weights'],
+            weighed['dislike_sign'], len(SLOTS) * len(user_ids)
+        )
+        return flat.reshape(len(SLOTS), len(user_ids), VECTOR_DIM)
+
+    def test_batch_accumulators_match_per_user_path(self):
+        user_ids = [1, 2]
+        batch = self._batch_accumulate(user_ids, INTERACTIONS)
+
+        for i, user_id in enumerate(user_ids):
+            rows = [row for row in INTERACTIONS if row[0] == user_id]
+            expected = PreferenceService._accumulate_vectors(
+                make_interactions(rows), self.content_map, NOW
+            )
+            for s, slot in enumerate(SLOTS):
+                np.testing.assert_allclose(batch[s, i], expected[slot], rtol=1e-5, atol=1e-6)
+
+    def test_batch_normalization_matches_per_user_path(self):
+        batch = self._batch_accumulate([1, 2], INTERACTIONS)
+        matrix = np.vstack([batch[0], batch[1], np.zeros((1, VECTOR_DIM))])
+
+        normalized = PreferenceBatchService._normalize_rows(matrix)
+        for row, expected_input in zip(normalized, matrix):
+            np.testing.assert_allclose(
+                row, PreferenceService._normalize_vector(expected_input), rtol=1e-5, atol=1e-6
+            )
+
+
+
+class FakeInteractions:
+    """ContentInteraction.objects 대역 (_process_interactions 가 쓰는 filter/select_related/only 만 지원)"""
+
+    def __init__(self, rows):
+        self.rows = rows  # 커밋된(보이는) 상호작용, 테스트 중 추가 가능
+
+    def filter(self, id__gt=None, **kwargs):
+        rows = self.rows if id__gt is None else [row for row in self.rows if row.id > id__gt]
+        return FakeInteractions(rows)
+
+    def select_related(self, *fields):
+        return self
+
+    def only(self, *fields):
+        return self
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+def make_profile():
+    return SimpleNamespace(
+        user_id=1, experience=None, food=None, experience_acc=None, food_acc=None,
+        acc_updated_at=None, acc_last_interaction_id=None, save=lambda update_fields: None,
+    )
+
+
+class IncrementalRecomputeTests(SimpleTestCase):
+    """update_user_preference(incremental=True) 결과가 전체 재계산과 같은지 확인 (DB 대신 쿼리/프로필 대역)"""
+
+    def setUp(self):
+        self.vectors = make_features()
+        self.content_map = make_content_map(self.vectors)
+        self.visible = []
+        self.profile = make_profile()
+        self.user = SimpleNamespace(id=1)
+
+        profiles = mock.MagicMock()
+        profiles.objects.select_for_update.return_value.get_or_create.return_value = (self.profile, False)
+        for target in [
+            mock.patch.object(preference_service, 'UserPreferenceProfile', profiles),
+            mock.patch.object(preference_service, 'ContentInteraction',
+                              SimpleNamespace(objects=FakeInteractions(self.visible))),
+            mock.patch('django.db.transaction.Atomic.__enter__', return_value=None),
+            mock.patch('django.db.transaction.Atomic.__exit__', return_value=False),
+            mock.patch('django.db.transaction.on_commit'),
+        ]:
+            target.start()
+            self.addCleanup(target.stop)
+
+    def interaction(self, id, contentid, action, timestamp, duration=None):
+        return SimpleNamespace(
+            id=id,
+            content=SimpleNamespace(contentid=contentid, feature=self.content_map[contentid]),
+            action_type=action, timestamp=timestamp, duration=duration,
+        )
+
+    def update(self, now, incremental=True):
+        with mock.patch.object(preference_service.timezone, 'now', return_value=now):
+            PreferenceService.update_user_preference(self.user, incremental=incremental)
+
+    def assertMatchesFull(self, now, interactions):
+        full = PreferenceService._accumulate_vectors(interactions, self.content_map, now)
+        for slot in SLOTS:
+            np.testing.assert_allclose(
+                getattr(self.profile, slot), PreferenceService._normalize_vector(full[slot]),
+                rtol=1e-4, atol=1e-5
+            )
+
+    def test_incremental_matches_full_recompute(self):
+        first_now = NOW - timedelta(days=2)
+        first = [
+            self.interaction(1, 101, 'bookmark', first_now - timedelta(days=18)),
+            self.interaction(2, 104, 'dislike', first_now - timedelta(days=8)),
+            self.interaction(3, 102, 'like', first_now - timedelta(days=1)),
+        ]
+        self.visible.extend(first)
+        self.update(first_now)
+        self.assertEqual(self.profile.acc_last_interaction_id, 3)
+
+        later = [
+            self.interaction(4, 103, 'duration', NOW - timedelta(days=1), 300.0),
+            self.interaction(5, 101, 'click', NOW - timedelta(hours=12)),
+        ]
+        self.visible.extend(later)
+        self.update(NOW)
+
+        self.assertEqual(self.profile.acc_last_interaction_id, 5)
+        self.assertMatchesFull(NOW, first + later)
+        full = PreferenceService._accumulate_vectors(first + later, self.content_map, NOW)
+        for slot in SLOTS:
+            np.testing.assert_allclose(getattr(self.profile, f'{slot}_acc'), full[slot], rtol=1e-4, atol=1e-5)
+
+    def test_late_committed_interaction_is_not_lost(self):
+        """낮은 id 로 저장을 시작해 더 큰 id 보다 늦게 커밋된 상호작용도 다음 증분 갱신에 반영됨"""
+        first_now = NOW - timedelta(days=1)
+        settled = [
+            self.interaction(1, 101, 'bookmark', first_now - timedelta(days=5)),
+            self.interaction(2, 102, 'like', first_now - timedelta(days=2)),
+        ]
+        # id 3 은 first_now 시점에 아직 커밋 전, id 4 는 먼저 커밋됨
+        late = self.interaction(3, 104, 'dislike', first_now - timedelta(seconds=20))
+        early = self.interaction(4, 103, 'like', first_now - timedelta(seconds=10))
+
+        self.visible.extend(settled + [early])
+        self.update(first_now)
+        # 확정 유예 안의 상호작용은 워터마크를 올리지 않음
+        self.assertEqual(self.profile.acc_last_interaction_id, 2)
+        self.assertMatchesFull(first_now, settled + [early])
+
+        self.visible.append(late)
+        self.update(first_now + timedelta(seconds=60))
+        self.assertMatchesFull(first_now + timedelta(seconds=60), settled + [early, late])
+
+        self.update(NOW)
+        self.assertEqual(self.profile.acc_last_interaction_id, 4)
+        self.assertMatchesFull(NOW, settled + [early, late])
+        full = PreferenceService._accumulate_vectors(settled + [early, late], self.content_map, NOW)
+        for slot in SLOTS:
+            np.testing.assert_allclose(getattr(self.profile, f'{slot}_acc'), full[slot], rtol=1e-4, atol=1e-5)
+
+
+class BatchWatermarkTests(SimpleTestCase):
+    """일괄 재계산의 확정/미확정 분리와 워터마크가 사용자별 경로(_split_settled)와 같은지 확인"""
+
+    def test_block_split_matches_per_user_path(self):
+        vectors = make_features()
+        lookup = make_lookup(vectors)
+        content_map = make_content_map(vectors)
+        recent = (1, 103, 'like', 60 / 86400, None)  # 확정 유예 안 (1분 전)
+        rows = INTERACTIONS + [recent]
+        interactions = make_interactions(rows)
+
+        values = [
+            (i.id, row[0], row[1], i.action_type, i.timestamp, i.duration)
+            for i, row in zip(interactions, rows)
+        ]
+        queryset = mock.MagicMock()
+        queryset.objects.filter.return_value.values_list.return_value = values
+        with mock.patch.object(preference_batch_service, 'ContentInteraction', queryset):
+            settled, pending, watermarks = PreferenceBatchService._accumulate_block([1, 2], lookup, NOW)
+
+        for u, user_id in enumerate([1, 2]):
+            own = [i for i, row in zip(interactions, rows) if row[0] == user_id]
+            expected_settled, expected_pending, watermark = PreferenceService._split_settled(own, NOW)
+            self.assertEqual(watermarks[u], watermark)
+            for s, slot in enumerate(SLOTS):
+                np.testing.assert_allclose(
+                    settled[s, u],
+                    PreferenceService._accumulate_vectors(expected_settled, content_map, NOW)[slot],
+                    rtol=1e-5, atol=1e-6
+                )
+                np.testing.assert_allclose(
+                    pending[s, u],
+                    PreferenceService._accumulate_vectors(expected_pending, content_map, NOW)[slot],
+                    rtol=1e-5, atol=1e-6
+                )
+
+
+class FakeRedis:
+    """디바운스 경로가 쓰는 Redis 명령만 지원하는 대역 (만료는 delete 로만 처리)"""
+
+    def __init__(self):
+        self.keys = {}
+        self.sets = {}
+        self.zsets = {}
+
+    @staticmethod
+    def _member(member):
+        # redis-py 는 bytes 로 돌려주고 호출부는 str/bytes 를 섞어 넘김
+        return member.decode() if isinstance(member, bytes) else str(member)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.keys:
+            return None
+        self.keys[key] = value
+        return True
+
+    def delete(self, key):
+        self.keys.pop(key, None)
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(self._member(member))
+
+    def srem(self, key, member):
+        members, member = self.sets.get(key, set()), self._member(member)
+        if member not in members:
+            return 0
+        members.discard(member)
+        return 1
+
+    def zadd(self, key, mapping, nx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not (nx and self._member(member) in zset):
+                zset[self._member(member)] = score
+
+    def zrem(self, key, member):
+        return int(self.zsets.get(key, {}).pop(self._member(member), None) is not None)
+
+    def zrangebyscore(self, key, low, high, start=0, num=None):
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        due = [member.encode() for member, score in items if score <= high]
+        return due[start:start + num if num else None]
+
+    def zrange(self, key, start, stop, withscores=False):
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        return [(member.encode(), score) for member, score in items[start:stop + 1]]
+
+
+class RealtimeDebounceTests(SimpleTestCase):
+    """연속 상호작용이 사용자당 1회 재계산으로 병합되고 드레인 시 캐시 세대가 증가하는지 확인"""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.clock = [1000.0]
+        self.drain_task = mock.MagicMock()
+        self.fallback_task = mock.MagicMock()
+        self.update = mock.MagicMock()
+        self.bump = mock.MagicMock()
+        users = mock.MagicMock()
+        users.DoesNotExist = preference_service.User.DoesNotExist
+        users.objects.get.side_effect = lambda pk: SimpleNamespace(id=pk)
+        for target in [
+            mock.patch.object(preference_service, 'get_redis_connection', return_value=self.redis),
+            mock.patch.object(preference_service.time, 'time', side_effect=lambda: self.clock[0]),
+            mock.patch.object(tasks, 'drain_realtime_preference_updates', self.drain_task),
+            mock.patch.object(tasks, 'update_user_preference_task', self.fallback_task),
+            mock.patch.object(preference_service, 'User', users),
+            mock.patch.object(PreferenceService, 'update_user_preference', self.update),
+            mock.patch.object(preference_service.RecommendationCacheGeneration, 'bump', self.bump),
+            mock.patch('django.db.transaction.on_commit', side_effect=lambda func: func()),
+        ]:
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_interactions_within_window_are_coalesced(self):
+        PreferenceService.schedule_realtime_update(1)
+        self.clock[0] += 10
+        PreferenceService.schedule_realtime_update(1, full=True)
+        PreferenceService.schedule_realtime_update(2)
+
+        dirty = self.redis.zsets[PreferenceService.DIRTY_USERS_KEY]
+        self.assertEqual(dirty, {'1': 1000.0 + PreferenceService.REALTIME_DEBOUNCE_SECONDS,
+                                 '2': 1010.0 + PreferenceService.REALTIME_DEBOUNCE_SECONDS})
+        self.assertEqual(self.redis.sets[PreferenceService.FULL_RECOMPUTE_KEY], {'1'})
+        self.drain_task.apply_async.assert_called_once_with(
+            countdown=PreferenceService.REALTIME_DEBOUNCE_SECONDS
+        )
+
+    def test_drain_processes_due_users_once_and_bumps_cache(self):
+        PreferenceService.schedule_realtime_update(1, full=True)
+        self.clock[0] += 10
+        PreferenceService.schedule_realtime_update(2)
+
+        self.clock[0] = 1000.0 + PreferenceService.REALTIME_DEBOUNCE_SECONDS
+        processed, next_due = PreferenceService.drain_realtime_updates()
+
+        self.assertEqual(processed, 1)
+        self.update.assert_called_once_with(SimpleNamespace(id=1), incremental=False)
+        self.bump.assert_called_once_with(1)
+        self.assertEqual(next_due, 1010.0 + PreferenceService.REALTIME_DEBOUNCE_SECONDS)
+        self.assertNotIn(PreferenceService.DRAIN_SCHEDULED_KEY, self.redis.keys)
+
+        self.clock[0] = next_due
+        self.assertEqual(PreferenceService.drain_realtime_updates(), (1, None))
+        self.update.assert_called_with(SimpleNamespace(id=2), incremental=True)
+
+    def test_database_error_requeues_user_with_full_flag(self):
+        PreferenceService.schedule_realtime_update(1, full=True)
+        self.update.side_effect = DatabaseError('deadlock')
+        self.clock[0] += PreferenceService.REALTIME_DEBOUNCE_SECONDS
+
+        with self.assertLogs(preference_service.logger, 'WARNING'):
+            processed, next_due = PreferenceService.drain_realtime_updates()
+
+        self.assertEqual(processed, 0)
+        self.assertEqual(next_due, self.clock[0] + PreferenceService.REALTIME_DEBOUNCE_SECONDS)
+        self.assertEqual(self.redis.sets[PreferenceService.FULL_RECOMPUTE_KEY], {'1'})
+        self.bump.assert_not_called()
+
+    def test_redis_failure_falls_back_to_immediate_update(self):
+        with mock.patch.object(preference_service, 'get_redis_connection', side_effect=ConnectionError), \
+                self.assertLogs(preference_service.logger, 'WARNING'):
+            PreferenceService.schedule_realtime_update(3)
+        self.fallback_task.delay.assert_called_once_with(3)
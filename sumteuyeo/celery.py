@@ -1,7 +1,17 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sumteuyeo.settings')
 app = Celery('sumteuyeo')
 app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def warm_up_models(**kwargs):
+    """워커 프로세스별 MODEL_WARMUP 모델 사전 적재 (미지정 시 적재 없음)"""
+    from django.conf import settings
+    if settings.MODEL_WARMUP:
+        from apps.recommender.services.model_registry import ModelRegistry
+        ModelRegistry.warm_up()
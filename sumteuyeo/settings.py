@@ -174,12 +174,48 @@ OPENAI_API_KEY = env('OPENAI_API_KEY')
 # 상호작용 최대 개수
 USER_INTERACTION_LIMIT = 1000
 
+# 인메모리 특징 행렬 스냅샷 경로 (워커 간 mmap 공유, 소스 트리 밖 런타임 데이터)
+FEATURE_MATRIX_DIR = Path(env('FEATURE_MATRIX_DIR', default='') or BASE_DIR / 'var' / 'feature_matrix')
+
+# 카탈로그 임베딩 인코딩 프로세스 수 (0 이면 CPU 코어 수)
+EMBEDDING_WORKERS = env.int('EMBEDDING_WORKERS', default=0)
+
+# 프로세스 시작 시 사전 적재할 모델 ("종류:모델명", 예: sentence:snunlp/KR-SBERT-V40K-klueNLI-augSTS)
+# 미지정 모델은 첫 사용 시 적재
+MODEL_WARMUP = env.list('MODEL_WARMUP', default=[])
+
 # Celery 설정
 CELERY_BEAT_SCHEDULE = {
+    'rebuild_user_profiles': {
+        'task': 'apps.users.tasks.rebuild_user_profiles',
+        'schedule': crontab(hour=1, minute=30),
+        'options': {'queue': 'batch'}
+    },
     'update_global_profile': {
         'task': 'users.tasks.update_global_profile_task',
         'schedule': crontab(hour=2, minute=30),
         'options': {'queue': 'batch'}
+    },
+    'rollup_interaction_stats': {
+        'task': 'apps.interactions.tasks.rollup_interaction_stats',
+        'schedule': crontab(minute=5),
+        'options': {'queue': 'maintenance'}
+    },
+    'rebuild_interaction_stats': {
+        'task': 'apps.interactions.tasks.rollup_interaction_stats',
+        'schedule': crontab(hour=3, minute=15),
+        'kwargs': {'full': True},
+        'options': {'queue': 'maintenance'}
+    },
+    'build_anonymous_feed_snapshots': {
+        'task': 'apps.recommender.tasks.build_anonymous_feed_snapshots',
+        'schedule': crontab(hour='3,9,15,21', minute=45),
+        'options': {'queue': 'batch'}
+    },
+    'prune_embedding_cache': {
+        'task': 'apps.recommender.tasks.prune_embedding_cache',
+        'schedule': crontab(hour=4, minute=30, day_of_week=0),
+        'options': {'queue': 'maintenance'}
     }
 }
 